@@ -0,0 +1,152 @@
+"""
+Compact binary format for the commitments of archived (closed) objectives.
+
+Commitments are stored in MongoDB as documents of decimal strings: a point is two
+~39-digit strings plus BSON framing, about 100 bytes. Archived, each commitment is
+one record holding its ciphertext as raw bytes and its points as 16-byte integers
+(the field is 2^127 - 1), followed by the remaining fields as BSON. Records are
+grouped into chunks of about chunk_bytes, each with an offset index, so a page of
+commitments is decoded without reading the others and no chunk approaches
+MongoDB's 16 MiB document limit.
+
+Fields that do not have the expected shape (legacy data) are kept in the BSON
+remainder, so unpack_record(pack_record(c)) == c for every commitment.
+"""
+import struct
+from typing import Dict, List, Optional
+
+import bson
+
+FORMAT_VERSION = 1
+INT_BYTES = 16
+
+# Record flags: which fields are packed rather than kept in the BSON remainder
+_CIPHERTEXT = 1
+_POINTS = 2
+_HEADER = struct.Struct("<B")
+_LENGTH16 = struct.Struct("<H")
+_LENGTH32 = struct.Struct("<I")
+
+
+def _packable_ciphertext(value) -> bool:
+    if not isinstance(value, str) or len(value) % 2 or len(value) // 2 > 0xFFFF:
+        return False
+    try:
+        return bytes.fromhex(value).hex() == value
+    except ValueError:
+        return False
+
+
+def _packable_int(value) -> bool:
+    # Only canonical decimal strings, so they unpack to the same string
+    return (
+        isinstance(value, str) and value.isascii() and value.isdigit()
+        and str(int(value)) == value and int(value) < 1 << (8 * INT_BYTES)
+    )
+
+
+def _packable_points(value) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(p, list) and len(p) == 2 and _packable_int(p[0]) and _packable_int(p[1]) for p in value
+    )
+
+
+def pack_record(commitment: dict) -> bytes:
+    """One commitment as bytes: flags, ciphertext, points, then the other fields as BSON."""
+    rest = dict(commitment)
+    flags = 0
+    parts = []
+    if _packable_ciphertext(rest.get("ciphertext")):
+        flags |= _CIPHERTEXT
+        raw = bytes.fromhex(rest.pop("ciphertext"))
+        parts += [_LENGTH16.pack(len(raw)), raw]
+    if _packable_points(rest.get("points")):
+        flags |= _POINTS
+        points = rest.pop("points")
+        parts.append(_LENGTH32.pack(len(points)))
+        parts += [int(v).to_bytes(INT_BYTES, "big") for point in points for v in point]
+    return _HEADER.pack(flags) + b"".join(parts) + bson.encode(rest)
+
+
+def unpack_record(data: bytes) -> dict:
+    (flags,) = _HEADER.unpack_from(data, 0)
+    pos = _HEADER.size
+    ciphertext = points = None
+    if flags & _CIPHERTEXT:
+        (length,) = _LENGTH16.unpack_from(data, pos)
+        pos += _LENGTH16.size
+        ciphertext = data[pos:pos + length].hex()
+        pos += length
+    if flags & _POINTS:
+        (count,) = _LENGTH32.unpack_from(data, pos)
+        pos += _LENGTH32.size
+        points = []
+        for _ in range(count):
+            x = int.from_bytes(data[pos:pos + INT_BYTES], "big")
+            y = int.from_bytes(data[pos + INT_BYTES:pos + 2 * INT_BYTES], "big")
+            points.append([str(x), str(y)])
+            pos += 2 * INT_BYTES
+    commitment = bson.decode(data[pos:])
+    if ciphertext is not None:
+        commitment["ciphertext"] = ciphertext
+    if points is not None:
+        commitment["points"] = points
+    return commitment
+
+
+def pack_chunks(commitments: List[dict], chunk_bytes: int = 1 << 20) -> List[Dict]:
+    """
+    Records of `commitments` grouped into chunks of about chunk_bytes (a larger record
+    gets a chunk of its own): {"first": index of its first commitment, "count",
+    "offsets": count + 1 little-endian uint32 record offsets, "records"}.
+    """
+    chunks = []
+    records: List[bytes] = []
+    size = 0
+    first = 0
+
+    def flush():
+        offsets = [0]
+        for record in records:
+            offsets.append(offsets[-1] + len(record))
+        chunks.append({
+            "first": first,
+            "count": len(records),
+            "offsets": struct.pack(f"<{len(offsets)}I", *offsets),
+            "records": b"".join(records),
+        })
+
+    for idx, commitment in enumerate(commitments):
+        record = pack_record(commitment)
+        if records and size + len(record) > chunk_bytes:
+            flush()
+            records, size, first = [], 0, idx
+        records.append(record)
+        size += len(record)
+    if records:
+        flush()
+    return chunks
+
+
+def unpack_chunk(chunk: Dict, start: Optional[int] = None, stop: Optional[int] = None) -> List[dict]:
+    """The commitments of `chunk` with (objective-wide) indices in [start, stop)."""
+    first, count = chunk["first"], chunk["count"]
+    lo = max(0, (start if start is not None else first) - first)
+    hi = min(count, (stop if stop is not None else first + count) - first)
+    if lo >= hi:
+        return []
+    offsets = struct.unpack_from(f"<{count + 1}I", chunk["offsets"])
+    records = chunk["records"]
+    return [unpack_record(records[offsets[i]:offsets[i + 1]]) for i in range(lo, hi)]
+
+
+def pack_name_hashes(hashes: List[str]) -> bytes:
+    """SHA-256 hex digests as 32 raw bytes each. ValueError if one is not a digest."""
+    packed = b"".join(bytes.fromhex(h) for h in hashes)
+    if len(packed) != 32 * len(hashes) or packed.hex() != "".join(hashes):
+        raise ValueError("not a list of lowercase SHA-256 hex digests")
+    return packed
+
+
+def unpack_name_hashes(data: bytes) -> List[str]:
+    return [data[i:i + 32].hex() for i in range(0, len(data), 32)]
@@ -1,29 +1,219 @@
-from typing import Annotated, List, Tuple, Optional
+from typing import Annotated, Dict, List, Set, Tuple, Optional
+from collections import OrderedDict
 from enum import Enum
-from pymongo import MongoClient
 from bson import ObjectId
 from decouple import config
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
 import logging
+import random
 import secrets
+import threading
+import time
 
 # Import encrypted logic classes
-from ac2_backend.core.commit_classes import NameHolder, CommitEncrypter, CommitDecrypter
+from ac2_backend.core.commit_classes import (
+    NameHolder, CommitEncrypter, CommitDecrypter, DecryptionStats, SearchCursor, InterpolationCache,
+    CostEstimate, normalize_levels,
+)
+from ac2_backend.scheduler import DeadlineScheduler, PeriodicTask
+from ac2_backend.archive import (
+    FORMAT_VERSION as ARCHIVE_FORMAT, pack_chunks, pack_name_hashes, unpack_chunk, unpack_name_hashes,
+)
+from ac2_backend.resolution_writes import resolution_update, stored_level_coefficients
+from ac2_backend.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Registry
+from ac2_backend.responses import (
+    CompressionMiddleware, FastJSONResponse, dumps, entity_tag, etag_matches, http_date, not_modified,
+    validator_headers,
+)
+from ac2_backend.storage import open_repository
 
 MAX_NAME_LENGTH = 1000
+MAX_BATCH_COMMITMENTS = 10000
 NameStr = Annotated[str, Field(min_length=1, max_length=MAX_NAME_LENGTH)]
 DEFAULT_DATABASE_URI = "mongodb://localhost:27017/"
+DEADLINE_RESOLVER_ENABLED = config("DEADLINE_RESOLVER_ENABLED", default=True, cast=bool)
+DEADLINE_GRACE_SECONDS = config("DEADLINE_GRACE_SECONDS", default=5.0, cast=float)
+DECRYPTION_METRICS_ENABLED = config("DECRYPTION_METRICS_ENABLED", default=False, cast=bool)
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+# Longest a single decryption run may block; the rest continues in the background
+RESOLUTION_TIME_SLICE_SECONDS = config("RESOLUTION_TIME_SLICE_SECONDS", default=2.0, cast=float)
+# Processes a single large decryption may search with (1 = in-process only)
+DECRYPTION_WORKERS = config("DECRYPTION_WORKERS", default=1, cast=int)
+# Interpolation results kept in memory across requests (0 disables the cache)
+INTERPOLATION_CACHE_SIZE = config("INTERPOLATION_CACHE_SIZE", default=4096, cast=int)
+# Also store each objective's cache entries on the objective, so they survive restarts
+PERSIST_INTERPOLATION_CACHE = config("PERSIST_INTERPOLATION_CACHE", default=False, cast=bool)
+# Decryptions estimated to finish within this many seconds run in the commit request;
+# longer ones are handed to the background worker (see admission_decision)
+RESOLUTION_INLINE_MAX_SECONDS = config("RESOLUTION_INLINE_MAX_SECONDS", default=0.25, cast=float)
+# Decryptions expected to take at least this long even with honest shares are deferred...
+RESOLUTION_DEFER_MIN_SECONDS = config("RESOLUTION_DEFER_MIN_SECONDS", default=60.0, cast=float)
+# ...by this many seconds, so that a burst of commits is resolved once
+RESOLUTION_DEFER_SECONDS = config("RESOLUTION_DEFER_SECONDS", default=300.0, cast=float)
+# Attempts a commit makes when other writers keep changing the objective under it
+COMMIT_MAX_ATTEMPTS = config("COMMIT_MAX_ATTEMPTS", default=8, cast=int)
+# Upper bound of the random pause before retry number k, times k
+COMMIT_RETRY_BACKOFF_SECONDS = config("COMMIT_RETRY_BACKOFF_SECONDS", default=0.005, cast=float)
+# Attempts the resolver makes when commits keep landing during its decryption
+RESOLUTION_MAX_ATTEMPTS = config("RESOLUTION_MAX_ATTEMPTS", default=3, cast=int)
+# Commitments per page of GET /objective/{id}/commitments, and the largest page a client may ask for
+COMMITMENT_PAGE_SIZE = config("COMMITMENT_PAGE_SIZE", default=100, cast=int)
+COMMITMENT_PAGE_MAX = config("COMMITMENT_PAGE_MAX", default=1000, cast=int)
+# Commitments fetched per round trip while streaming NDJSON
+COMMITMENT_STREAM_BATCH = config("COMMITMENT_STREAM_BATCH", default=200, cast=int)
+# Responses at least this large are compressed (brotli or gzip, as the client accepts)
+COMPRESSION_ENABLED = config("COMPRESSION_ENABLED", default=True, cast=bool)
+COMPRESSION_MIN_BYTES = config("COMPRESSION_MIN_BYTES", default=1024, cast=int)
+GZIP_LEVEL = config("GZIP_LEVEL", default=1, cast=int)
+BROTLI_QUALITY = config("BROTLI_QUALITY", default=1, cast=int)
+# How often closed objectives are moved to the archive (0 disables the archiver), and
+# how long after their last change; at most ARCHIVE_BATCH objectives per pass
+ARCHIVE_INTERVAL_SECONDS = config("ARCHIVE_INTERVAL_SECONDS", default=3600.0, cast=float)
+ARCHIVE_AFTER_SECONDS = config("ARCHIVE_AFTER_SECONDS", default=86400.0, cast=float)
+ARCHIVE_BATCH = config("ARCHIVE_BATCH", default=100, cast=int)
+# Target size of one archive document; MongoDB caps documents at 16 MiB
+ARCHIVE_CHUNK_BYTES = config("ARCHIVE_CHUNK_BYTES", default=1 << 20, cast=int)
+# Longest /readyz and the start-up check wait for the database to answer a ping
+READINESS_TIMEOUT_SECONDS = config("READINESS_TIMEOUT_SECONDS", default=2.0, cast=float)
+MAX_RECENT_DECRYPTION_STATS = 100
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Encrypted Backend")
+
+# -----------------------------------------------------------------------------
+# Metrics
+# -----------------------------------------------------------------------------
+
+metrics_registry = Registry()
+REQUEST_LATENCY = metrics_registry.histogram(
+    "ac2_http_request_duration_seconds", "Time spent handling HTTP requests.", ["method", "route", "status"]
+)
+MONGO_LATENCY = metrics_registry.histogram(
+    "ac2_mongo_command_duration_seconds", "Round-trip time of MongoDB commands.", ["command", "outcome"]
+)
+STAGE_LATENCY = metrics_registry.histogram(
+    "ac2_stage_duration_seconds", "Time spent in encryption and decryption stages.", ["stage"]
+)
+DECRYPTION_COMBINATIONS = metrics_registry.counter(
+    "ac2_decryption_combinations_total", "Candidate subsets tried by decrypt_with_details."
+)
+DECRYPTION_CAP_REACHED = metrics_registry.counter(
+    "ac2_decryption_cap_reached_total", "Decryption runs cut short by MAX_COMBS."
+)
+INTERPOLATION_CACHE_HITS = metrics_registry.counter(
+    "ac2_interpolation_cache_hits_total", "Interpolations and level searches answered from the cache."
+)
+INTERPOLATION_CACHE_MISSES = metrics_registry.counter(
+    "ac2_interpolation_cache_misses_total", "Interpolations and level searches not found in the cache."
+)
+WRITE_CONFLICTS = metrics_registry.counter(
+    "ac2_write_conflicts_total", "Compare-and-swap writes that found the objective changed.", ["writer"]
+)
+RESOLUTION_ADMISSIONS = metrics_registry.counter(
+    "ac2_resolution_admissions_total", "Post-commit decryptions by admission decision.", ["decision"]
+)
+# Not labelled by objective: /metrics is public, and private objectives are only reachable by their id
+DECRYPTION_DURATION = metrics_registry.histogram(
+    "ac2_decryption_duration_seconds", "Duration of decryption runs (one per slice of a resumed search)."
+)
+ARCHIVED_OBJECTIVES = metrics_registry.counter(
+    "ac2_archived_objectives_total", "Closed objectives moved to the archive."
+)
+
+
+def observe_mongo_command(command: str, outcome: str, seconds: float):
+    MONGO_LATENCY.observe(seconds, command=command, outcome=outcome)
+
+
+# Set once the database has answered and the background workers are running; /readyz
+# reports not ready until then. The process serves /healthz before it connects.
+ready = threading.Event()
+shutting_down = threading.Event()
+
+def warm_up():
+    """Wait for the database (retrying with backoff), then start the background workers."""
+    delay = 0.5
+    while not shutting_down.is_set():
+        try:
+            repository.ping(READINESS_TIMEOUT_SECONDS)
+            break
+        except Exception as e:
+            logger.warning(f"The database is not reachable yet, retrying in {delay:.1f}s: {e}")
+            shutting_down.wait(delay)
+            delay = min(delay * 2, 30.0)
+    else:
+        return
+    if DEADLINE_RESOLVER_ENABLED:
+        try:
+            schedule_open_deadline_objectives()
+        except Exception as e:
+            logger.error(f"Failed to load open DEADLINE objectives: {e}", exc_info=True)
+        deadline_scheduler.start()
+    try:
+        repository.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Failed to create indexes: {e}", exc_info=True)
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        archiver.start()
+    ready.set()
+    logger.info("Backend ready")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server accepts connections (and answers
+    # /healthz) right away, whether or not the database is up yet
+    shutting_down.clear()
+    warm_up_thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    warm_up_thread.start()
+    yield
+    shutting_down.set()
+    await asyncio.to_thread(warm_up_thread.join, 5.0)
+    ready.clear()
+    archiver.stop()
+    deadline_scheduler.stop()
+    repository.close()
+
+
+app = FastAPI(title="Encrypted Backend", lifespan=lifespan)
+
+# Added first, so it is the innermost middleware: it sees responses as the
+# endpoints send them and its time is included in the request latency
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_BYTES,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+    )
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so /objective/{objective_id} is one series
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=str(status),
+        )
 
 app.add_middleware(
     CORSMiddleware, 
@@ -33,9 +223,22 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-client = MongoClient(config("DATABASE_URI", default=DEFAULT_DATABASE_URI))
-db = client["objectives_db"]
-objectives_col = db["objectives"]
+# MongoDB (connected on first use, see mongo.py) or, for a sqlite:/// URI, an embedded
+# SQLite database; see storage/. Importing this module needs neither.
+repository = open_repository(config("DATABASE_URI", default=DEFAULT_DATABASE_URI), on_command=observe_mongo_command)
+
+# objective id -> stats of its most recent decryption run, oldest first
+recent_decryption_stats: "OrderedDict[str, dict]" = OrderedDict()
+recent_decryption_stats_lock = threading.Lock()
+
+interpolation_cache = InterpolationCache(INTERPOLATION_CACHE_SIZE) if INTERPOLATION_CACHE_SIZE > 0 else None
+
+metrics_registry.gauge(
+    "ac2_interpolation_cache_entries",
+    "Entries held by the in-process interpolation cache.",
+    [],
+    lambda: [((), len(interpolation_cache))] if interpolation_cache is not None else [],
+)
 
 # -----------------------------------------------------------------------------
 # Helpers and models
@@ -119,11 +322,17 @@ class Objective(BaseModel):
     resolution_strategy: Optional[str] = "DEADLINE"
     minimum_commitments: Optional[int] = 1
     visibility: Optional[str] = "private"
+    # Optional: the only thresholds members may choose. Commitments then store one
+    # point per allowed threshold instead of one per group member.
+    allowed_thresholds: Optional[List[int]] = None
 
 class Commitment(BaseModel):
     name: NameStr
     Number: int # Treated as threshold in encrypted context
 
+class CommitmentBatch(BaseModel):
+    commitments: List[Commitment] = Field(min_length=1, max_length=MAX_BATCH_COMMITMENTS)
+
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
@@ -161,7 +370,7 @@ def restore_encrypter(objective_doc) -> CommitEncrypter:
         seed = "fallback_seed"
             
     # Initialize with seed
-    encrypter = CommitEncrypter(nh, min_count, seed=seed)
+    encrypter = CommitEncrypter(nh, min_count, seed=seed, levels=objective_doc.get("allowed_thresholds"))
     
     # Reconstruct used_xs from stored commitments
     used_xs = []
@@ -176,7 +385,7 @@ def restore_encrypter(objective_doc) -> CommitEncrypter:
 
 def restore_decrypter(objective_doc) -> CommitDecrypter:
     eligible = objective_doc.get("eligible_people") or objective_doc.get("invited_people", [])
-    cd = CommitDecrypter(len(eligible))
+    cd = CommitDecrypter(len(eligible), cache=interpolation_cache, levels=objective_doc.get("allowed_thresholds"))
     
     stored_commitments = objective_doc.get("commitments", [])
     for c in stored_commitments:
@@ -186,22 +395,252 @@ def restore_decrypter(objective_doc) -> CommitDecrypter:
             
     return cd
 
-def is_past_resolution_date(objective):
+def resolution_deadline(objective) -> Optional[datetime]:
+    """
+    The moment (naive UTC) an objective counts as past its resolution date.
+    Resolution dates are compared by day, so this is midnight after resolution_date.
+    """
     res_date = objective.get("resolution_date")
     if res_date is None:
-        return False
+        return None
     if isinstance(res_date, str):
         res_date = datetime.fromisoformat(res_date)
-    today = datetime.utcnow().date()
-    return today > res_date.date()
+    return datetime.combine(res_date.date() + timedelta(days=1), datetime.min.time())
+
+def is_past_resolution_date(objective):
+    deadline = resolution_deadline(objective)
+    if deadline is None:
+        return False
+    return datetime.utcnow() >= deadline
+
+
+# Fields needed to decide whether an objective has to be decrypted, without its commitments
+RESOLUTION_SUMMARY_FIELDS = {
+    "closed": 1,
+    "resolution_strategy": 1,
+    "resolution_date": 1,
+    "minimum_commitments": 1,
+    "committed_people": 1,
+    "resolution_cursor": 1,
+    "level_counts": 1,
+    "resolved_level_counts": 1,
+    "commitment_count": 1,
+    "allowed_thresholds": 1,
+    "eligible_count": 1,
+    "version": 1,
+}
+
+def update_if_unchanged(objective, update: dict, bump: bool = True) -> bool:
+    """
+    Compare-and-swap: apply `update` only if nobody bumped the version since
+    `objective` was read. bump=True marks the write as one that others must not
+    race with (anything restore_encrypter or the counters depend on).
+    """
+    if bump:
+        update = dict(update, **{"$inc": {**update.get("$inc", {}), "version": 1}})
+    # Objectives created before versioning have none; they get version 1 on their first versioned write
+    return repository.update(objective["_id"], update, version=objective.get("version"))
+
+def summary_levels(summary) -> List[int]:
+    """The level each entry of level_counts (and of every points list) belongs to."""
+    return summary.get("allowed_thresholds") or list(range(1, len(summary["level_counts"]) + 1))
+
+def summary_eligible_count(summary) -> int:
+    # Objectives without declared thresholds have one level per eligible person
+    return summary.get("eligible_count", len(summary["level_counts"]))
+
+def level_count_increments(points_lists: List[List[Tuple[int, int]]]) -> Dict[str, int]:
+    """$inc document adding the real points of new commitments to level_counts."""
+    increments: Dict[str, int] = {}
+    for points in points_lists:
+        for i, point in enumerate(points):
+            if point != (0, 0):
+                key = f"level_counts.{i}"
+                increments[key] = increments.get(key, 0) + 1
+    return increments
+
+def level_counts_from_commitments(objective) -> List[int]:
+    """level_counts[i] = number of commitments with a real point at their i-th level."""
+    eligible = objective.get("eligible_people") or objective.get("invited_people", [])
+    counts = [0] * len(objective.get("allowed_thresholds") or eligible)
+    for c in objective.get("commitments", []):
+        for i, point in enumerate(points_from_db(c.get("points", []))):
+            if point != (0, 0) and i < len(counts):
+                counts[i] += 1
+    return counts
+
+def load_resolution_summary(objective_id) -> Optional[dict]:
+    """
+    Read only what the resolver needs to decide whether to decrypt. Objectives created
+    before level_counts existed are backfilled from their commitments once.
+    """
+    summary = repository.get(ObjectId(objective_id), RESOLUTION_SUMMARY_FIELDS)
+    if summary is None or ("level_counts" in summary and "commitment_count" in summary):
+        return summary
+    objective = repository.get(ObjectId(objective_id))
+    backfill = {
+        "level_counts": level_counts_from_commitments(objective),
+        "commitment_count": len(objective.get("commitments", [])),
+    }
+    # Commits only $inc the counters once they exist, so a commit racing with the
+    # backfill must retry; if one landed first, the next read backfills again
+    if update_if_unchanged(objective, {"$set": backfill}):
+        summary["version"] = objective.get("version", 0) + 1
+    summary.update(backfill)
+    return summary
+
+def decryption_needed(summary) -> bool:
+    """
+    Whether decrypting could change the stored outcome: some level k has at least k
+    real points, and the counts moved since the last stored resolution (or a search
+    is still pending).
+    """
+    if summary.get("resolution_cursor"):
+        return True
+    counts = summary.get("level_counts") or []
+    if not any(count >= k for k, count in zip(summary_levels(summary), counts)):
+        return False
+    return counts != summary.get("resolved_level_counts")
+
+def known_details_from_commitments(objective) -> Dict[int, Dict]:
+    """Decryption details already stored on the objective's commitments."""
+    level_coefficients = {
+        level: [int(x) for x in coeffs] for level, coeffs in stored_level_coefficients(objective).items()
+    }
+    details = {}
+    for idx, c in enumerate(objective.get("commitments", [])):
+        if c.get("decrypted"):
+            details[idx] = {
+                "name": c.get("decrypted_name"),
+                "threshold": c.get("threshold"),
+                "coefficients": level_coefficients.get(str(c.get("decryption_level")), []),
+                "level": c.get("decryption_level"),
+            }
+    return details
+
+def run_decryption(objective) -> Tuple[List[str], Dict[int, Dict], Optional[Dict]]:
+    """
+    Run one time slice of decryption, continuing from the objective's stored
+    resolution_cursor if there is one. Returns (revealed_names, decryption_details,
+    cursor) where cursor is None once the search has covered every level.
+    """
+    stored_cursor = objective.get("resolution_cursor")
+    cursor = SearchCursor.from_dict(stored_cursor) if stored_cursor else None
+    known_details = known_details_from_commitments(objective) if cursor else None
+
+    persist_cache = PERSIST_INTERPOLATION_CACHE and interpolation_cache is not None
+    if persist_cache and objective.get("interpolation_cache"):
+        interpolation_cache.load(objective["interpolation_cache"])
+
+    with STAGE_LATENCY.time(stage="restore_decrypter"):
+        decrypter = restore_decrypter(objective)
+    with STAGE_LATENCY.time(stage="decrypt_with_details"):
+        revealed_names, decryption_details = decrypter.decrypt_with_details(
+            time_budget=RESOLUTION_TIME_SLICE_SECONDS or None,
+            cursor=cursor,
+            known_details=known_details,
+            workers=DECRYPTION_WORKERS,
+        )
+    record_decryption_stats(str(objective["_id"]), decrypter.stats)
+    new_cursor = decrypter.cursor.to_dict() if decrypter.cursor else None
+
+    if persist_cache:
+        entries = interpolation_cache.export(decrypter.cache_keys)
+        if entries != objective.get("interpolation_cache"):
+            repository.update(objective["_id"], {"$set": {"interpolation_cache": entries}})
+    return revealed_names, decryption_details, new_cursor
+
+def resolution_estimate(summary) -> CostEstimate:
+    """Expected cost of the next run_decryption, from the resolution summary alone."""
+    stored_cursor = summary.get("resolution_cursor")
+    cursor = SearchCursor.from_dict(stored_cursor) if stored_cursor else None
+    if cursor is not None and cursor.commitment_count != summary["commitment_count"]:
+        cursor = None  # Stale: the search starts over
+    return CommitDecrypter.estimate_from_counts(
+        summary["level_counts"], cursor=cursor, levels=summary_levels(summary)
+    )
+
+def admission_decision(estimate: CostEstimate) -> str:
+    """
+    Where a post-commit decryption runs: "inline" in the commit request, "background"
+    on the resolver thread right away, or "defer"red by RESOLUTION_DEFER_SECONDS.
+    """
+    if not DEADLINE_RESOLVER_ENABLED or estimate.max_seconds <= RESOLUTION_INLINE_MAX_SECONDS:
+        return "inline"
+    if estimate.min_seconds >= RESOLUTION_DEFER_MIN_SECONDS:
+        return "defer"
+    return "background"
+
+# Objectives whose post-commit resolution was handed to the resolver thread
+offloaded_resolutions: Set[str] = set()
+offloaded_resolutions_lock = threading.Lock()
+
+def offload_resolution(objective_id: str, decision: str):
+    with offloaded_resolutions_lock:
+        offloaded_resolutions.add(objective_id)
+    if decision == "defer":
+        # Commits arriving meanwhile must not keep pushing a deferred resolution back
+        deadline_scheduler.schedule(
+            objective_id, datetime.utcnow() + timedelta(seconds=RESOLUTION_DEFER_SECONDS), keep_earlier=True
+        )
+    else:
+        deadline_scheduler.schedule_now(objective_id)
+
+def continue_resolution_later(objective_id, cursor: Optional[Dict]):
+    """Hand an unfinished search to the background worker (without it, reads resume it; see resolve_on_read)."""
+    if cursor is not None and DEADLINE_RESOLVER_ENABLED:
+        deadline_scheduler.schedule_now(str(objective_id))
+
+def record_decryption_stats(objective_id: str, stats: DecryptionStats):
+    DECRYPTION_COMBINATIONS.inc(stats.combinations_explored)
+    INTERPOLATION_CACHE_HITS.inc(stats.cache_hits)
+    INTERPOLATION_CACHE_MISSES.inc(stats.cache_misses)
+    DECRYPTION_DURATION.observe(stats.total_seconds)
+    if stats.cap_reached:
+        DECRYPTION_CAP_REACHED.inc()
+        logger.warning(
+            f"Decryption for objective {objective_id} hit MAX_COMBS; results may be incomplete: {stats.summary()}"
+        )
+    else:
+        logger.info(f"Decryption stats for objective {objective_id}: {stats.summary()}")
+
+    with recent_decryption_stats_lock:
+        recent_decryption_stats.pop(objective_id, None)
+        recent_decryption_stats[objective_id] = {
+            "recorded_at": datetime.utcnow().isoformat(),
+            **stats.to_dict(),
+        }
+        while len(recent_decryption_stats) > MAX_RECENT_DECRYPTION_STATS:
+            recent_decryption_stats.popitem(last=False)
 
 
 def check_and_update_resolution(objective):
     """
     Checks if the objective should be resolved (decrypted) or closed based on its strategy and current state.
     If so, performs decryption, updates the database, and returns the updated objective.
+    objective can be a resolution summary (see load_resolution_summary): the commitments
+    are only loaded when decryption can change the outcome.
+    When commits land while it decrypts, it starts over from a fresh summary, up to
+    RESOLUTION_MAX_ATTEMPTS times.
     """
-    if objective.get("closed"):
+    objective_id = objective["_id"]
+    for attempt in range(RESOLUTION_MAX_ATTEMPTS):
+        if attempt:
+            objective = load_resolution_summary(objective_id)
+            if objective is None:
+                return None
+        updated = resolve_from_snapshot(objective)
+        if updated is not None:
+            return updated
+    logger.warning(f"Resolution of objective {objective_id} kept conflicting with commits; retrying later")
+    if DEADLINE_RESOLVER_ENABLED:
+        deadline_scheduler.schedule_now(str(objective_id))
+    return objective
+
+def resolve_from_snapshot(objective) -> Optional[dict]:
+    """One attempt of check_and_update_resolution; None if the objective changed before the write."""
+    # Closed objectives only need work while an interrupted search is pending
+    if objective.get("closed") and not objective.get("resolution_cursor"):
         return objective
 
     objective_id = objective["_id"]
@@ -209,21 +648,21 @@ def check_and_update_resolution(objective):
     # Determine if we should attempt decryption
     resolution_strategy = objective.get("resolution_strategy", "ASAP").upper()
     
-    eligible_names = objective.get("eligible_people") or objective.get("invited_people", [])
-    current_responses = len(objective.get("commitments", []))
-    full_participation = current_responses >= len(eligible_names)
+    current_responses = objective["commitment_count"]
+    full_participation = current_responses >= summary_eligible_count(objective)
     
-    # Always attempt decryption to reveal what we can
-    # Strategy only dictates when we STOP accepting commitments (Close)
-    should_attempt_decrypt = current_responses > 0
+    # Always attempt decryption to reveal what we can, unless nothing changed since
+    # the stored result. Strategy only dictates when we STOP accepting commitments (Close)
+    should_attempt_decrypt = current_responses > 0 and decryption_needed(objective)
     
-    revealed_names = []
-    decryption_details = {}
+    revealed_names = objective.get("committed_people") or []
+    cursor = objective.get("resolution_cursor")
+    decrypted = None
 
     if should_attempt_decrypt:
+        decrypted = repository.get(objective_id)
         try:
-            decrypter = restore_decrypter(objective)
-            revealed_names, decryption_details = decrypter.decrypt_with_details()
+            revealed_names, decryption_details, cursor = run_decryption(decrypted)
         except Exception as e:
             logger.error(f"Decryption failed for objective {objective_id}: {e}")
             return objective
@@ -236,105 +675,55 @@ def check_and_update_resolution(objective):
         should_close = True
     elif resolution_strategy == "DEADLINE" and is_past_resolution_date(objective):
         should_close = True
+    # Never reopen an objective while finishing its search
+    should_close = should_close or objective.get("closed", False)
         
-    # Check if we need to update DB
-    stored_revealed = set(objective.get("committed_people") or [])
-    new_revealed = set(revealed_names)
-    
-    # We update if we are closing (and weren't closed) OR if the list of revealed people changed
-    has_changes = (should_close != objective.get("closed", False)) or (new_revealed != stored_revealed)
-    
-    if has_changes:
-        # Prepare update
-        updated_commitments = []
-        for idx, commitment in enumerate(objective.get("commitments", [])):
-            updated_commitment = dict(commitment)
-            if idx in decryption_details:
-                detail = decryption_details[idx]
-                updated_commitment["decrypted"] = True
-                updated_commitment["decrypted_name"] = detail["name"]
-                updated_commitment["threshold"] = detail["threshold"]
-                updated_commitment["coefficients"] = [str(c) for c in detail["coefficients"]]
-                updated_commitment["decryption_level"] = detail["level"]
-            else:
-                updated_commitment["decrypted"] = False
-            updated_commitments.append(updated_commitment)
-
-        update_doc = {
-            "closed": should_close,
-            "committed_people": revealed_names,
-            "commitments": updated_commitments,
-            "modified_at": datetime.utcnow().isoformat()
-        }
-        
-        objectives_col.update_one(
-            {"_id": objective_id},
-            {"$set": update_doc}
-        )
+    update_doc = {}
+    if should_close != objective.get("closed", False):
+        update_doc["closed"] = should_close
+
+    # Only the commitments whose state changed are written, by position
+    update = {"$set": {}}
+    if decrypted is not None:
+        # We update if the list of revealed people changed OR if the search stopped somewhere else
+        stored_revealed = set(objective.get("committed_people") or [])
+        if set(revealed_names) != stored_revealed or cursor != objective.get("resolution_cursor"):
+            update = resolution_update(decrypted, decryption_details)
+            update_doc.update({
+                "committed_people": revealed_names,
+                "resolution_cursor": cursor,
+            })
+
+    if update_doc:
+        update_doc["modified_at"] = datetime.utcnow().isoformat()
+
+    # The stored outcome now matches these counts, so the next run can skip them
+    if decrypted is not None and cursor is None and decrypted["level_counts"] != objective.get("resolved_level_counts"):
+        update_doc["resolved_level_counts"] = decrypted["level_counts"]
+
+    if update_doc:
+        update["$set"].update(update_doc)
+        # The decryption is only valid for the commitments it read
+        if not update_if_unchanged(decrypted or objective, update):
+            WRITE_CONFLICTS.inc(writer="resolver")
+            return None
         
         # Update local object
         objective.update(update_doc)
-        
-    return objective
-
-
-# -----------------------------------------------------------------------------
-# Endpoints
-# -----------------------------------------------------------------------------
 
-@app.get("/")
-def root():
-    return {
-        "message": "AC2 Encrypted Backend Running",
-        "version": "2.0",
-        "encryption": "Threshold-based cryptographic commitments",
-        "strategies": {
-            "ASAP": "Closes immediately when threshold is met",
-            "DEADLINE": "Accepts commitments until resolution date"
-        }
-    }
-
-@app.post("/objective")
-def create_objective(o: Objective):
-    if isinstance(o.resolution_date, str):
-        o.resolution_date = datetime.fromisoformat(o.resolution_date)
-
-    n = len(o.eligible_names)
-    if n == 0:
-        raise HTTPException(status_code=400, detail="Must provide at least one name")
-    
-    # Generate a random seed for deterministic encryption
-    encryption_seed = secrets.token_hex(32)
-    
-    objective_doc = {
-        "title": o.title,
-        "description": o.description,
-        "resolution_date": o.resolution_date,
-        "eligible_people": o.eligible_names,
-        "invited_people": o.eligible_names, # Backward compatibility
-        "resolution_strategy": o.resolution_strategy,
-        "visibility": o.visibility,
-        "minimum_commitments": o.minimum_commitments,
-        "commitments": [],
-        "closed": False,
-        "modified_at": datetime.utcnow().isoformat(),
-        "encryption_seed": encryption_seed,
-        "committed_people": [],
-        "used_name_hashes": []
-    }
+    continue_resolution_later(objective_id, cursor)
+    return objective
 
-    result = objectives_col.insert_one(objective_doc)
-    return {"objective_id": str(result.inserted_id)}
 
-@app.patch("/commit/{objective_id}")
-def commit(objective_id: str, c: Commitment):
-    objective = objectives_col.find_one({"_id": ObjectId(objective_id)})
-    if objective is None:
-        return {"message": "Objective not found."}
-    
+def commit_rejection(objective) -> Optional[dict]:
+    """Return the response for an objective that no longer accepts commitments, or None."""
     # Check resolution strategy
     resolution_strategy = objective.get("resolution_strategy", "ASAP").upper()
     is_closed = objective.get("closed", False)
+
+    # Archived objectives no longer have the name hashes duplicates are checked against
+    if objective.get("archived"):
+        return {"message": "Objective already resolved. No new commitments accepted."}
     
     # ASAP strategy: close as soon as threshold is met (even if deadline not reached)
     if resolution_strategy == "ASAP" and is_closed:
@@ -348,88 +737,81 @@ def commit(objective_id: str, c: Commitment):
     if resolution_strategy == "ASAP" and is_past_resolution_date(objective):
         return {"message": "The resolution date has been passed."}
 
-    eligible_names = objective.get("eligible_people") or objective.get("invited_people", [])
-    if c.name not in eligible_names:
-        # Security: Leak no info. Generate fake success.
-        # Return random ciphertext and noise points, but do not save to DB.
-        # This makes it impossible to enumerate valid users via timing or error messages (mostly).
-        fake_ciphertext = secrets.token_hex(16) # Same length as real
-        # Generate fake points (all zeros, as if not in group)
-        n = len(eligible_names)
-        fake_points = [(0, 0) for _ in range(n)]
-        
-        return {
-            "message": "Commitment stored.", 
-            "ciphertext": fake_ciphertext,
-            "_debug_note": "Ignored (Not eligible)" # Only visible if inspecting response JSON manually
-        }
+    return None
 
-    # Check for duplicate commitment using stored hashes
-    import hashlib
-    name_hash = hashlib.sha256(c.name.encode('utf-8')).hexdigest()
-    if name_hash in objective.get("used_name_hashes", []):
-         return {"message": "Already committed"}
+def threshold_rejection(objective, number: int) -> Optional[dict]:
+    """
+    Response for a threshold the objective does not allow, or None. Checked before
+    eligibility, so that it reveals nothing about who is eligible.
+    """
+    allowed = objective.get("allowed_thresholds")
+    if allowed is None or number in (0, -1) or number in allowed:
+        return None
+    return {"message": f"Number must be one of the allowed thresholds: {', '.join(map(str, allowed))}."}
+
+def commit_conflict(attempt: int):
+    """Count a lost compare-and-swap and wait a little before retry number attempt + 1."""
+    WRITE_CONFLICTS.inc(writer="commit")
+    time.sleep(random.uniform(0, COMMIT_RETRY_BACKOFF_SECONDS * (attempt + 1)))
+
+def commit_conflict_response() -> dict:
+    return {"message": "The objective is busy with other commitments. Please try again."}
+
+def ineligible_commit_response() -> dict:
+    # Security: Leak no info. Generate fake success.
+    # Return random ciphertext, but do not save to DB.
+    # This makes it impossible to enumerate valid users via timing or error messages (mostly).
+    fake_ciphertext = secrets.token_hex(16) # Same length as real
+    return {
+        "message": "Commitment stored.", 
+        "ciphertext": fake_ciphertext,
+        "_debug_note": "Ignored (Not eligible)" # Only visible if inspecting response JSON manually
+    }
 
-    # Restore Encrypter State
-    try:
-        encrypter = restore_encrypter(objective)
-    except Exception as e:
-        logger.error(f"Failed to restore encrypter: {e}", exc_info=True)
-        return {"message": "Internal error restoring encryption state."}
-    
-    # Perform Encryption
-    # c.Number is interpreted as the threshold. 
-    # If 0 (decline), we map to -1 for noise generation.
-    threshold_val = -1 if c.Number == 0 else c.Number
-    ciphertext, points = encrypter.commit(c.name, threshold=threshold_val)
-    
-    # Create commitment record
+def name_hash(name: str) -> str:
+    return hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+def commitment_record(ciphertext: str, points: List[Tuple[int, int]], is_decline: bool) -> dict:
     # Convert points to strings for MongoDB (can't handle 127-bit ints)
-    new_commitment = {
+    return {
         "name": "HIDDEN", 
         "ciphertext": ciphertext,
         "points": points_to_db(points),
         "committed_at": datetime.utcnow().isoformat(),
-        "is_decline": (c.Number == 0)
+        "is_decline": is_decline
     }
-    
-    # Update DB: push commitment
-    # We NO LONGER update encrypted_state.used_xs explicitly because 
-    # we reconstruct it from commitments next time.
-    objectives_col.update_one(
-        {"_id": ObjectId(objective_id)},
-        {
-            "$push": {
-                "commitments": new_commitment,
-                "used_name_hashes": name_hash
-            },
-            "$set": {
-                "modified_at": datetime.utcnow().isoformat()
-            }
-        }
-    )
-    
-    # Check for resolution (Decryption) or Closing
-    objective = objectives_col.find_one({"_id": ObjectId(objective_id)})
+
+def counter_increments(objective, points_lists: List[List[Tuple[int, int]]]) -> dict:
+    """
+    Update operators keeping level_counts and commitment_count in step with pushed commitments.
+    Objectives without the counters are left alone; load_resolution_summary backfills them.
+    """
+    if "level_counts" not in objective or "commitment_count" not in objective:
+        return {}
+    return {"$inc": {**level_count_increments(points_lists), "commitment_count": len(points_lists)}}
+
+def resolve_after_commit(objective_id: str, admission: bool = True):
+    """
+    Close and/or decrypt an objective after new commitments were stored.
+    With admission, decryptions estimated to be slow are left to the resolver thread.
+    """
+    objective = load_resolution_summary(objective_id)
     
     # Check if everyone has responded (committed or declined)
-    eligible_names = objective.get("eligible_people") or objective.get("invited_people", [])
-    num_commitments = len(objective.get("commitments", []))
+    num_commitments = objective["commitment_count"]
     
-    if num_commitments >= len(eligible_names):
-        # Everyone has responded, so we can close the objective
-        objectives_col.update_one(
-            {"_id": ObjectId(objective_id)},
-            {"$set": {"closed": True}}
-        )
+    if num_commitments >= summary_eligible_count(objective):
+        # Everyone has responded, so we can close the objective. Commits in flight must
+        # see this, so the version moves on (unconditionally: closing is idempotent).
+        repository.update(ObjectId(objective_id), {"$set": {"closed": True}, "$inc": {"version": 1}})
         objective["closed"] = True # Update local copy for next checks
 
     resolution_strategy = objective.get("resolution_strategy", "ASAP").upper()
     is_closed = objective.get("closed", False)
 
     # Check if EVERYONE has responded (committed or declined)
-    eligible_count = len(objective.get("eligible_people") or objective.get("invited_people", []))
-    current_responses = len(objective.get("commitments", []))
+    eligible_count = summary_eligible_count(objective)
+    current_responses = objective["commitment_count"]
     
     should_close_immediately = False
     if current_responses >= eligible_count:
@@ -445,9 +827,18 @@ def commit(objective_id: str, c: Commitment):
         if is_past_resolution_date(objective) or should_close_immediately:
             should_attempt_decrypt = True
     
-    if should_attempt_decrypt:
-        decrypter = restore_decrypter(objective)
-        revealed_names, decryption_details = decrypter.decrypt_with_details()
+    # Only load the commitments when decrypting can change the stored outcome
+    if should_attempt_decrypt and decryption_needed(objective):
+        if admission:
+            decision = admission_decision(resolution_estimate(objective))
+            RESOLUTION_ADMISSIONS.inc(decision=decision)
+            if decision != "inline":
+                offload_resolution(objective_id, decision)
+                return
+
+        objective = repository.get(ObjectId(objective_id))
+        revealed_names, decryption_details, cursor = run_decryption(objective)
+        cursor_saved = False
         
         # If we are closing immediately due to full participation, we should mark closed
         # even if no names are revealed (e.g. everyone declined)
@@ -458,99 +849,632 @@ def commit(objective_id: str, c: Commitment):
             mark_as_closed = True
 
         if mark_as_closed:
-             # Mark commitments as decrypted and add coefficients
-            updated_commitments = []
-            number_revealed = 0
-            for idx, commitment in enumerate(objective.get("commitments", [])):
-                updated_commitment = dict(commitment)
-                if idx in decryption_details:
-                    number_revealed += 1
-                    detail = decryption_details[idx]
-                    updated_commitment["decrypted"] = True
-                    updated_commitment["decrypted_name"] = detail["name"]
-                    updated_commitment["threshold"] = detail["threshold"]
-                    # Store coefficients as strings
-                    updated_commitment["coefficients"] = [str(c) for c in detail["coefficients"]]
-                    updated_commitment["decryption_level"] = detail["level"]
-                else:
-                    updated_commitment["decrypted"] = False
-                updated_commitments.append(updated_commitment)
-            if number_revealed >= objective.minimum_commitments:
-
-                objectives_col.update_one(
-                    {"_id": ObjectId(objective_id)},
-                    {
-                        "$set": {
-                            "closed": True,
-                            "committed_people": revealed_names,
-                            "commitments": updated_commitments,
-                            "modified_at": datetime.utcnow().isoformat()
-                        }
-                    }
-                )
+            number_revealed = len(decryption_details)
+            if number_revealed >= objective.get("minimum_commitments", 1):
+                # Mark changed commitments as decrypted, by position, and add coefficients
+                update = resolution_update(objective, decryption_details)
+                update["$set"].update({
+                    "closed": True,
+                    "committed_people": revealed_names,
+                    "resolution_cursor": cursor,
+                    "resolved_level_counts": (
+                        objective["level_counts"] if cursor is None
+                        else objective.get("resolved_level_counts")
+                    ),
+                    "modified_at": datetime.utcnow().isoformat()
+                })
+                if not update_if_unchanged(objective, update):
+                    # A later commit changed the objective and resolves it after its own write
+                    WRITE_CONFLICTS.inc(writer="commit_resolution")
+                    return
+                cursor_saved = True
+
+        if not cursor_saved and cursor != objective.get("resolution_cursor"):
+            if not update_if_unchanged(objective, {"$set": {"resolution_cursor": cursor}}):
+                WRITE_CONFLICTS.inc(writer="commit_resolution")
+                return
+        continue_resolution_later(objective_id, cursor)
+
+
+# -----------------------------------------------------------------------------
+# Deadline resolver
+# -----------------------------------------------------------------------------
+
+def resolve_due_objective(objective_id: str):
+    """
+    Scheduler callback: resolve (and close) a DEADLINE objective whose date has passed,
+    or run the next slice of an interrupted search, or a post-commit resolution that
+    admission_decision offloaded.
+    """
+    with offloaded_resolutions_lock:
+        offloaded = objective_id in offloaded_resolutions
+        offloaded_resolutions.discard(objective_id)
+    if offloaded:
+        resolve_after_commit(objective_id, admission=False)
+        logger.info(f"Offloaded resolution ran for objective {objective_id}")
+        return
+
+    objective = load_resolution_summary(objective_id)
+    if objective is None or (objective.get("closed") and not objective.get("resolution_cursor")):
+        return
+    check_and_update_resolution(objective)
+    logger.info(f"Deadline resolution ran for objective {objective_id}")
+
+deadline_scheduler = DeadlineScheduler(resolve_due_objective, grace_seconds=DEADLINE_GRACE_SECONDS)
+
+# Enough of an objective to tell whether it still needs the resolver
+RESOLUTION_DUE_FIELDS = {"closed": 1, "resolution_strategy": 1, "resolution_date": 1, "resolution_cursor": 1}
+
+def resolution_due(objective) -> bool:
+    """Whether the deadline resolver has work for this objective: a past-due DEADLINE or an interrupted search."""
+    if objective.get("resolution_cursor"):
+        return True
+    return (
+        not objective.get("closed")
+        and objective.get("resolution_strategy", "ASAP").upper() == "DEADLINE"
+        and is_past_resolution_date(objective)
+    )
+
+def resolve_on_read(objectives: List[dict]):
+    """
+    Without the deadline resolver, nothing else resolves DEADLINE objectives once their
+    date has passed (commits are rejected by then), so reads do it for the objectives
+    they show. objectives need RESOLUTION_DUE_FIELDS.
+    """
+    for objective in objectives:
+        if resolution_due(objective):
+            summary = load_resolution_summary(objective["_id"])
+            if summary is not None:
+                check_and_update_resolution(summary)
+
+def schedule_deadline(objective):
+    if not DEADLINE_RESOLVER_ENABLED:
+        return
+    if objective.get("resolution_strategy", "ASAP").upper() != "DEADLINE":
+        return
+    deadline = resolution_deadline(objective)
+    if deadline is not None:
+        deadline_scheduler.schedule(str(objective["_id"]), deadline)
+
+def schedule_open_deadline_objectives():
+    """Queue every open DEADLINE objective; ones already past their date resolve right away."""
+    for objective in repository.find_open("DEADLINE", {"resolution_date": 1, "resolution_strategy": 1}):
+        schedule_deadline(objective)
+    logger.info(f"Deadline resolver tracking {deadline_scheduler.pending()} open objectives")
+
+
+# -----------------------------------------------------------------------------
+# Archive
+# -----------------------------------------------------------------------------
+
+# Moved out of the objective when it is archived; interpolation_cache is dropped
+ARCHIVED_FIELDS = ("commitments", "used_name_hashes", "interpolation_cache")
+
+def archivable(objective) -> bool:
+    """Closed for good: no commitment can be stored, no search is pending and the stored result is current."""
+    if objective.get("archived") or not objective.get("closed"):
+        return False
+    if objective.get("resolution_cursor") or decryption_needed(objective):
+        return False
+    with offloaded_resolutions_lock:
+        if str(objective["_id"]) in offloaded_resolutions:
+            return False
+    # A DEADLINE objective closed by full participation only rejects commits at its date,
+    # but every eligible name is then taken
+    return (
+        commit_rejection(objective) is not None
+        or objective["commitment_count"] >= summary_eligible_count(objective)
+    )
+
+def archive_documents(objective) -> List[dict]:
+    """The archive documents of `objective`, keyed by the version they were packed from."""
+    key = {"objective_id": objective["_id"], "version": objective.get("version", 0)}
+    documents = [
+        {**key, "field": "commitments", "format": ARCHIVE_FORMAT, "last": chunk["first"] + chunk["count"], **chunk}
+        for chunk in pack_chunks(objective.get("commitments", []), ARCHIVE_CHUNK_BYTES)
+    ]
+    hashes = objective.get("used_name_hashes", [])
+    per_document = max(1, ARCHIVE_CHUNK_BYTES // 32)
+    for first in range(0, len(hashes), per_document):
+        part = hashes[first:first + per_document]
+        document = {**key, "field": "used_name_hashes", "format": ARCHIVE_FORMAT, "first": first}
+        try:
+            document["data"] = pack_name_hashes(part)
+        except ValueError:
+            document["values"] = part
+        documents.append(document)
+    return documents
+
+def archive_objective(object_id: ObjectId) -> bool:
+    """
+    Move a closed objective's commitments and name hashes to the archive, keeping the
+    fields the views read. Returns whether it was archived.
+    """
+    # Backfills the counters archivable() needs on objectives created before them
+    if load_resolution_summary(object_id) is None:
+        return False
+    objective = repository.get(object_id)
+    if objective is None or not archivable(objective):
+        return False
+
+    # The archive is written first, so a crash in between only leaves unreferenced documents
+    version = objective.get("version", 0)
+    documents = archive_documents(objective)
+    repository.replace_archive(object_id, version, documents)
+
+    commitments = objective.get("commitments", [])
+    update = {
+        "$unset": {field: "" for field in ARCHIVED_FIELDS},
+        "$set": {
+            "archived": {
+                "version": version,
+                "format": ARCHIVE_FORMAT,
+                "archived_at": datetime.utcnow().isoformat(),
+                "decrypted_count": sum(1 for c in commitments if c.get("decrypted")),
+                "bytes": sum(len(d.get("records") or d.get("data") or b"") for d in documents),
+            },
+            # Objectives resolved before level_coefficients kept them on the commitments
+            "level_coefficients": stored_level_coefficients(objective),
+        },
+    }
+    # Bumps the version, so a resolution that read the commitments can no longer write them
+    if not update_if_unchanged(objective, update):
+        WRITE_CONFLICTS.inc(writer="archive")
+        # The objective moved past this version, so nothing can reference these documents
+        # unless a concurrent pass archived the same version first
+        current = repository.get(object_id, {"archived": 1})
+        if (current or {}).get("archived", {}).get("version") != version:
+            repository.delete_archive(object_id, version)
+        return False
+    ARCHIVED_OBJECTIVES.inc()
+    return True
+
+def archive_closed_objectives(limit: Optional[int] = None) -> int:
+    """One archival pass over objectives closed and unchanged for ARCHIVE_AFTER_SECONDS."""
+    cutoff = (datetime.utcnow() - timedelta(seconds=ARCHIVE_AFTER_SECONDS)).isoformat()
+    archived = 0
+    for object_id in repository.archive_candidates(cutoff, limit or ARCHIVE_BATCH):
+        try:
+            archived += archive_objective(object_id)
+        except Exception as e:
+            logger.error(f"Archiving objective {object_id} failed: {e}", exc_info=True)
+    if archived:
+        logger.info(f"Archived {archived} closed objectives")
+    return archived
+
+archiver = PeriodicTask(archive_closed_objectives, ARCHIVE_INTERVAL_SECONDS or 1.0, name="archiver")
+
+def archived_commitments(objective, start: int = 0, stop: Optional[int] = None):
+    """Commitments [start, stop) of an archived objective, decoding only the chunks that hold them."""
+    version = objective["archived"]["version"]
+    for chunk in repository.archive_documents(objective["_id"], version, "commitments", start, stop):
+        yield from unpack_chunk(chunk, start, stop)
+
+def archived_name_hashes(objective) -> List[str]:
+    hashes = []
+    version = objective["archived"]["version"]
+    for document in repository.archive_documents(objective["_id"], version, "used_name_hashes"):
+        hashes.extend(unpack_name_hashes(document["data"]) if "data" in document else document["values"])
+    return hashes
+
+def restore_archived(objective) -> dict:
+    """The objective with its archived commitments and name hashes loaded back."""
+    if not objective.get("archived"):
+        return objective
+    return {
+        **objective,
+        "commitments": list(archived_commitments(objective)),
+        "used_name_hashes": archived_name_hashes(objective),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Endpoints
+# -----------------------------------------------------------------------------
+
+@app.get("/")
+def root():
+    return {
+        "message": "AC2 Encrypted Backend Running",
+        "version": "2.0",
+        "encryption": "Threshold-based cryptographic commitments",
+        "strategies": {
+            "ASAP": "Closes immediately when threshold is met",
+            "DEADLINE": "Accepts commitments until resolution date"
+        }
+    }
+
+@app.post("/objective")
+def create_objective(o: Objective):
+    if isinstance(o.resolution_date, str):
+        o.resolution_date = datetime.fromisoformat(o.resolution_date)
+
+    n = len(o.eligible_names)
+    if n == 0:
+        raise HTTPException(status_code=400, detail="Must provide at least one name")
+    try:
+        levels = normalize_levels(o.allowed_thresholds, n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Generate a random seed for deterministic encryption
+    encryption_seed = secrets.token_hex(32)
+    
+    objective_doc = {
+        "title": o.title,
+        "description": o.description,
+        "resolution_date": o.resolution_date,
+        "eligible_people": o.eligible_names,
+        "invited_people": o.eligible_names, # Backward compatibility
+        "resolution_strategy": o.resolution_strategy,
+        "visibility": o.visibility,
+        "minimum_commitments": o.minimum_commitments,
+        "commitments": [],
+        "closed": False,
+        "modified_at": datetime.utcnow().isoformat(),
+        "encryption_seed": encryption_seed,
+        "committed_people": [],
+        "used_name_hashes": [],
+        # Real points per level, maintained on write so the resolver can skip unsolvable objectives
+        "level_counts": [0] * len(levels),
+        "commitment_count": 0,
+        "eligible_count": n,
+        # Bumped by every write; commits and resolutions compare-and-swap on it
+        "version": 0
+    }
+    if o.allowed_thresholds is not None:
+        objective_doc["allowed_thresholds"] = levels
+
+    objective_id = repository.create(objective_doc)
+    schedule_deadline(objective_doc)
+    return {"objective_id": str(objective_id)}
+
+@app.patch("/commit/{objective_id}")
+def commit(objective_id: str, c: Commitment):
+    # Optimistic concurrency: read, encrypt against that snapshot, and store only if
+    # no other write happened in between; otherwise start over with a fresh read
+    for attempt in range(COMMIT_MAX_ATTEMPTS):
+        objective = repository.get(ObjectId(objective_id))
+        if objective is None:
+            return {"message": "Objective not found."}
+
+        rejection = commit_rejection(objective) or threshold_rejection(objective, c.Number)
+        if rejection is not None:
+            return rejection
+
+        eligible_names = objective.get("eligible_people") or objective.get("invited_people", [])
+        if c.name not in eligible_names:
+            return ineligible_commit_response()
+
+        # Check for duplicate commitment using stored hashes
+        c_hash = name_hash(c.name)
+        if c_hash in objective.get("used_name_hashes", []):
+             return {"message": "Already committed"}
+
+        # Restore Encrypter State
+        try:
+            with STAGE_LATENCY.time(stage="restore_encrypter"):
+                encrypter = restore_encrypter(objective)
+        except Exception as e:
+            logger.error(f"Failed to restore encrypter: {e}", exc_info=True)
+            return {"message": "Internal error restoring encryption state."}
+        
+        # Perform Encryption
+        # c.Number is interpreted as the threshold. 
+        # If 0 (decline), we map to -1 for noise generation.
+        threshold_val = -1 if c.Number == 0 else c.Number
+        with STAGE_LATENCY.time(stage="encrypt"):
+            ciphertext, points = encrypter.commit(c.name, threshold=threshold_val)
+        
+        # Create commitment record
+        new_commitment = commitment_record(ciphertext, points, is_decline=(c.Number == 0))
+        
+        # Update DB: push commitment
+        # We NO LONGER update encrypted_state.used_xs explicitly because 
+        # we reconstruct it from commitments next time.
+        stored = update_if_unchanged(
+            objective,
+            {
+                "$push": {
+                    "commitments": new_commitment,
+                    "used_name_hashes": c_hash
+                },
+                "$set": {
+                    "modified_at": datetime.utcnow().isoformat()
+                },
+                **counter_increments(objective, [points])
+            }
+        )
+        if stored:
+            break
+        commit_conflict(attempt)
+    else:
+        return commit_conflict_response()
+    
+    # Check for resolution (Decryption) or Closing
+    resolve_after_commit(objective_id)
         
     return {"message": "Commitment stored.", "ciphertext": ciphertext}
 
-@app.get("/objective/{objective_id}")
-def serve_view(objective_id: str):
-    objective = objectives_col.find_one({"_id": ObjectId(objective_id)})
+@app.post("/commit/{objective_id}/batch")
+def commit_batch(objective_id: str, batch: CommitmentBatch):
+    """
+    Store many commitments (e.g. responses collected offline) in one request.
+    Returns one result per submitted commitment, in order, shaped like PATCH /commit.
+    """
+    # Same optimistic concurrency as PATCH /commit, for the whole batch at once
+    for attempt in range(COMMIT_MAX_ATTEMPTS):
+        objective = repository.get(ObjectId(objective_id))
+        if objective is None:
+            return {"message": "Objective not found."}
+
+        rejection = commit_rejection(objective)
+        if rejection is not None:
+            return rejection
+
+        eligible_names = set(objective.get("eligible_people") or objective.get("invited_people", []))
+        used_hashes = set(objective.get("used_name_hashes", []))
+
+        results: List[Optional[dict]] = [None] * len(batch.commitments)
+        to_encrypt = []  # (result index, name hash, commitment)
+        for i, c in enumerate(batch.commitments):
+            rejection = threshold_rejection(objective, c.Number)
+            if rejection is not None:
+                results[i] = rejection
+                continue
+            if c.name not in eligible_names:
+                results[i] = ineligible_commit_response()
+                continue
+            c_hash = name_hash(c.name)
+            if c_hash in used_hashes:
+                results[i] = {"message": "Already committed"}
+                continue
+            used_hashes.add(c_hash)
+            to_encrypt.append((i, c_hash, c))
+
+        if not to_encrypt:
+            return {"results": results}
+
+        try:
+            with STAGE_LATENCY.time(stage="restore_encrypter"):
+                encrypter = restore_encrypter(objective)
+        except Exception as e:
+            logger.error(f"Failed to restore encrypter: {e}", exc_info=True)
+            return {"message": "Internal error restoring encryption state."}
+
+        with STAGE_LATENCY.time(stage="encrypt"):
+            encrypted = encrypter.commit_many(
+                [(c.name, -1 if c.Number == 0 else c.Number) for _, _, c in to_encrypt]
+            )
+
+        new_commitments = []
+        for (i, _, c), (ciphertext, points) in zip(to_encrypt, encrypted):
+            new_commitments.append(commitment_record(ciphertext, points, is_decline=(c.Number == 0)))
+            results[i] = {"message": "Commitment stored.", "ciphertext": ciphertext}
+
+        # Commitments are embedded in the objective, so one update carries the whole batch
+        stored = update_if_unchanged(
+            objective,
+            {
+                "$push": {
+                    "commitments": {"$each": new_commitments},
+                    "used_name_hashes": {"$each": [h for _, h, _ in to_encrypt]}
+                },
+                "$set": {
+                    "modified_at": datetime.utcnow().isoformat()
+                },
+                **counter_increments(objective, [points for _, points in encrypted])
+            }
+        )
+        if stored:
+            break
+        commit_conflict(attempt)
+    else:
+        return commit_conflict_response()
+
+    resolve_after_commit(objective_id)
+
+    return {"results": results}
+
+# Fields the summary view never reads; commitment points dominate the document size
+SUMMARY_EXCLUDED_FIELDS = {
+    "commitments.points": 0,
+    "commitments.ciphertext": 0,
+    "used_name_hashes": 0,
+    "interpolation_cache": 0,
+    "resolution_cursor": 0,
+}
+
+# What the entity tags of the views are derived from. Every write a view can show
+# bumps version (see update_if_unchanged); modified_at also gives Last-Modified.
+VALIDATOR_FIELDS = {"version": 1, "modified_at": 1, "commitment_count": 1}
+
+def validator_key(objective) -> tuple:
+    return (
+        str(objective["_id"]), objective.get("version"), objective.get("modified_at"),
+        objective.get("commitment_count"),
+    )
+
+def objective_validators(objective) -> Dict[str, str]:
+    """ETag and Last-Modified headers of an objective's views."""
+    return validator_headers(entity_tag(*validator_key(objective)), http_date(objective.get("modified_at")))
+
+def listing_validators(objectives: List[dict]) -> Dict[str, str]:
+    """ETag and Last-Modified headers of a listing: they change when any listed objective does, or the list does."""
+    modified = [o["modified_at"] for o in objectives if o.get("modified_at")]
+    return validator_headers(
+        entity_tag(*(validator_key(o) for o in objectives)), http_date(max(modified)) if modified else None
+    )
+
+def commitment_view(c) -> dict:
+    """A stored commitment as shown to clients."""
+    commitment_data = {
+        "ciphertext": c.get("ciphertext"),
+        "points": c.get("points"),  # Already in [[x, y], ...] format as strings
+        "committed_at": c.get("committed_at"),
+        "decrypted": c.get("decrypted", False)
+    }
+    # Include decryption details if available
+    if c.get("decrypted"):
+        commitment_data["decrypted_name"] = c.get("decrypted_name")
+        commitment_data["threshold"] = c.get("threshold")
+        commitment_data["decryption_level"] = c.get("decryption_level")
+    return commitment_data
+
+@app.get("/objective/{objective_id}", response_class=FastJSONResponse)
+def serve_view(
+    objective_id: str,
+    include_coefficients: bool = True,
+    include_commitments: bool = False,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    include_coefficients: Add level_coefficients, the recovered coefficients of each
+    level names were revealed at (decrypted commitments carry their decryption_level).
+    include_commitments: Embed every commitment as well, as this endpoint did before
+    GET /objective/{objective_id}/commitments existed. Without it the commitment
+    points are not even read from the database.
+    The response carries an ETag; a request whose If-None-Match still matches gets
+    a 304 after reading only VALIDATOR_FIELDS.
+    """
+    object_id = ObjectId(objective_id)
+    if not DEADLINE_RESOLVER_ENABLED:
+        due = repository.get(object_id, RESOLUTION_DUE_FIELDS)
+        if due is not None:
+            resolve_on_read([due])
+    if if_none_match:
+        current = repository.get(object_id, VALIDATOR_FIELDS)
+        if not current:
+            raise HTTPException(status_code=404, detail="Objective not found")
+        headers = objective_validators(current)
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers)
+
+    projection = None if include_commitments else SUMMARY_EXCLUDED_FIELDS
+    objective = repository.get(object_id, projection)
     if not objective:
         raise HTTPException(status_code=404, detail="Objective not found")
-    
-    objective = check_and_update_resolution(objective)
 
-    # Convert commitment data for frontend display
-    commitments_display = []
-    for c in objective.get("commitments", []):
-        commitment_data = {
-            "ciphertext": c.get("ciphertext"),
-            "points": c.get("points"),  # Already in [[x, y], ...] format as strings
-            "committed_at": c.get("committed_at"),
-            "decrypted": c.get("decrypted", False)
-        }
-        # Include decryption details if available
-        if c.get("decrypted"):
-            commitment_data["decrypted_name"] = c.get("decrypted_name")
-            commitment_data["threshold"] = c.get("threshold")
-            commitment_data["coefficients"] = c.get("coefficients", [])
-            commitment_data["decryption_level"] = c.get("decryption_level")
-        commitments_display.append(commitment_data)
-        
+    archived = objective.get("archived")
+    commitments = objective.get("commitments", [])
     resp = {
         "title": objective.get("title"),
         "description": objective.get("description"),
         "resolution_date": objective.get("resolution_date"),
         "closed": objective.get("closed"),
         "committed_people": objective.get("committed_people", []),
-        "commitments": commitments_display,
+        "commitment_count": objective.get("commitment_count", len(commitments)),
+        "decrypted_count": (
+            archived["decrypted_count"] if archived else sum(1 for c in commitments if c.get("decrypted"))
+        ),
         "resolution_strategy": objective.get("resolution_strategy", "ASAP"),
         "minimum_number": objective.get("minimum_number", 1),
+        # points[i] of every commitment is at level allowed_thresholds[i] (level i+1 when null)
+        "allowed_thresholds": objective.get("allowed_thresholds"),
         "eligible_count": len(objective.get("eligible_people") or objective.get("invited_people", [])),
         "invited_count": len(objective.get("eligible_people") or objective.get("invited_people", [])) # Backward compatibility
     }
-    return resp
+    if include_commitments:
+        if archived:
+            commitments = archived_commitments(objective)
+        resp["commitments"] = [commitment_view(c) for c in commitments]
+    if include_coefficients:
+        resp["level_coefficients"] = stored_level_coefficients(objective)
+    return FastJSONResponse(resp, headers=objective_validators(objective))
+
+@app.get("/objective/{objective_id}/commitments", response_class=FastJSONResponse)
+def serve_commitments(objective_id: str, offset: int = 0, limit: Optional[int] = None, format: str = "json"):
+    """
+    The commitments of an objective, in commit order.
+
+    format=json: one page of `limit` commitments (default COMMITMENT_PAGE_SIZE) with
+    `total` and `next_offset` (null after the last page).
+    format=ndjson: every commitment from `offset` (up to `limit`, if given) streamed as
+    one JSON object per line, read in batches as the response is sent.
+    Commitments are only ever appended, so positions stay valid between pages.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be json or ndjson")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    if limit is not None and not 1 <= limit <= COMMITMENT_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {COMMITMENT_PAGE_MAX}")
+
+    object_id = ObjectId(objective_id)
+    objective = repository.get(object_id, {"commitment_count": 1, "archived": 1})
+    if not objective:
+        raise HTTPException(status_code=404, detail="Objective not found")
+
+    def indexed(stop: Optional[int], batch_size: Optional[int] = None):
+        """(index, commitment) pairs from offset, read from the archive once the objective is archived."""
+        if objective.get("archived"):
+            return enumerate(archived_commitments(objective, offset, stop), start=offset)
+        return repository.commitments(object_id, offset, None if stop is None else stop - offset, batch_size)
+
+    if format == "ndjson":
+        def lines():
+            stop = None if limit is None else offset + limit
+            for index, commitment in indexed(stop, batch_size=COMMITMENT_STREAM_BATCH):
+                yield dumps({"index": index, **commitment_view(commitment)}) + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    limit = limit or COMMITMENT_PAGE_SIZE
+    page = [
+        {"index": index, **commitment_view(commitment)}
+        for index, commitment in indexed(offset + limit)
+    ]
+    total = objective.get("commitment_count")
+    if total is None:
+        # Objectives created before commitment_count existed
+        total = repository.count_commitments(object_id)
+    next_offset = offset + len(page)
+    return FastJSONResponse({
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": next_offset if next_offset < total else None,
+        "commitments": page,
+    })
+
+# The only fields /objectives and /recently_published read, plus those of their entity tags
+LIST_FIELDS = {
+    "title": 1, "description": 1, "resolution_date": 1, "committed_people": 1, "committers": 1,
+    "resolution_strategy": 1, "closed": 1, **VALIDATOR_FIELDS,
+}
+
+def find_listing(response: Response, if_none_match: Optional[str], sort: Tuple[str, int], limit: int,
+                 closed_only: bool = False):
+    """
+    The listed objectives, with the listing's validators set on `response`; or a 304
+    response when If-None-Match still matches, after reading only VALIDATOR_FIELDS.
+    """
+    if not DEADLINE_RESOLVER_ENABLED:
+        resolve_on_read(repository.find_public(RESOLUTION_DUE_FIELDS, sort, limit, closed_only))
+    if if_none_match:
+        headers = listing_validators(repository.find_public(VALIDATOR_FIELDS, sort, limit, closed_only))
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers)
+    objectives = repository.find_public(LIST_FIELDS, sort, limit, closed_only)
+    response.headers.update(listing_validators(objectives))
+    return objectives
 
 @app.get("/objectives")
-def list_objectives(sort_by: str = "created_at"):
+def list_objectives(response: Response, sort_by: str = "created_at", if_none_match: Optional[str] = Header(None)):
     # Only return public objectives
     # Sorting: created_at (newest), resolution_date (closing soon), title
     
-    cursor = objectives_col.find({"visibility": {"$ne": "private"}})
-    
     if sort_by == "resolution_date":
-        cursor = cursor.sort("resolution_date", 1) # Earliest deadline first
+        sort = ("resolution_date", 1) # Earliest deadline first
     elif sort_by == "title":
-        cursor = cursor.sort("title", 1)
+        sort = ("title", 1)
     else:
         # Default to newest first (using _id or modified_at)
-        cursor = cursor.sort("_id", -1)
+        sort = ("_id", -1)
         
-    objectives_list = list(cursor.limit(50)) # Reasonable limit
+    objectives_list = find_listing(response, if_none_match, sort, limit=50) # Reasonable limit
+    if isinstance(objectives_list, Response):
+        return objectives_list
 
-    # Run decryption check for each objective
-    for i in range(len(objectives_list)):
-        objectives_list[i] = check_and_update_resolution(objectives_list[i])
-    
     return list(
         map(
             lambda o: {
@@ -568,13 +1492,11 @@ def list_objectives(sort_by: str = "created_at"):
     )
 
 @app.get("/recently_published")
-def get_most_recently_published(limit: int = 10):
+def get_most_recently_published(response: Response, limit: int = 10, if_none_match: Optional[str] = Header(None)):
     # Keep for backward compatibility or specific "Recent" widget, but filter private
-    objectives = (
-        objectives_col.find({"closed": True, "visibility": {"$ne": "private"}})
-        .sort("modified_at", -1)
-        .limit(limit)
-    )
+    objectives = find_listing(response, if_none_match, ("modified_at", -1), limit, closed_only=True)
+    if isinstance(objectives, Response):
+        return objectives
     return list(
         map(
             lambda o: {
@@ -589,13 +1511,57 @@ def get_most_recently_published(limit: int = 10):
         )
     )
 
-@app.get("/debug/objective/{objective_id}")
+@app.get("/debug/objective/{objective_id}", response_class=FastJSONResponse)
 def debug_objective(objective_id: str):
-    objective = objectives_col.find_one({"_id": ObjectId(objective_id)})
+    objective = repository.get(ObjectId(objective_id))
     if objective is None:
         raise HTTPException(status_code=404, detail="Objective not found")
+    objective = restore_archived(objective)
     objective["_id"] = str(objective["_id"])
-    return jsonable_encoder(objective)
+    summary = load_resolution_summary(objective["_id"])
+    estimate = resolution_estimate(summary)
+    objective["cost_estimate"] = {**estimate.to_dict(), "admission": admission_decision(estimate)}
+    return FastJSONResponse(objective)
+
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    """Liveness: the process is serving requests. Does not touch the database."""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    """Readiness: warm-up has finished and the database answers a ping. 503 otherwise."""
+    if not ready.is_set():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    try:
+        repository.ping(READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse({"status": "unavailable"}, status_code=503)
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request, MongoDB and decryption metrics in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/debug/decryption_stats")
+def debug_decryption_stats(objective_id: Optional[str] = None):
+    """Stats of recent decryption runs (disabled unless DECRYPTION_METRICS_ENABLED is set)."""
+    if not DECRYPTION_METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    with recent_decryption_stats_lock:
+        if objective_id is None:
+            return [
+                {"objective_id": oid, **stats}
+                for oid, stats in reversed(recent_decryption_stats.items())
+            ]
+        stats = recent_decryption_stats.get(objective_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No decryption stats for this objective")
+    return stats
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
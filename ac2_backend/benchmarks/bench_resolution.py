@@ -0,0 +1,236 @@
+"""
+Resolution benchmarks for core/commit_classes.py.
+
+Run from the repository root:
+
+    python -m ac2_backend.benchmarks.bench_resolution --sizes 8 16 --output bench.json
+    python -m ac2_backend.benchmarks.bench_resolution --compare old.json bench.json
+
+Run once with --workers 1 and once with --workers N, then --compare the two
+files, to see what the parallel search buys on this machine.
+
+Every workload also reports CommitDecrypter.estimate_cost next to the measured
+time; a "?" marks a measured median outside the estimated range (by more than
+ESTIMATE_SLACK), which means the cost constants need recalibrating. Honest
+workloads are also resolved with the plaintext reference resolver
+(core/threshold_encrypted.py); a "!" marks a revealed count that differs from it.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from ac2_backend.core.commit_classes import CommitDecrypter
+from ac2_backend.core.threshold_encrypted import resolve_plaintext
+from ac2_backend.benchmarks.workloads import DISTRIBUTIONS, DECLINE, Workload, build_commitments
+
+# Metrics where a larger value in the new run is a regression
+COMPARED_METRICS = ("commit_ms.mean", "decrypt_ms.median", "combinations_explored", "peak_memory_kb")
+# Factor by which a measurement may fall outside the estimated range before it is flagged
+ESTIMATE_SLACK = 2.0
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def time_commits(workload: Workload) -> List[float]:
+    encrypter = workload.encrypter()
+    samples = []
+    for name, t in zip(workload.names, workload.thresholds):
+        start = time.perf_counter()
+        encrypter.commit(name, threshold=-1 if t == DECLINE else t)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def make_decrypter(workload: Workload, commitments) -> CommitDecrypter:
+    decrypter = CommitDecrypter(workload.n)
+    for ciphertext, points in commitments:
+        decrypter.add_commitment(ciphertext, points)
+    return decrypter
+
+
+def expected_revealed(workload: Workload):
+    """Names the plaintext resolver reveals, or None for workloads with corrupted shares."""
+    if workload.corrupted_indices():
+        return None
+    preferences = [(name, -1 if t == DECLINE else t) for name, t in zip(workload.names, workload.thresholds)]
+    return resolve_plaintext(preferences, workload.names, workload.min_count).names
+
+
+def run_workload(workload: Workload, repeat: int, measure_memory: bool = True, workers: int = 1) -> dict:
+    commit_samples = time_commits(workload)
+    commitments = build_commitments(workload)
+
+    estimate = make_decrypter(workload, commitments).estimate_cost()
+    decrypt_samples = []
+    for _ in range(repeat):
+        decrypter = make_decrypter(workload, commitments)
+        start = time.perf_counter()
+        revealed, _ = decrypter.decrypt_with_details(workers=workers)
+        decrypt_samples.append((time.perf_counter() - start) * 1000)
+
+    peak = None
+    if measure_memory:
+        # Separate pass: tracemalloc slows allocation-heavy code down a lot, so it
+        # must not share a run with the timings above
+        decrypter = make_decrypter(workload, commitments)
+        tracemalloc.start()
+        # Only this process is traced, so measure the in-process search
+        decrypter.decrypt_with_details()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    decrypt_ms = summarize(decrypt_samples)
+    expected = expected_revealed(workload)
+    estimated_ms = {"min": estimate.min_seconds * 1000, "max": estimate.max_seconds * 1000}
+    return {
+        "workload": workload.params(),
+        "commit_ms": summarize(commit_samples),
+        "decrypt_ms": decrypt_ms,
+        "estimated_ms": estimated_ms,
+        "within_estimate": (
+            estimated_ms["min"] / ESTIMATE_SLACK <= decrypt_ms["median"] <= estimated_ms["max"] * ESTIMATE_SLACK
+            # Runs below a millisecond are dominated by fixed overhead the model ignores
+            or decrypt_ms["median"] < 1.0
+        ),
+        "combinations_explored": decrypter.stats.combinations_explored,
+        "cap_reached": decrypter.stats.cap_reached,
+        "recover_coeffs_calls": decrypter.stats.recover_coeffs_calls,
+        "decrypt_attempts": decrypter.stats.decrypt_attempts,
+        "revealed": len(revealed),
+        "expected_revealed": None if expected is None else len(expected),
+        # Only meaningful when no level reached MAX_COMBS
+        "matches_reference": expected is None or decrypter.stats.cap_reached or expected == revealed,
+        "peak_memory_kb": peak / 1024 if peak is not None else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> dict:
+    results = []
+    for distribution in args.distributions:
+        for n in args.sizes:
+            for min_count in args.min_counts:
+                workload = Workload(
+                    distribution, n, min_count=min(min_count, n), seed=args.seed,
+                    corrupt_fraction=args.corrupt_fraction,
+                )
+                result = run_workload(
+                    workload, args.repeat, measure_memory=not args.skip_memory, workers=args.workers
+                )
+                print(
+                    f"{workload.label:<32} commit {result['commit_ms']['mean']:8.3f} ms  "
+                    f"decrypt {result['decrypt_ms']['median']:10.2f} ms  "
+                    f"est {result['estimated_ms']['min']:9.2f}-{result['estimated_ms']['max']:<10.2f}"
+                    f"{' ' if result['within_estimate'] else '?'} "
+                    f"combs {result['combinations_explored']:>8}  "
+                    f"revealed {result['revealed']:>4}{' ' if result['matches_reference'] else '!'} "
+                    f"peak {result['peak_memory_kb'] or 0:9.1f} KiB",
+                    file=sys.stderr,
+                )
+                results.append(result)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+
+
+def _metric(result: dict, path: str) -> float:
+    value = result
+    for part in path.split("."):
+        value = value[part]
+    return value
+
+
+def compare(old_path: str, new_path: str, tolerance: float) -> int:
+    """Print per-workload ratios new/old and return the number of regressions."""
+    with open(old_path) as f:
+        old = {json.dumps(r["workload"], sort_keys=True): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for result in new:
+        key = json.dumps(result["workload"], sort_keys=True)
+        if key not in old:
+            continue
+        w = result["workload"]
+        cells = []
+        for metric in COMPARED_METRICS:
+            before, after = _metric(old[key], metric), _metric(result, metric)
+            if before is None or after is None:
+                continue
+            ratio = after / before if before else (1.0 if not after else float("inf"))
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = " !"
+                regressions += 1
+            cells.append(f"{metric} x{ratio:.2f}{flag}")
+        print(f"{w['distribution']}/n={w['n']}/min={w['min_count']}: " + ", ".join(cells))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CommitEncrypter/CommitDecrypter resolution.")
+    # Adversarial workloads grow combinatorially with n; keep them small
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--min-counts", type=int, nargs="+", default=[1])
+    parser.add_argument("--corrupt-fraction", type=float, default=0.25)
+    parser.add_argument("--seed", default="ac2-bench")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes per decryption (see CommitDecrypter.decrypt_with_details)")
+    parser.add_argument("--skip-memory", action="store_true",
+                        help="Skip the (slow) tracemalloc pass that measures peak memory")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="Compare two result files instead of running")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.tolerance) else 0
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
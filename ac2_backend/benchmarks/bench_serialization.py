@@ -0,0 +1,158 @@
+"""
+Serialization and compression benchmark for point-heavy responses (responses.py).
+
+Builds the body of GET /objective/{id}?include_commitments=true for objectives of
+several sizes and measures, for each encoder, the time to turn it into JSON bytes,
+then the size and time of each content coding on the wire. Run from the
+repository root:
+
+    python -m ac2_backend.benchmarks.bench_serialization --sizes 100 1000 5000
+
+Encoders: "fastapi" is what a returned dict went through before (jsonable_encoder,
+then JSONResponse), "json" is responses.dumps without orjson and "orjson" is
+responses.dumps with it (skipped when orjson is not installed). Brotli is skipped
+when the brotli package is not installed.
+
+--points sets the points per commitment. The default of 100 (capped at the group
+size) is an objective declaring 100 allowed_thresholds; one point per member is
+what an objective without allowed_thresholds stores, and becomes gigabytes at 5,000.
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ac2_backend import responses
+from ac2_backend.benchmarks.workloads import MOD, stored_objective
+
+
+def view_body(n: int, points: int, rng: random.Random) -> dict:
+    """The body serve_view returns with include_commitments, half the group revealed at level n // 2."""
+    level = max(1, n // 2)
+    commitments = []
+    for idx, c in enumerate(stored_objective(n, points, rng)["commitments"]):
+        commitment = {
+            "ciphertext": c["ciphertext"],
+            "points": c["points"],
+            "committed_at": c["committed_at"],
+            "decrypted": idx < level,
+        }
+        if idx < level:
+            commitment.update(decrypted_name=f"member-{idx}", threshold=level, decryption_level=level)
+        commitments.append(commitment)
+    return {
+        "title": "Benchmark objective",
+        "description": "Serialization benchmark",
+        "resolution_date": "2025-01-01T00:00:00",
+        "closed": True,
+        "committed_people": [f"member-{idx}" for idx in range(level)],
+        "commitment_count": n,
+        "decrypted_count": level,
+        "resolution_strategy": "DEADLINE",
+        "minimum_number": 1,
+        "allowed_thresholds": None,
+        "eligible_count": n,
+        "invited_count": n,
+        "commitments": commitments,
+        "level_coefficients": {str(level): [str(rng.randrange(MOD)) for _ in range(level)]},
+    }
+
+
+def encoders() -> Dict[str, Callable[[dict], bytes]]:
+    def standard_library(content):
+        orjson, responses.orjson = responses.orjson, None
+        try:
+            return responses.dumps(content)
+        finally:
+            responses.orjson = orjson
+
+    found = {
+        "fastapi": lambda content: JSONResponse(content=jsonable_encoder(content)).body,
+        "json": standard_library,
+    }
+    if responses.orjson is not None:
+        found["orjson"] = responses.dumps
+    return found
+
+
+def codings(gzip_level: int, brotli_quality: int) -> Dict[str, Callable[[bytes], bytes]]:
+    found = {"gzip": lambda body: gzip.compress(body, gzip_level)}
+    if responses.brotli is not None:
+        found["br"] = lambda body: responses.brotli.compress(body, quality=brotli_quality)
+    return found
+
+
+def timed(fn, arg, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    return out, statistics.median(samples)
+
+
+def measure(n: int, points: int, args) -> dict:
+    body = view_body(n, points, random.Random(f"{args.seed}:{n}"))
+    result = {"n": n, "points": points, "serialize_ms": {}, "wire": {}}
+    raw = None
+    for name, encode in encoders().items():
+        out, ms = timed(encode, body, args.repeat)
+        if raw is not None and json.loads(out) != json.loads(raw):
+            raise AssertionError(f"{name} output differs from the other encoders")
+        raw = out
+        result["serialize_ms"][name] = ms
+    result["wire"]["identity"] = {"bytes": len(raw), "compress_ms": 0.0}
+    for name, compress in codings(args.gzip_level, args.brotli_quality).items():
+        out, ms = timed(compress, raw, args.repeat)
+        result["wire"][name] = {"bytes": len(out), "compress_ms": ms}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and compression of objective views.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--points", type=int, default=100, help="Points per commitment (capped at the group size)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gzip-level", type=int, default=1)
+    parser.add_argument("--brotli-quality", type=int, default=1)
+    parser.add_argument("--seed", default="ac2-bench")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        result = measure(n, min(args.points, n), args)
+        print(
+            f"n={n:<6} points={result['points']:<4} "
+            + "  ".join(f"{name} {ms:9.1f} ms" for name, ms in result["serialize_ms"].items())
+            + "  |  "
+            + "  ".join(
+                f"{name} {wire['bytes'] / 1024:9.1f} KiB ({wire['compress_ms']:.1f} ms)"
+                for name, wire in result["wire"].items()
+            ),
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = {
+        "meta": {"orjson": responses.orjson is not None, "brotli": responses.brotli is not None,
+                 "gzip_level": args.gzip_level, "brotli_quality": args.brotli_quality, "repeat": args.repeat},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Cold-start benchmark for the API process (backend.py).
+
+Each run is a fresh interpreter, as in a newly started container. Measures the
+time to import the backend module, which modules that import loaded (pymongo's
+client, NumPy, SciPy) and, unless --no-server is given, how long a uvicorn
+server takes to answer /healthz and then /readyz. Run from the repository root:
+
+    python -m ac2_backend.benchmarks.bench_startup --runs 5
+    python -m ac2_backend.benchmarks.bench_startup --database-uri mongodb://localhost:27017/ --top 15
+
+DATABASE_URI defaults to an unresolvable mongodb+srv URI, so nothing waits on a
+database: the import and /healthz must not need one, and /readyz is then
+reported as not ready (null) after --ready-timeout seconds. Pass a reachable
+--database-uri to time readiness too. The server runs are skipped when uvicorn
+is not installed. --top lists the slowest imports from python -X importtime.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UNREACHABLE_URI = "mongodb+srv://ac2-bench.invalid/"
+# Modules the API path should not load at import time
+WATCHED_MODULES = ["pymongo.mongo_client", "numpy", "scipy", "ac2_backend.core.threshold_encrypted"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ac2_backend.backend
+elapsed = time.perf_counter() - start
+print(json.dumps({"import_ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (WATCHED_MODULES,)
+
+
+def environment(database_uri: str) -> Dict[str, str]:
+    env = dict(os.environ, DATABASE_URI=database_uri)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPOSITORY_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import(env: Dict[str, str]) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=env, cwd=REPOSITORY_ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[dict]:
+    """The top-level packages with the largest cumulative import time, from -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ac2_backend.backend"], env=env, cwd=REPOSITORY_ROOT,
+        capture_output=True, text=True, check=True,
+    )
+    packages: Dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # A package's cumulative time includes its submodules, so keep its largest entry
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), int(cumulative) / 1000)
+    rows = [{"module": name, "cumulative_ms": ms} for name, ms in packages.items() if name != "ac2_backend"]
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def answers(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def wait_for(url: str, start: float, timeout: float) -> Optional[float]:
+    """Milliseconds from start until url answers 200, or None after timeout seconds."""
+    while time.perf_counter() - start < timeout:
+        if answers(url):
+            return (time.perf_counter() - start) * 1000
+        time.sleep(0.01)
+    return None
+
+
+def measure_server(env: Dict[str, str], ready_timeout: float) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "ac2_backend.backend:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=REPOSITORY_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        healthy = wait_for(f"http://127.0.0.1:{port}/healthz", start, timeout=60)
+        ready = wait_for(f"http://127.0.0.1:{port}/readyz", start, ready_timeout) if healthy is not None else None
+        return {"healthz_ms": healthy, "readyz_ms": ready}
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def summary(samples: List[Optional[float]]) -> Optional[dict]:
+    values = [s for s in samples if s is not None]
+    if not values:
+        return None
+    return {"median": statistics.median(values), "min": min(values), "max": max(values), "n": len(values)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark API cold starts.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-uri", default=UNREACHABLE_URI)
+    parser.add_argument("--ready-timeout", type=float, default=5.0, help="Seconds to wait for /readyz")
+    parser.add_argument("--no-server", action="store_true", help="Only time the import")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest imports")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    env = environment(args.database_uri)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    report = {
+        "meta": {"python": sys.version.split()[0], "runs": args.runs,
+                 "database_uri": args.database_uri, "ready_timeout": args.ready_timeout},
+        "import_ms": summary([run["import_ms"] for run in imports]),
+        "loaded_at_import": imports[-1]["loaded"],
+    }
+    print(f"import  {report['import_ms']['median']:8.1f} ms  loaded: {report['loaded_at_import']}", file=sys.stderr)
+
+    if not args.no_server:
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            print("uvicorn is not installed; skipping the server runs", file=sys.stderr)
+        else:
+            servers = [measure_server(env, args.ready_timeout) for _ in range(args.runs)]
+            report["healthz_ms"] = summary([run["healthz_ms"] for run in servers])
+            report["readyz_ms"] = summary([run["readyz_ms"] for run in servers])
+            for name in ("healthz_ms", "readyz_ms"):
+                value = report[name]
+                print(f"{name[:-3]:<7} {value['median']:8.1f} ms" if value else f"{name[:-3]:<7} not ready",
+                      file=sys.stderr)
+
+    if args.top:
+        report["slowest_imports"] = slowest_imports(env, args.top)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Write-volume benchmark for storing resolution results (resolution_writes.py).
+
+Compares the BSON size of the update documents sent to MongoDB when names are
+revealed: the previous whole-array $set of commitments against the positional
+delta from resolution_update. Run from the repository root:
+
+    python -m ac2_backend.benchmarks.bench_writes --sizes 50 100 200 400
+    python -m ac2_backend.benchmarks.bench_writes --sizes 1000 5000 --points 4
+
+--points sets the points per commitment (default: one per member, as for
+objectives without allowed_thresholds).
+"""
+import argparse
+import json
+import random
+import sys
+from typing import Dict, List
+
+import bson
+
+from ac2_backend.benchmarks.workloads import MOD, stored_objective
+from ac2_backend.resolution_writes import level_coefficients_from_details, resolution_update
+
+
+def details_for(indices: List[int], level: int, rng: random.Random) -> Dict[int, Dict]:
+    coefficients = [rng.randrange(MOD) for _ in range(level)]
+    return {
+        idx: {"name": f"member-{idx}", "threshold": level, "coefficients": coefficients, "level": level}
+        for idx in indices
+    }
+
+
+def full_array_update(objective, decryption_details: Dict[int, Dict]) -> dict:
+    """The update written before delta writes: every commitment, copied and $set back."""
+    commitments = []
+    for idx, commitment in enumerate(objective["commitments"]):
+        updated = dict(commitment)
+        if idx in decryption_details:
+            detail = decryption_details[idx]
+            updated.update(
+                decrypted=True,
+                decrypted_name=detail["name"],
+                threshold=detail["threshold"],
+                decryption_level=detail["level"],
+            )
+        else:
+            updated["decrypted"] = False
+        commitments.append(updated)
+    return {"$set": {
+        "commitments": commitments,
+        "level_coefficients": level_coefficients_from_details(decryption_details),
+    }}
+
+
+def apply_details(objective, decryption_details: Dict[int, Dict]):
+    """What the stored document looks like after a resolution wrote decryption_details."""
+    for idx, commitment in enumerate(objective["commitments"]):
+        detail = decryption_details.get(idx)
+        commitment["decrypted"] = detail is not None
+        if detail is not None:
+            commitment.update(decrypted_name=detail["name"], threshold=detail["threshold"],
+                              decryption_level=detail["level"])
+    objective["level_coefficients"] = level_coefficients_from_details(decryption_details)
+
+
+def measure(n: int, points: int, seed: str) -> dict:
+    rng = random.Random(f"{seed}:{n}")
+    objective = stored_objective(n, points, rng)
+    level = max(1, n // 2)
+    half = details_for(list(range(level)), level, rng)
+
+    scenarios = {}
+    # First resolution: half the group is revealed at once
+    scenarios["first_resolution"] = (dict(objective, commitments=[dict(c) for c in objective["commitments"]]), half)
+    # One more name revealed at the same level after the first resolution was stored
+    apply_details(objective, half)
+    one_more = dict(half)
+    one_more.update(details_for([level], level, rng))
+    one_more[level]["coefficients"] = half[0]["coefficients"]
+    scenarios["one_more_name"] = (objective, one_more)
+
+    result = {"n": n, "points": points, "document_bytes": len(bson.encode(objective))}
+    for name, (stored, details) in scenarios.items():
+        before = len(bson.encode(full_array_update(stored, details)))
+        after = len(bson.encode(resolution_update(stored, details)))
+        result[name] = {"full_array_bytes": before, "delta_bytes": after, "ratio": before / after}
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare resolution write volume: whole array vs positional delta.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--points", type=int, help="Points per commitment (default: one per member)")
+    parser.add_argument("--seed", default="ac2-bench")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        result = measure(n, args.points or n, args.seed)
+        print(
+            f"n={n:<6} points={result['points']:<6} document {result['document_bytes'] / 1024:10.1f} KiB  "
+            + "  ".join(
+                f"{name} {result[name]['full_array_bytes'] / 1024:10.1f} -> {result[name]['delta_bytes'] / 1024:8.1f} KiB"
+                for name in ("first_resolution", "one_more_name")
+            ),
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = {"results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""
+End-to-end load test of the HTTP API (backend.py).
+
+Two scenarios, each run for every objective size in --sizes:
+
+- commit: --objectives fresh objectives of n members each receive one
+  PATCH /commit/{id} per member, sent by --concurrency clients at once in a
+  shuffled order, so clients race for the same objectives. Reports commits
+  stored per second, and latency percentiles of all commit requests.
+- view: one objective holding n commitments (filled through the batch endpoint)
+  is read with --view-requests GET /objective/{id}, --concurrency at a time.
+  With --conditional the requests carry If-None-Match, like a polling client.
+
+Thresholds come from workloads.generate_thresholds (--distribution), so
+"all-declines" and "clustered" give different point mixes; --levels declares
+allowed_thresholds, which stores that many points per commitment instead of n.
+Run from the repository root:
+
+    # In process, against a local mongod (DATABASE_URI, default mongodb://localhost:27017/)
+    python -m ac2_backend.benchmarks.loadtest --sizes 50 200 --concurrency 8
+    # In process, against mongomock (pip install mongomock): measures the app alone
+    python -m ac2_backend.benchmarks.loadtest --database memory --sizes 50 200 1000 --levels 20
+    # In process, against the embedded SQLite repository (a temporary file unless --sqlite-path)
+    python -m ac2_backend.benchmarks.loadtest --database sqlite --sizes 50 200 --concurrency 8
+    # Over HTTP, against a running server
+    python -m ac2_backend.benchmarks.loadtest --url http://127.0.0.1:8000 --scenarios view
+
+In process, requests go through httpx's ASGI transport with the app's lifespan
+running, so the middleware, the thread pool for endpoints and the background
+workers are those of a server; only the network and uvicorn are missing. The
+objectives created are deleted afterwards unless --keep is given (over HTTP
+there is no delete endpoint, so they stay).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+from ac2_backend.benchmarks.workloads import DECLINE, generate_thresholds
+
+# The API cannot send tampered shares, so the adversarial mix is not offered here
+THRESHOLD_MIXES = ("uniform", "clustered", "all-declines")
+STORED = "Commitment stored."
+BUSY = "The objective is busy with other commitments. Please try again."
+# Commitments sent per POST /commit/{id}/batch while filling objectives
+FILL_BATCH = 500
+
+
+def latency_summary(samples: List[float]) -> Optional[Dict[str, float]]:
+    """Percentiles (nearest rank) of latencies in milliseconds."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": ordered[-1],
+    }
+
+
+class Target:
+    """An httpx client on the app, in process or over HTTP, plus what was created through it."""
+
+    def __init__(self, args):
+        self.args = args
+        self.backend = None
+        self.created: List[str] = []
+        self._lifespan = None
+
+    async def __aenter__(self) -> "Target":
+        if self.args.url:
+            self.client = httpx.AsyncClient(base_url=self.args.url, timeout=self.args.timeout)
+        else:
+            self.backend = load_backend(self.args.database, self.args.sqlite_path)
+            self._lifespan = self.backend.app.router.lifespan_context(self.backend.app)
+            await self._lifespan.__aenter__()
+            self.client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=self.backend.app), base_url="http://loadtest",
+                timeout=self.args.timeout,
+            )
+        await self.wait_ready()
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            if self.backend is not None and not self.args.keep and self.created:
+                from bson import ObjectId
+
+                for objective_id in self.created:
+                    await asyncio.to_thread(self.backend.repository.delete, ObjectId(objective_id))
+        finally:
+            await self.client.aclose()
+            if self._lifespan is not None:
+                await self._lifespan.__aexit__(*exc)
+
+    async def wait_ready(self, timeout: float = 30.0):
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                if (await self.client.get("/readyz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"{self.args.url or 'the app'} did not become ready within {timeout:.0f}s")
+            await asyncio.sleep(0.1)
+
+    async def create_objective(self, n: int, label: str) -> str:
+        body = {
+            "title": f"loadtest {label}",
+            "description": "Created by benchmarks/loadtest.py",
+            "eligible_names": member_names(n),
+            # Far enough ahead that the deadline resolver leaves it alone during the run
+            "resolution_date": (datetime.utcnow() + timedelta(days=30)).isoformat(),
+            "resolution_strategy": self.args.strategy,
+        }
+        if self.args.levels:
+            body["allowed_thresholds"] = allowed_levels(n, self.args.levels)
+        response = await self.client.post("/objective", json=body)
+        response.raise_for_status()
+        objective_id = response.json()["objective_id"]
+        self.created.append(objective_id)
+        return objective_id
+
+
+def load_backend(database: str, sqlite_path: Optional[str] = None):
+    """Import backend.py against a local mongod (DATABASE_URI), mongomock ("memory") or SQLite."""
+    if database == "sqlite":
+        path = sqlite_path or os.path.join(tempfile.mkdtemp(prefix="ac2-loadtest-"), "objectives.db")
+        os.environ["DATABASE_URI"] = f"sqlite:///{os.path.abspath(path)}"
+    elif database == "memory":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("--database memory needs mongomock: pip install mongomock")
+        import pymongo
+
+        # backend.py creates its client on first use through pymongo.MongoClient
+        pymongo.MongoClient = mongomock.MongoClient
+        os.environ["DATABASE_URI"] = "mongodb://localhost:27017/"
+    else:
+        os.environ.setdefault("DATABASE_URI", "mongodb://localhost:27017/")
+    from ac2_backend import backend
+
+    return backend
+
+
+def member_names(n: int) -> List[str]:
+    return [f"member-{i}" for i in range(n)]
+
+
+def allowed_levels(n: int, levels: int) -> List[int]:
+    """`levels` thresholds spread over 1..n."""
+    return sorted({max(1, round(n * (i + 1) / levels)) for i in range(min(levels, n))})
+
+
+def thresholds_for(n: int, args, salt: str) -> List[int]:
+    thresholds = generate_thresholds(args.distribution, n, random.Random(f"{args.seed}:{salt}"))
+    if not args.levels:
+        return thresholds
+    # Round up to a declared level, as a member choosing among allowed_thresholds would
+    levels = allowed_levels(n, args.levels)
+    return [t if t == DECLINE else next(level for level in levels if level >= t) for t in thresholds]
+
+
+async def run_clients(concurrency: int, jobs: List, send) -> float:
+    """Run send(job) for every job with `concurrency` clients; the wall time in seconds."""
+    queue = iter(jobs)
+
+    async def client():
+        for job in queue:
+            await send(job)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def commit_scenario(target: Target, n: int, args) -> dict:
+    jobs = []
+    for k in range(args.objectives):
+        objective_id = await target.create_objective(n, f"commit n={n}")
+        thresholds = thresholds_for(n, args, f"commit:{n}:{k}")
+        jobs += [(objective_id, name, t) for name, t in zip(member_names(n), thresholds)]
+    random.Random(f"{args.seed}:order:{n}").shuffle(jobs)
+
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+
+    async def send(job):
+        objective_id, name, threshold = job
+        start = time.perf_counter()
+        try:
+            response = await target.client.patch(f"/commit/{objective_id}", json={"name": name, "Number": threshold})
+            message = response.json().get("message") if response.status_code == 200 else f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            message = type(e).__name__
+        latencies.append((time.perf_counter() - start) * 1000)
+        outcomes["stored" if message == STORED else "busy" if message == BUSY else message] += 1
+
+    elapsed = await run_clients(args.concurrency, jobs, send)
+    return {
+        "scenario": "commit",
+        "n": n,
+        "objectives": args.objectives,
+        "requests": len(jobs),
+        "seconds": elapsed,
+        "stored_per_second": outcomes["stored"] / elapsed,
+        "requests_per_second": len(jobs) / elapsed,
+        "outcomes": dict(outcomes),
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+async def fill(target: Target, objective_id: str, n: int, args):
+    thresholds = thresholds_for(n, args, f"view:{n}")
+    commitments = [{"name": name, "Number": t} for name, t in zip(member_names(n), thresholds)]
+    for start in range(0, n, FILL_BATCH):
+        response = await target.client.post(
+            f"/commit/{objective_id}/batch", json={"commitments": commitments[start:start + FILL_BATCH]}
+        )
+        response.raise_for_status()
+
+
+async def view_scenario(target: Target, n: int, args) -> dict:
+    objective_id = await target.create_objective(n, f"view n={n}")
+    fill_start = time.perf_counter()
+    await fill(target, objective_id, n, args)
+    fill_seconds = time.perf_counter() - fill_start
+
+    path = f"/objective/{objective_id}"
+    params = {"include_commitments": "true"} if args.include_commitments else {}
+    headers = {}
+    if args.conditional:
+        # Poll like a client holding the current version: answered with 304 until it changes
+        first = await target.client.get(path, params=params)
+        headers["If-None-Match"] = first.headers.get("etag", "")
+    latencies: List[float] = []
+    sizes: List[int] = []
+    errors: Counter = Counter()
+    not_modified = 0
+
+    async def send(_):
+        nonlocal not_modified
+        start = time.perf_counter()
+        try:
+            response = await target.client.get(path, params=params, headers=headers)
+            if response.status_code == 304 and args.conditional:
+                not_modified += 1
+            elif response.status_code != 200:
+                errors[f"HTTP {response.status_code}"] += 1
+            elif args.conditional:
+                # Changed since (e.g. resolved in the background): poll with the new version
+                headers["If-None-Match"] = response.headers.get("etag", "")
+            sizes.append(int(response.headers.get("content-length", len(response.content))))
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    elapsed = await run_clients(args.concurrency, range(args.view_requests), send)
+    return {
+        "scenario": "view",
+        "n": n,
+        "include_commitments": args.include_commitments,
+        "conditional": args.conditional,
+        "not_modified": not_modified if args.conditional else None,
+        "fill_seconds": fill_seconds,
+        "requests": args.view_requests,
+        "seconds": elapsed,
+        "requests_per_second": args.view_requests / elapsed,
+        "errors": dict(errors),
+        "response_bytes": statistics.median(sizes) if sizes else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+SCENARIOS = {"commit": commit_scenario, "view": view_scenario}
+
+
+async def run(args) -> dict:
+    results = []
+    async with Target(args) as target:
+        for n in args.sizes:
+            for scenario in args.scenarios:
+                result = await SCENARIOS[scenario](target, n, args)
+                latency = result["latency_ms"] or {}
+                print(
+                    f"{scenario:<6} n={n:<6} {result['requests_per_second']:8.1f} req/s  "
+                    + (f"{result['stored_per_second']:8.1f} stored/s  " if scenario == "commit" else "")
+                    + f"p50 {latency.get('p50', 0):8.1f} ms  p95 {latency.get('p95', 0):8.1f} ms  "
+                    f"p99 {latency.get('p99', 0):8.1f} ms",
+                    file=sys.stderr,
+                )
+                results.append(result)
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "target": args.url or f"in-process ({args.database})",
+            "concurrency": args.concurrency,
+            "distribution": args.distribution,
+            "levels": args.levels,
+            "strategy": args.strategy,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the AC2 HTTP API.")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in process)")
+    parser.add_argument("--database", choices=("mongo", "memory", "sqlite"), default="mongo",
+                        help="In process: a local mongod (DATABASE_URI), mongomock or SQLite")
+    parser.add_argument("--sqlite-path", help="SQLite file for --database sqlite (default: a temporary file)")
+    parser.add_argument("--scenarios", nargs="+", choices=tuple(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--objectives", type=int, default=2, help="Objectives committed to at once (commit)")
+    parser.add_argument("--view-requests", type=int, default=200)
+    parser.add_argument("--include-commitments", action="store_true", help="View with ?include_commitments=true")
+    parser.add_argument("--conditional", action="store_true",
+                        help="View with If-None-Match holding the latest ETag seen, as a polling client would")
+    parser.add_argument("--distribution", choices=THRESHOLD_MIXES, default="uniform")
+    parser.add_argument("--levels", type=int, default=0, help="Declare this many allowed_thresholds (0: none)")
+    parser.add_argument("--strategy", default="DEADLINE", help="resolution_strategy of the objectives")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", default="ac2-loadtest")
+    parser.add_argument("--keep", action="store_true", help="Keep the objectives created (in process)")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    # backend.py logs at INFO, which would include a line per request from httpx
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
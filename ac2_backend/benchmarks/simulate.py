@@ -0,0 +1,246 @@
+"""
+Monte Carlo sizing of objectives with ThresholdEncryptedModel.
+
+Each trial draws a threshold profile for a group size and distribution (see
+workloads.py), builds a model and records how many names resolve() reveals and
+where find_equilibria puts the equilibria. Trials run in chunks across a process
+pool; each chunk has its own RNG seeded from (seed, distribution, n, first
+trial), so results do not depend on --workers, and each chunk returns only
+aggregate counts, which are merged as they arrive.
+
+Run from the repository root:
+
+    python -m ac2_backend.benchmarks.simulate --sizes 20 50 100 --trials 5000 --workers 8
+    python -m ac2_backend.benchmarks.simulate --sizes 20 --trials 200 --encrypted --output sim.json
+
+Without --encrypted the models skip the encryption scheme and resolve with
+resolve_plaintext, which reveals the same names without encrypting anything.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ac2_backend.core.threshold_encrypted import ThresholdEncryptedModel
+from ac2_backend.benchmarks.workloads import DECLINE, generate_thresholds
+
+# Adversarial workloads differ from others by their corrupted shares, which the model does not have
+DISTRIBUTIONS = ("uniform", "clustered", "all-declines")
+CHUNK_SIZE = 100
+
+
+@dataclass
+class SimulationStats:
+    """Aggregates over the trials of one (distribution, n); merged across chunks."""
+    distribution: str
+    n: int
+    trials: int = 0
+    # Revealed count -> trials
+    revealed: Counter = field(default_factory=Counter)
+    # Equilibrium location, rounded to a whole number of people -> occurrences
+    stable: Counter = field(default_factory=Counter)
+    unstable: Counter = field(default_factory=Counter)
+    # Trials without any equilibrium within [0, n]
+    no_equilibrium: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "SimulationStats"):
+        self.trials += other.trials
+        self.revealed.update(other.revealed)
+        self.stable.update(other.stable)
+        self.unstable.update(other.unstable)
+        self.no_equilibrium += other.no_equilibrium
+        self.seconds += other.seconds
+
+    def revealed_percentile(self, q: float) -> Optional[int]:
+        """Nearest-rank percentile of the revealed count."""
+        if not self.trials:
+            return None
+        rank = max(1, int(round(q * self.trials)))
+        seen = 0
+        for count in sorted(self.revealed):
+            seen += self.revealed[count]
+            if seen >= rank:
+                return count
+        return max(self.revealed)
+
+    def to_dict(self) -> Dict:
+        def histogram(counter: Counter) -> Dict[str, int]:
+            return {str(key): counter[key] for key in sorted(counter)}
+
+        trials = self.trials or 1
+        return {
+            "distribution": self.distribution,
+            "n": self.n,
+            "trials": self.trials,
+            "revealed": {
+                "mean": sum(count * times for count, times in self.revealed.items()) / trials,
+                "p5": self.revealed_percentile(0.05),
+                "p50": self.revealed_percentile(0.50),
+                "p95": self.revealed_percentile(0.95),
+                "none": self.revealed[0] / trials,
+                "all": self.revealed[self.n] / trials,
+                "histogram": histogram(self.revealed),
+            },
+            "equilibria": {
+                "stable": histogram(self.stable),
+                "unstable": histogram(self.unstable),
+                "none": self.no_equilibrium / trials,
+            },
+            "trial_ms": self.seconds * 1000 / trials,
+        }
+
+
+def run_chunk(task: Dict) -> SimulationStats:
+    """Run trials [start, start + count) of one (distribution, n). Top level so pool workers can import it."""
+    distribution, n = task["distribution"], task["n"]
+    rng = random.Random(f"{task['seed']}:{distribution}:{n}:{task['start']}")
+    names = [f"member-{i}" for i in range(n)]
+    stats = SimulationStats(distribution, n)
+    started = time.perf_counter()
+    for _ in range(task["count"]):
+        thresholds = generate_thresholds(distribution, n, rng)
+        model = ThresholdEncryptedModel(
+            [(name, -1 if t == DECLINE else t) for name, t in zip(names, thresholds)],
+            min_percentage=task["min_percentage"],
+            encrypted=task["encrypted"],
+        )
+        stats.trials += 1
+        stats.revealed[len(model.resolve())] += 1
+        if task["equilibria"]:
+            equilibria = model.find_equilibria()
+            stats.stable.update(int(round(r)) for r, _ in equilibria["stable"])
+            stats.unstable.update(int(round(r)) for r, _ in equilibria["unstable"])
+            if not equilibria["stable"] and not equilibria["unstable"]:
+                stats.no_equilibrium += 1
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def make_tasks(
+    distributions: Sequence[str], sizes: Sequence[int], trials: int, seed: str, min_percentage: float,
+    equilibria: bool, encrypted: bool, chunk_size: int,
+) -> List[Dict]:
+    for distribution in distributions:
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+    return [
+        {
+            "distribution": distribution, "n": n, "start": start, "count": min(chunk_size, trials - start),
+            "seed": seed, "min_percentage": min_percentage, "equilibria": equilibria, "encrypted": encrypted,
+        }
+        for distribution in distributions
+        for n in sizes
+        for start in range(0, trials, chunk_size)
+    ]
+
+
+def run_simulation(
+    distributions: Sequence[str],
+    sizes: Sequence[int],
+    trials: int,
+    seed: str = "ac2-sim",
+    min_percentage: float = 0.0,
+    equilibria: bool = True,
+    encrypted: bool = False,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[SimulationStats]:
+    """
+    Run `trials` trials per distribution and size, yielding the running aggregate
+    of a (distribution, n) each time one of its chunks finishes. The yielded
+    object keeps being updated; the last one yielded for a key is its result.
+    """
+    tasks = make_tasks(distributions, sizes, trials, seed, min_percentage, equilibria, encrypted, chunk_size)
+    totals: Dict[Tuple[str, int], SimulationStats] = {}
+
+    def merged(chunk: SimulationStats) -> SimulationStats:
+        key = (chunk.distribution, chunk.n)
+        total = totals.setdefault(key, SimulationStats(*key))
+        total.merge(chunk)
+        return total
+
+    if workers <= 1:
+        for task in tasks:
+            yield merged(run_chunk(task))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_chunk, task) for task in tasks]
+        try:
+            for future in as_completed(futures):
+                yield merged(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def simulate(distributions: Sequence[str], sizes: Sequence[int], trials: int, **kwargs) -> List[SimulationStats]:
+    """run_simulation's final aggregates, in the order of distributions and sizes."""
+    totals = {}
+    for stats in run_simulation(distributions, sizes, trials, **kwargs):
+        totals[(stats.distribution, stats.n)] = stats
+    return [totals[(d, n)] for d in distributions for n in sizes if (d, n) in totals]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of threshold profiles.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=["uniform", "clustered"])
+    parser.add_argument("--trials", type=int, default=1000, help="Trials per distribution and size")
+    parser.add_argument("--min-percentage", type=float, default=0.0,
+                        help="ThresholdEncryptedModel's min_percentage (the minimum_number as a share of n)")
+    parser.add_argument("--seed", default="ac2-sim")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Trials per pool task")
+    parser.add_argument("--encrypted", action="store_true",
+                        help="Resolve through CommitEncrypter/CommitDecrypter (slow: O(n^3) per trial)")
+    parser.add_argument("--skip-equilibria", action="store_true", help="Only count revealed names (no SciPy)")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    totals = {}
+    for stats in run_simulation(
+        args.distributions, args.sizes, args.trials, seed=args.seed, min_percentage=args.min_percentage,
+        equilibria=not args.skip_equilibria, encrypted=args.encrypted, workers=args.workers,
+        chunk_size=args.chunk_size,
+    ):
+        totals[(stats.distribution, stats.n)] = stats
+        if stats.trials == args.trials:
+            summary = stats.to_dict()
+            print(
+                f"{stats.distribution}/n={stats.n:<6} trials {stats.trials:>6}  "
+                f"revealed mean {summary['revealed']['mean']:8.2f}  "
+                f"p5/p50/p95 {summary['revealed']['p5']}/{summary['revealed']['p50']}/{summary['revealed']['p95']}  "
+                f"all {summary['revealed']['all']:6.1%}  none {summary['revealed']['none']:6.1%}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "trials": args.trials,
+            "min_percentage": args.min_percentage,
+            "encrypted": args.encrypted,
+            "workers": args.workers,
+            "seconds": time.perf_counter() - started,
+        },
+        "results": [totals[(d, n)].to_dict() for d in args.distributions for n in args.sizes],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
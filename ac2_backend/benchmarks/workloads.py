@@ -0,0 +1,113 @@
+import random
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from ac2_backend.core.commit_classes import NameHolder, CommitEncrypter
+
+MOD = 2**127 - 1
+
+DISTRIBUTIONS = ("uniform", "clustered", "all-declines", "adversarial")
+
+# Thresholds are what PATCH /commit receives in `Number`: 1..n, or 0 for a decline.
+DECLINE = 0
+
+
+@dataclass
+class Workload:
+    """A reproducible objective: group size, threshold distribution and seed."""
+    distribution: str
+    n: int
+    min_count: int = 1
+    seed: str = "ac2-bench"
+    # Only used by the adversarial distribution: share of commitments whose
+    # points do not lie on the objective's polynomials (tampered or replayed shares).
+    corrupt_fraction: float = 0.25
+    thresholds: List[int] = field(init=False)
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {self.distribution!r}, expected one of {DISTRIBUTIONS}")
+        self.thresholds = generate_thresholds(self.distribution, self.n, random.Random(f"{self.seed}:thresholds"))
+
+    @property
+    def names(self) -> List[str]:
+        return [f"member-{i}" for i in range(self.n)]
+
+    @property
+    def label(self) -> str:
+        return f"{self.distribution}/n={self.n}/min={self.min_count}"
+
+    def params(self) -> dict:
+        return {
+            "distribution": self.distribution,
+            "n": self.n,
+            "min_count": self.min_count,
+            "seed": self.seed,
+            "corrupt_fraction": self.corrupt_fraction if self.distribution == "adversarial" else 0.0,
+        }
+
+    def encrypter(self) -> CommitEncrypter:
+        return CommitEncrypter(NameHolder(self.names), self.min_count, seed=self.seed)
+
+    def corrupted_indices(self) -> List[int]:
+        if self.distribution != "adversarial":
+            return []
+        rng = random.Random(f"{self.seed}:corrupt")
+        count = int(round(self.corrupt_fraction * self.n))
+        return sorted(rng.sample(range(self.n), count))
+
+
+def generate_thresholds(distribution: str, n: int, rng: random.Random) -> List[int]:
+    if distribution == "uniform":
+        return [rng.randint(1, n) for _ in range(n)]
+
+    if distribution == "clustered":
+        # Two camps: eager members around n/4, cautious members around 3n/4
+        centres = (n / 4, 3 * n / 4)
+        spread = max(1.0, n / 20)
+        return [max(1, min(n, int(round(rng.gauss(rng.choice(centres), spread))))) for _ in range(n)]
+
+    if distribution == "all-declines":
+        return [DECLINE] * n
+
+    if distribution == "adversarial":
+        # Honest members all wait for half the group. Corrupted shares (see
+        # corrupt_commitment) make every lower level look solvable, so the
+        # decrypter has to search subsets that can never be consistent.
+        return [max(1, n // 2)] * n
+
+    raise ValueError(f"Unknown distribution {distribution!r}")
+
+
+def corrupt_commitment(points: List[Tuple[int, int]], mod: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """Replace every level with a random point that is not on the objective's polynomial."""
+    return [(rng.randint(1, mod - 1), rng.randint(0, mod - 1)) for _ in points]
+
+
+def build_commitments(workload: Workload) -> List[Tuple[str, List[Tuple[int, int]]]]:
+    """Encrypt the workload's commitments the same way PATCH /commit does."""
+    encrypter = workload.encrypter()
+    commitments = []
+    for name, t in zip(workload.names, workload.thresholds):
+        commitments.append(encrypter.commit(name, threshold=-1 if t == DECLINE else t))
+    rng = random.Random(f"{workload.seed}:points")
+    for idx in workload.corrupted_indices():
+        ciphertext, points = commitments[idx]
+        commitments[idx] = (ciphertext, corrupt_commitment(points, encrypter.MOD, rng))
+    return commitments
+
+
+def stored_objective(n: int, points: int, rng: random.Random) -> dict:
+    """An objective document with n undecrypted commitments, shaped like the backend's."""
+    return {
+        "commitments": [
+            {
+                "name": "HIDDEN",
+                "ciphertext": rng.randbytes(24).hex(),
+                "points": [[str(rng.randrange(1, MOD)), str(rng.randrange(MOD))] for _ in range(points)],
+                "committed_at": "2025-01-01T00:00:00",
+                "is_decline": False,
+            }
+            for _ in range(n)
+        ],
+    }
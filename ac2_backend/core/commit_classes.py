@@ -1,8 +1,16 @@
+import bisect
 import hashlib
+import hmac
+import multiprocessing
 import secrets
 import random
-from typing import List, Tuple, Dict, Set, Optional
-from itertools import combinations
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import List, Tuple, Dict, Set, Optional, Sequence, Union
+from math import comb
 
 class NameHolder:
     def __init__(self, names: List[str]):
@@ -33,18 +41,58 @@ class NameHolder:
             return True
         return False
 
+    def release(self, name: str):
+        """
+        Undo check_and_consume for a member, so a simulation can replace its commitment.
+        Callers must only release names they consumed.
+        """
+        self.hashes.add(self._hash_name(name))
+
+def normalize_levels(levels: Optional[Sequence[int]], n: int) -> List[int]:
+    """
+    Sorted, de-duplicated allowed thresholds within [1, n]; every level 1..n when
+    levels is None. Raises ValueError when no declared threshold is within range.
+    """
+    if levels is None:
+        return list(range(1, n + 1))
+    normalized = sorted({int(level) for level in levels if 1 <= int(level) <= n})
+    if not normalized:
+        raise ValueError(f"Allowed thresholds must include a value between 1 and {n}")
+    return normalized
+
+
+def level_for_threshold(threshold: int, levels: Sequence[int], n: int) -> Optional[int]:
+    """
+    Clamp threshold to [1, n] and round it up to the next of the (normalized) levels.
+    None when it is above the highest level: rounding down would reveal the name to
+    fewer people than it asked for.
+    """
+    threshold = max(1, min(threshold, n))
+    idx = bisect.bisect_left(levels, threshold)
+    return levels[idx] if idx < len(levels) else None
+
+
 class CommitEncrypter:
-    def __init__(self, name_holder: NameHolder, min_count: int = 1, seed: str = None):
+    def __init__(
+        self,
+        name_holder: NameHolder,
+        min_count: int = 1,
+        seed: str = None,
+        levels: Optional[Sequence[int]] = None,
+    ):
         """
         Initialize the encryption server state.
         name_holder: The NameHolder instance to verify membership.
         min_count: The minimum number of people required to reveal anything.
                    Rows 0 to min_count-2 will always be noise.
         seed: Optional seed to deterministically initialize coefficients (for testing only).
+        levels: Optional allowed thresholds. Commitments then carry one point per
+                allowed threshold instead of one per level 1..n.
         """
         self.name_holder = name_holder
         self.n = name_holder.group_size
         self.min_count = max(1, min_count)
+        self.levels = normalize_levels(levels, self.n)
         
         # Mersenne Prime 2**127 - 1
         self.MOD = 2**127 - 1
@@ -56,8 +104,8 @@ class CommitEncrypter:
             # Use cryptographically secure random generator
             self.rng = secrets.SystemRandom()
 
-        # Generate coefficients a_0 ... a_{n-1}
-        self.coeffs = [self.rng.randint(0, self.MOD - 1) for _ in range(self.n)]
+        # Generate coefficients a_0 ... a_{L-1} for the highest level L (n unless levels are declared)
+        self.coeffs = [self.rng.randint(0, self.MOD - 1) for _ in range(self.levels[-1] if self.levels else 0)]
 
         # Track used x values to ensure uniqueness
         self.used_xs: Set[int] = set()
@@ -91,19 +139,25 @@ class CommitEncrypter:
         # Return nonce || ciphertext
         return (nonce + ct_bytes).hex()
 
-    def _eval_poly(self, row_idx: int, x: int) -> int:
+    def _eval_poly_many(self, row_idx: int, xs: List[int]) -> List[int]:
         """
-        Evaluate f_row_idx(x) = sum(a_j * x^j) for j=0..row_idx
+        Evaluate f_row_idx at every x in xs.
+        Uses Horner's rule over the shared coefficient prefix, which needs one
+        multiply and one reduction per term instead of tracking x powers.
         """
-        y = 0
-        x_pow = 1
-        for j in range(row_idx + 1):
-            if j >= len(self.coeffs): 
-                break
-            term = (self.coeffs[j] * x_pow) % self.MOD
-            y = (y + term) % self.MOD
-            x_pow = (x_pow * x) % self.MOD
-        return y
+        coeffs = self.coeffs[:row_idx + 1][::-1]
+        MOD = self.MOD
+        ys = []
+        for x in xs:
+            y = 0
+            for a in coeffs:
+                y = (y * x + a) % MOD
+            ys.append(y)
+        return ys
+
+    def round_threshold(self, threshold: int) -> Optional[int]:
+        """The level a commitment with this threshold (1 to n) is made at; None if it has none."""
+        return level_for_threshold(threshold, self.levels, self.n)
 
     def _get_unique_x(self) -> int:
         """Generate a random x that hasn't been used before."""
@@ -120,64 +174,608 @@ class CommitEncrypter:
     def commit(self, name: str, threshold: int) -> Tuple[str, List[Tuple[int, int]]]:
         """
         Returns (ciphertext, points).
-        points is a list of (x, y) tuples for each level i=0..n-1.
+        points is a list of (x, y) tuples, one for each level in self.levels.
         Points below the noise limit are (0, 0) to indicate no data.
         threshold: raw number of people required (1 to n). -1 for never.
+                   With declared levels it is rounded up to the next allowed threshold;
+                   above the highest one it stores noise like -1.
         """
-        # Check membership and consume name to prevent duplicate commits
-        if not self.name_holder.check_and_consume(name):
-            # Not in group or already used: Return all zeros
-            points = [(0, 0) for _ in range(self.n)]
-            return secrets.token_hex(16), points
-
-        if threshold == -1:
-            # All noise (all zeros) but use a random key for ciphertext to prevent analysis
-            # This ensures "declined" responses look like commitments but are decryptable by nothing
-            points = [(0, 0) for _ in range(self.n)]
-            random_key = secrets.randbelow(self.MOD)
-            ciphertext = self._encrypt_name(random_key, name) # Encrypt with random key
-            return ciphertext, points
-            
-        # Clamp threshold to [1, n]
-        p_m = max(1, min(threshold, self.n))
-        
-        # Encrypt name with key a_{p_m-1}
-        key = self.coeffs[p_m - 1]
-        ciphertext = self._encrypt_name(key, name)
-        
-        points = []
-        
-        # Determine noise floor
-        global_noise_limit = self.min_count - 1
-        user_noise_limit = p_m - 1
-        noise_limit = max(global_noise_limit, user_noise_limit)
-        
-        for i in range(self.n):
-            if i < noise_limit:
-                # Use (0, 0) to indicate no data at this level
-                points.append((0, 0))
-            else:
-                # Generate actual polynomial point
-                x = self._get_unique_x()
-                y = self._eval_poly(i, x)
-                points.append((x, y))
-                
-        return ciphertext, points
+        return self.commit_many([(name, threshold)])[0]
+
+    def commit_many(self, entries: List[Tuple[str, int]]) -> List[Tuple[str, List[Tuple[int, int]]]]:
+        """
+        Commit several (name, threshold) pairs at once, in order.
+        Returns one (ciphertext, points) pair per entry, identical to calling
+        commit() for each entry in turn, but evaluates each level's polynomial
+        for all entries in a single batch.
+        """
+        results = []
+        # level -> [(result index, point index, x)] still waiting for a y value
+        pending: Dict[int, List[Tuple[int, int, int]]] = {}
+
+        for name, threshold in entries:
+            # Check membership and consume name to prevent duplicate commits
+            if not self.name_holder.check_and_consume(name):
+                # Not in group or already used: Return all zeros
+                points = [(0, 0) for _ in self.levels]
+                results.append((secrets.token_hex(16), points))
+                continue
+
+            # Clamp threshold to [1, n], then round up to an allowed level
+            p_m = None if threshold == -1 else self.round_threshold(threshold)
+
+            if p_m is None:
+                # All noise (all zeros) but use a random key for ciphertext to prevent analysis
+                # This ensures "declined" responses look like commitments but are decryptable by nothing
+                points = [(0, 0) for _ in self.levels]
+                random_key = secrets.randbelow(self.MOD)
+                ciphertext = self._encrypt_name(random_key, name) # Encrypt with random key
+                results.append((ciphertext, points))
+                continue
+
+            # Encrypt name with key a_{p_m-1}
+            key = self.coeffs[p_m - 1]
+            ciphertext = self._encrypt_name(key, name)
+
+            # Determine noise floor
+            global_noise_limit = self.min_count - 1
+            user_noise_limit = p_m - 1
+            noise_limit = max(global_noise_limit, user_noise_limit)
+
+            points = []
+            for pos, level in enumerate(self.levels):
+                i = level - 1
+                if i < noise_limit:
+                    # Use (0, 0) to indicate no data at this level
+                    points.append((0, 0))
+                else:
+                    # Draw x now so the RNG sequence matches one-at-a-time commits
+                    x = self._get_unique_x()
+                    pending.setdefault(i, []).append((len(results), pos, x))
+                    points.append(None)
+            results.append((ciphertext, points))
+
+        # Generate actual polynomial points, one batched evaluation per level
+        for level, slots in pending.items():
+            ys = self._eval_poly_many(level, [x for _, _, x in slots])
+            for (res_idx, pt_idx, x), y in zip(slots, ys):
+                results[res_idx][1][pt_idx] = (x, y)
+
+        return results
+
+@dataclass
+class LevelStats:
+    """Work done at one level k of decrypt_with_details."""
+    level: int
+    valid: int  # Commitments with a real point at this level
+    confirmed: int  # ...of which were already decrypted at a lower level
+    path: str = "confirmed"  # "confirmed" fast path, "search" over subsets, or "skipped"
+    seconds: float = 0.0
+    combinations: int = 0
+    cap_reached: bool = False
+    solved: bool = False
+
+
+@dataclass
+class DecryptionStats:
+    """Counters and timings for one decrypt_with_details run."""
+    levels: List[LevelStats] = field(default_factory=list)
+    recover_coeffs_calls: int = 0
+    interpolation_seconds: float = 0.0
+    incremental_updates: int = 0  # Leading coefficients derived from the previous subset's state
+    decrypt_attempts: int = 0
+    decrypt_successes: int = 0
+    key_trial_seconds: float = 0.0
+    combinations_explored: int = 0
+    cap_reached: bool = False
+    cache_hits: int = 0
+    cache_misses: int = 0
+    completed: bool = True  # False when the run stopped early and left a cursor
+    resumed_at: Optional[int] = None  # Level a resumed run started from
+    total_seconds: float = 0.0
+    _level_started: Optional[float] = field(default=None, repr=False)
+
+    def start_level(self, level: int, valid: int, confirmed: int) -> LevelStats:
+        self.end_level()
+        stats = LevelStats(level=level, valid=valid, confirmed=confirmed)
+        self.levels.append(stats)
+        self._level_started = time.perf_counter()
+        return stats
+
+    def end_level(self):
+        if self._level_started is not None:
+            self.levels[-1].seconds = time.perf_counter() - self._level_started
+            self._level_started = None
+
+    def to_dict(self) -> Dict:
+        d = asdict(self)
+        d.pop("_level_started")
+        return d
+
+    def summary(self) -> str:
+        return (
+            f"{self.total_seconds * 1000:.1f} ms, {len(self.levels)} levels tried, "
+            f"{self.recover_coeffs_calls} interpolations ({self.interpolation_seconds * 1000:.1f} ms), "
+            f"{self.decrypt_successes}/{self.decrypt_attempts} key trials ({self.key_trial_seconds * 1000:.1f} ms), "
+            f"{self.combinations_explored} combinations{' (cap reached)' if self.cap_reached else ''}"
+            f"{'' if self.completed else ', stopped early'}"
+        )
+
+
+# Order in which decrypt_with_details enumerates candidate subsets. Stored in
+# SearchCursor so a rank is never resumed under a different order.
+SEARCH_ORDER = "revolving-door"
+
+
+@dataclass
+class SearchCursor:
+    """
+    Where an interrupted decrypt_with_details run stopped.
+    Every level below `level` is finished; at `level` the first `rank` candidate
+    subsets (in enumeration order) have been tried. Only valid while the decrypter
+    holds the same `commitment_count` commitments.
+    """
+    level: int
+    rank: int
+    commitment_count: int
+    confirmed: Dict[int, int] = field(default_factory=dict)  # commitment index -> threshold
+    order: str = SEARCH_ORDER  # Enumeration order `rank` refers to
+
+    def to_dict(self) -> Dict:
+        return {
+            "level": self.level,
+            "rank": self.rank,
+            "commitment_count": self.commitment_count,
+            # Store indices as strings so the dict is a valid MongoDB document
+            "confirmed": {str(idx): t for idx, t in self.confirmed.items()},
+            "order": self.order,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "SearchCursor":
+        return cls(
+            level=int(d["level"]),
+            rank=int(d["rank"]),
+            commitment_count=int(d["commitment_count"]),
+            confirmed={int(idx): int(t) for idx, t in d.get("confirmed", {}).items()},
+            # Cursors stored before the order was recorded used lexicographic ranks
+            order=d.get("order", "lexicographic"),
+        )
+
+
+@dataclass
+class LevelEstimate:
+    """Predicted work at level k; min assumes honest shares, max a search that never matches."""
+    level: int
+    valid: int
+    confirmed: int  # Expected confirmed users when the level is reached (honest shares)
+    path: str  # "confirmed", "search" or "unsolvable"
+    min_combinations: int = 0
+    max_combinations: int = 0
+
+
+@dataclass
+class CostEstimate:
+    """What a decrypt_with_details run over the same commitments is expected to cost."""
+    levels: List[LevelEstimate] = field(default_factory=list)
+    min_combinations: int = 0
+    max_combinations: int = 0
+    interpolations: int = 0
+    key_trials: int = 0
+    min_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _revolving_door_rank(subset: Sequence[int]) -> int:
+    """Rank of a sorted subset of range(n) in revolving-door order (Kreher & Stinson, Alg. 2.12)."""
+    r = len(subset)
+    rank = -(r % 2)
+    sign = 1
+    for i in range(r, 0, -1):
+        rank += sign * comb(subset[i - 1] + 1, i)
+        sign = -sign
+    return rank
+
+
+def _revolving_door_unrank(n: int, r: int, rank: int) -> List[int]:
+    """The rank-th r-subset of range(n) in revolving-door order, sorted."""
+    subset = [0] * r
+    x = n
+    for i in range(r, 0, -1):
+        while comb(x, i) > rank:
+            x -= 1
+        subset[i - 1] = x
+        rank = comb(x + 1, i) - rank - 1
+    return subset
+
+
+def _revolving_door_successor(t: List[int], r: int) -> Tuple[int, int]:
+    """
+    Advance t in place to the next subset (Kreher & Stinson, Alg. 2.13) and return
+    (left, entered). t is 1-indexed: t[1..r] hold the elements plus one, t[r+1] = n+1.
+    """
+    j = 1
+    while j <= r and t[j] == j:
+        j += 1
+    if (r - j) % 2:
+        if j == 1:
+            t[1] -= 1
+            return t[1] + 1, t[1]
+        t[j - 1] = j
+        if j > 2:
+            t[j - 2] = j - 1
+            return j - 2, j
+        return j - 1, j
+    if t[j + 1] != t[j] + 1:
+        left = t[j - 1] if j > 1 else t[j]
+        t[j - 1] = t[j]
+        t[j] += 1
+        return left, t[j]
+    entered = j
+    t[j + 1] = t[j]
+    t[j] = j
+    return t[j + 1] + 1, entered
+
+
+def revolving_door_from(n: int, r: int, start: int = 0):
+    """
+    Yield (subset, left, entered) for every r-subset of range(n), in revolving-door
+    (minimal change) order from rank `start`. Each subset differs from the previous one
+    by a single swap: `left` was replaced by `entered` (both None for the first subset).
+    """
+    total = comb(n, r)
+    if r > n or start >= total:
+        return
+    t = [0] + [v + 1 for v in _revolving_door_unrank(n, r, start)] + [n + 1]
+    yield tuple(v - 1 for v in t[1:r + 1]), None, None
+    for _ in range(start + 1, total):
+        left, entered = _revolving_door_successor(t, r)
+        yield tuple(v - 1 for v in t[1:r + 1]), left - 1, entered - 1
+
+
+def _batch_inverse(values: List[int], mod: int) -> List[int]:
+    """Inverses of all values mod `mod` with a single modular inversion (Montgomery's trick)."""
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % mod
+    inv = pow(acc, -1, mod)
+    out = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        out[i] = inv * prefix[i] % mod
+        inv = inv * values[i] % mod
+    return out
+
+
+def _coeffs_from_weights(xs: List[int], ys: List[int], ws: List[int], mod: int) -> List[int]:
+    """
+    Coefficients [a_0, ..., a_{k-1}] of the polynomial through (xs, ys), given the
+    barycentric weights ws[j] = 1 / prod_{i != j}(xs[j] - xs[i]). O(k^2): each Lagrange
+    basis polynomial is the master polynomial prod(x - xs[i]) divided by (x - xs[j]).
+    """
+    k = len(xs)
+    master = [1]
+    for x in xs:
+        nxt = [0] * (len(master) + 1)
+        for deg, c in enumerate(master):
+            nxt[deg + 1] = (nxt[deg + 1] + c) % mod
+            nxt[deg] = (nxt[deg] - x * c) % mod
+        master = nxt
+
+    coeffs = [0] * k
+    for x, y, w in zip(xs, ys, ws):
+        scale = y * w % mod
+        # Synthetic division, highest degree first
+        q = 0
+        for deg in range(k, 0, -1):
+            q = (master[deg] + x * q) % mod
+            coeffs[deg - 1] = (coeffs[deg - 1] + scale * q) % mod
+    return coeffs
+
+
+class _SubsetInterpolator:
+    """
+    Interpolation state for the points of one level: fixed base points (confirmed
+    users) plus a subset of pool points (unknown users) that changes one swap at a time.
+
+    Each member j keeps prod_{i != j}(x_j - x_i) as a fraction num/den, so a swap only
+    multiplies every member's fraction by one factor each (O(k)) and the weights come
+    from a single batched inversion. The base points' products among themselves and
+    with every pool point are computed once per level.
+    """
+
+    def __init__(self, mod: int, base_points: List[Tuple[int, int]], pool_points: List[Tuple[int, int]]):
+        self.mod = mod
+        self.base_points = base_points
+        self.pool_points = pool_points
+        self.base_products = []
+        for c, (xc, _) in enumerate(base_points):
+            p = 1
+            for c2, (x2, _) in enumerate(base_points):
+                if c2 != c:
+                    p = p * (xc - x2) % mod
+            self.base_products.append(p)
+        self.pool_base_products = []
+        for xu, _ in pool_points:
+            p = 1
+            for xc, _ in base_points:
+                p = p * (xu - xc) % mod
+            self.pool_base_products.append(p)
+        self.base_state: List[List[int]] = []
+        self.members: Dict[int, List[int]] = {}  # pool position -> [num, den]
+        self._weights: Optional[Tuple[List[int], List[int], List[int]]] = None
+
+    def reset(self, subset: Sequence[int]):
+        mod = self.mod
+        pool = self.pool_points
+        self.members = {}
+        for u in subset:
+            xu = pool[u][0]
+            p = self.pool_base_products[u]
+            for v in subset:
+                if v != u:
+                    p = p * (xu - pool[v][0]) % mod
+            self.members[u] = [p, 1]
+        self.base_state = []
+        for (xc, _), p in zip(self.base_points, self.base_products):
+            for v in subset:
+                p = p * (xc - pool[v][0]) % mod
+            self.base_state.append([p, 1])
+        self._weights = None
+
+    def swap(self, left: int, entered: int):
+        mod = self.mod
+        pool = self.pool_points
+        x_left, x_entered = pool[left][0], pool[entered][0]
+        del self.members[left]
+        for (xc, _), state in zip(self.base_points, self.base_state):
+            state[0] = state[0] * (xc - x_entered) % mod
+            state[1] = state[1] * (xc - x_left) % mod
+        p = self.pool_base_products[entered]
+        for u, state in self.members.items():
+            xu = pool[u][0]
+            state[0] = state[0] * (xu - x_entered) % mod
+            state[1] = state[1] * (xu - x_left) % mod
+            p = p * (x_entered - xu) % mod
+        self.members[entered] = [p, 1]
+        self._weights = None
+
+    def _current_weights(self) -> Tuple[List[int], List[int], List[int]]:
+        if self._weights is None:
+            mod = self.mod
+            points = list(self.base_points) + [self.pool_points[u] for u in self.members]
+            states = self.base_state + list(self.members.values())
+            inverses = _batch_inverse([num for num, _ in states], mod)
+            ws = [den * inv % mod for (_, den), inv in zip(states, inverses)]
+            self._weights = ([x for x, _ in points], [y for _, y in points], ws)
+        return self._weights
+
+    def points(self) -> List[Tuple[int, int]]:
+        return list(self.base_points) + [self.pool_points[u] for u in self.members]
+
+    def leading_coefficient(self) -> int:
+        """a_{k-1} of the polynomial through the current k points: sum of y_j * w_j."""
+        _, ys, ws = self._current_weights()
+        return sum(y * w for y, w in zip(ys, ws)) % self.mod
+
+    def coefficients(self) -> List[int]:
+        xs, ys, ws = self._current_weights()
+        return _coeffs_from_weights(xs, ys, ws, self.mod)
+
+
+def _first_real_level(points: List[Tuple[int, int]], levels: Sequence[int]) -> Optional[int]:
+    """A commitment's threshold: the first level holding a real point (points[i] is at levels[i])."""
+    for level, point in zip(levels, points):
+        if point != (0, 0):
+            return level
+    return None
+
+
+# Rank of the lowest consistent subset any shard has found at the current level.
+# Set in each pool worker by _init_search_worker; shards past it stop early.
+_best_rank = None
+
+# How many candidates a shard tries between checks of _best_rank and its deadline
+_SHARD_CHECK_INTERVAL = 64
+
+
+def _init_search_worker(best_rank):
+    global _best_rank
+    _best_rank = best_rank
+
+
+def _search_range(decrypter: "CommitDecrypter", task: Dict, check_every: int = 1, cancel=None) -> Dict:
+    """
+    Try the candidate subsets with revolving-door ranks [start, end) of one level.
+    Stops at the first consistent subset, at the deadline (time.monotonic()), or
+    when cancel() returns a rank below the next candidate's. Both are checked every
+    `check_every` candidates, never before the first one.
+    """
+    base_points = task["base_points"]
+    unknowns = task["unknowns"]  # [(ciphertext, point at this level, threshold)]
+    start, end, deadline = task["start"], task["end"], task["deadline"]
+    level = len(base_points) + task["needed"]
+    result = {"start": start, "stopped_at": end, "status": "exhausted", "found": None}
+    interpolator = _SubsetInterpolator(decrypter.MOD, base_points, [u[1] for u in unknowns])
+
+    rank = start
+    for subset, left, entered in revolving_door_from(len(unknowns), task["needed"], start):
+        if rank >= end:
+            break
+        if rank > start and (rank - start) % check_every == 0:
+            if cancel is not None and cancel() < rank:
+                result.update(status="cancelled", stopped_at=rank)
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                result.update(status="deadline", stopped_at=rank)
+                break
+        rank += 1
+
+        if left is None:
+            interpolator.reset(subset)
+        else:
+            interpolator.swap(left, entered)
+        match = decrypter._try_subset(interpolator, subset, unknowns, level)
+        if match is not None:
+            coeffs, newly_revealed = match
+            result.update(status="found", stopped_at=rank, found=(rank - 1, subset, coeffs, newly_revealed))
+            break
+
+    result["combinations"] = rank - start
+    return result
+
+
+def _search_shard(task: Dict) -> Dict:
+    """_search_range in a pool worker, cancelled once a lower rank has been found elsewhere."""
+    decrypter = CommitDecrypter(0)
+    result = _search_range(decrypter, task, _SHARD_CHECK_INTERVAL, cancel=lambda: _best_rank.value)
+    if result["status"] == "found":
+        with _best_rank.get_lock():
+            _best_rank.value = min(_best_rank.value, result["found"][0])
+    result["stats"] = decrypter.stats.to_dict()
+    return result
+
+
+def points_digest(points: Sequence[Tuple[int, int]]) -> str:
+    """Order-independent digest of a set of (x, y) points."""
+    h = hashlib.sha256()
+    for x, y in sorted(points):
+        h.update(f"{x}:{y};".encode("ascii"))
+    return h.hexdigest()
+
+
+class InterpolationCache:
+    def __init__(self, max_entries: int = 4096):
+        """
+        Bounded LRU cache shared by CommitDecrypter instances.
+
+        Holds two kinds of entries, both keyed by digests of the points involved:
+        "c:<digest>" -> interpolated coefficients of that point set, and
+        "s:<digest>" -> the outcome of a level search over identical inputs
+        ({"status": "found" | "exhausted", "rank": int}). Search outcomes never
+        hold names or keys; a found subset is re-checked from its rank.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def export(self, keys) -> Dict[str, Dict]:
+        """JSON/BSON-safe copy of the given entries (big integers as strings)."""
+        out = {}
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    continue
+                if key.startswith("c:"):
+                    out[key] = {"coeffs": [str(c) for c in value]}
+                else:
+                    out[key] = {"status": value["status"], "rank": str(value["rank"])}
+        return out
+
+    def load(self, entries: Dict[str, Dict]):
+        """Add entries produced by export(), e.g. persisted with an objective."""
+        for key, value in entries.items():
+            if key.startswith("c:"):
+                self.put(key, [int(c) for c in value["coeffs"]])
+            elif key.startswith("s:"):
+                self.put(key, {"status": value["status"], "rank": int(value["rank"])})
+
 
 class CommitDecrypter:
-    def __init__(self, n: int):
+    # Upper bound on candidate subsets tried per level
+    MAX_COMBS = 1000000
+    # Levels with fewer candidate subsets than this are searched in-process
+    # even when workers are requested, since starting the pool costs more
+    PARALLEL_MIN_COMBS = 20000
+    # Shards per worker, so that uneven shards still keep every worker busy
+    SHARDS_PER_WORKER = 4
+    # Cost model for estimate_cost, in seconds. Measured with the resolution
+    # benchmark (python -m ac2_backend.benchmarks.bench_resolution), which also
+    # reports estimated against measured time for every workload.
+    CANDIDATE_SECONDS = 60e-6  # One subset: incremental key update plus a key trial...
+    CANDIDATE_SECONDS_PER_POINT = 2.5e-6  # ...plus this per point at the level
+    INTERPOLATION_SECONDS = 20e-6  # Full coefficients of k points: this...
+    INTERPOLATION_SECONDS_PER_POINT_SQUARED = 2e-6  # ...plus this times k^2
+    KEY_TRIAL_SECONDS = 6e-6
+
+    def __init__(self, n: int, cache: Optional[InterpolationCache] = None, levels: Optional[Sequence[int]] = None):
         self.n = n
+        # Level of each point position; see CommitEncrypter's levels
+        self.levels = normalize_levels(levels, n)
         self.MOD = 2**127 - 1
+        # Optional cache shared across levels, runs and decrypters
+        self.cache = cache
+        # Cache keys read or written by the last run, for persisting them per objective
+        self.cache_keys: Set[str] = set()
+        # Threshold (first real level) of each commitment, None for declines,
+        # and commitment indices grouped by threshold
+        self.thresholds: List[Optional[int]] = []
+        self.buckets: Dict[int, List[int]] = {}
         # Store commitments as (ciphertext, points, original_index)
         # points is List[(x, y)]
         self.commitments: List[Tuple[str, List[Tuple[int, int]], int]] = []
+        # Stats for the last decrypt_with_details run
+        self.stats = DecryptionStats()
+        # Where the last run stopped, or None if it finished every level
+        self.cursor: Optional[SearchCursor] = None
 
     def add_commitment(self, ciphertext: str, points: List[Tuple[int, int]]):
-        self.commitments.append((ciphertext, points, len(self.commitments)))
+        idx = len(self.commitments)
+        self.commitments.append((ciphertext, points, idx))
+        threshold = _first_real_level(points, self.levels)
+        self.thresholds.append(threshold)
+        if threshold is not None:
+            self.buckets.setdefault(threshold, []).append(idx)
+
+    def _decrypt_name(self, key: Union[int, "hmac.HMAC"], ciphertext_hex: str) -> Optional[str]:
+        """key is a coefficient, or one already prepared by _prepare_key for reuse."""
+        start = time.perf_counter()
+        if isinstance(key, int):
+            key = self._prepare_key(key)
+        name = self._open_ciphertext(key, ciphertext_hex)
+        self.stats.key_trial_seconds += time.perf_counter() - start
+        self.stats.decrypt_attempts += 1
+        if name:
+            self.stats.decrypt_successes += 1
+        return name
 
-    def _decrypt_name(self, key_int: int, ciphertext_hex: str) -> Optional[str]:
+    @staticmethod
+    def _prepare_key(key_int: int) -> "hmac.HMAC":
+        """HMAC keyed with the coefficient; copied per ciphertext so the key is only set up once."""
+        return hmac.new(str(key_int).encode('utf-8'), digestmod=hashlib.sha256)
+
+    def _open_ciphertext(self, prepared_key: "hmac.HMAC", ciphertext_hex: str) -> Optional[str]:
         try:
-            import hmac
             data = bytes.fromhex(ciphertext_hex)
             
             # Extract nonce (first 16 bytes) and ciphertext
@@ -187,21 +785,17 @@ class CommitDecrypter:
             ct_bytes = data[16:]
             
             # Derive same encryption key using HMAC with the nonce
-            key_material = hmac.new(
-                str(key_int).encode('utf-8'),
-                nonce,
-                hashlib.sha256
-            ).digest()
-            
-            # XOR decryption
-            pt_bytes = bytearray()
-            for i, b in enumerate(ct_bytes):
-                pt_bytes.append(b ^ key_material[i % len(key_material)])
+            mac = prepared_key.copy()
+            mac.update(nonce)
+            key_material = mac.digest()
             
-            plaintext = pt_bytes.decode('utf-8')
-            if plaintext.startswith("AC2:"):
-                return plaintext[4:]
-            return None
+            # XOR decryption, checking the magic prefix before the rest
+            if len(ct_bytes) < 4 or bytes(b ^ k for b, k in zip(ct_bytes[:4], key_material)) != b"AC2:":
+                return None
+            keystream = key_material * (len(ct_bytes) // len(key_material) + 1)
+            pt_int = int.from_bytes(ct_bytes, "big") ^ int.from_bytes(keystream[:len(ct_bytes)], "big")
+            plaintext = pt_int.to_bytes(len(ct_bytes), "big").decode('utf-8')
+            return plaintext[4:]
         except Exception:
             return None
 
@@ -210,6 +804,34 @@ class CommitDecrypter:
         Recover all coefficients [a_0, a_1, ..., a_{k-1}] for polynomial of degree k-1.
         f(x) = sum(a_i * x^i)
         """
+        key = "c:" + points_digest(points) if self.cache is not None else None
+        coeffs = self._cache_get(key)
+        if coeffs is not None:
+            return coeffs
+        start = time.perf_counter()
+        coeffs = self._interpolate(points)
+        self.stats.interpolation_seconds += time.perf_counter() - start
+        self.stats.recover_coeffs_calls += 1
+        self._cache_put(key, coeffs)
+        return coeffs
+
+    def _cache_get(self, key: Optional[str]):
+        if key is None:
+            return None
+        self.cache_keys.add(key)
+        value = self.cache.get(key)
+        if value is None:
+            self.stats.cache_misses += 1
+        else:
+            self.stats.cache_hits += 1
+        return value
+
+    def _cache_put(self, key: Optional[str], value):
+        if key is not None:
+            self.cache.put(key, value)
+
+    def _interpolate(self, points: List[Tuple[int, int]]) -> List[int]:
+        """Lagrange interpolation over GF(MOD)."""
         k = len(points)
         if k == 0:
             return []
@@ -217,46 +839,262 @@ class CommitDecrypter:
         xs = [p[0] for p in points]
         ys = [p[1] for p in points]
         
-        final_coeffs = [0] * k
-        
+        # Denominators prod(xj - xi), all inverted at once
+        denoms = []
         for j in range(k):
-            xj = xs[j]
-            yj = ys[j]
-            
-            # Calculate denominator: prod(xj - xi)
             denom = 1
             for i in range(k):
-                if i == j:
-                    continue
-                denom = (denom * (xj - xs[i])) % self.MOD
-            
-            inv_denom = pow(denom, -1, self.MOD)
-            term_scaler = (yj * inv_denom) % self.MOD
-            
-            # Calculate numerator poly: prod(x - xi)
-            current_poly = [1] 
-            
-            for i in range(k):
-                if i == j:
-                    continue
-                # Multiply current_poly by (x - xi)
-                xi = xs[i]
-                new_poly = [0] * (len(current_poly) + 1)
-                for deg in range(len(current_poly)):
-                    # Term x * coeff * x^deg = coeff * x^{deg+1}
-                    new_poly[deg+1] = (new_poly[deg+1] + current_poly[deg]) % self.MOD
-                    # Term -xi * coeff * x^deg
-                    new_poly[deg] = (new_poly[deg] - xi * current_poly[deg]) % self.MOD
-                current_poly = new_poly
-                
-            # Add to final
-            for deg in range(len(current_poly)):
-                term = (current_poly[deg] * term_scaler) % self.MOD
-                final_coeffs[deg] = (final_coeffs[deg] + term) % self.MOD
-                
-        return final_coeffs
+                if i != j:
+                    denom = (denom * (xs[j] - xs[i])) % self.MOD
+            denoms.append(denom)
+        weights = _batch_inverse(denoms, self.MOD)
+        return _coeffs_from_weights(xs, ys, weights, self.MOD)
+
+    def _reveal_unknowns(
+        self,
+        coeffs: List[int],
+        level: int,
+        unknown_users: Sequence[int],
+        revealed_users: Dict[int, str],
+        confirmed_thresholds: Dict[int, int],
+        decryption_details: Dict[int, Dict],
+    ):
+        """
+        Try recovered coefficients against unknown users, one threshold bucket at a
+        time: each bucket's key is prepared once and tried against all its ciphertexts.
+        Buckets above the recovered degree cannot match and are skipped.
+        """
+        unknown = set(unknown_users)
+        for threshold in sorted(self.buckets):
+            if threshold > len(coeffs):
+                break
+            members = [idx for idx in self.buckets[threshold] if idx in unknown]
+            if not members:
+                continue
+            key = self._prepare_key(coeffs[threshold - 1])
+            for idx in members:
+                name = self._decrypt_name(key, self.commitments[idx][0])
+                if name:
+                    revealed_users[idx] = name
+                    confirmed_thresholds[idx] = threshold
+                    decryption_details[idx] = {
+                        'name': name,
+                        'threshold': threshold,
+                        'coefficients': coeffs,
+                        'level': level
+                    }
+
+    def _try_subset(
+        self, interpolator: _SubsetInterpolator, subset: Sequence[int], unknowns: List[Tuple], level: int
+    ) -> Optional[Tuple[List[int], List[Tuple[int, str, int]]]]:
+        """
+        Check the interpolator's current subset: every member must decrypt with the
+        coefficient of its own threshold. Members at this level only need the leading
+        coefficient, so the full coefficients are only computed for members below it
+        and once the whole subset matched.
+        Returns (coeffs, [(position in unknowns, name, threshold)]) or None.
+        """
+        start = time.perf_counter()
+        leading = interpolator.leading_coefficient()
+        self.stats.interpolation_seconds += time.perf_counter() - start
+        self.stats.incremental_updates += 1
+
+        coeffs = None
+        leading_key = None
+        newly_revealed = []
+        for pos in subset:
+            ct, _, user_threshold = unknowns[pos]
+            if user_threshold is None or user_threshold > level:
+                return None
+            if user_threshold == level:
+                if leading_key is None:
+                    leading_key = self._prepare_key(leading)
+                key = leading_key
+            else:
+                if coeffs is None:
+                    coeffs = self._subset_coeffs(interpolator)
+                key = coeffs[user_threshold - 1]
+            name = self._decrypt_name(key, ct)
+            if not name:
+                return None
+            newly_revealed.append((pos, name, user_threshold))
+
+        if coeffs is None:
+            coeffs = self._subset_coeffs(interpolator)
+        return coeffs, newly_revealed
+
+    def _subset_coeffs(self, interpolator: _SubsetInterpolator) -> List[int]:
+        key = "c:" + points_digest(interpolator.points()) if self.cache is not None else None
+        coeffs = self._cache_get(key)
+        if coeffs is not None:
+            return coeffs
+        start = time.perf_counter()
+        coeffs = interpolator.coefficients()
+        self.stats.interpolation_seconds += time.perf_counter() - start
+        self.stats.recover_coeffs_calls += 1
+        self._cache_put(key, coeffs)
+        return coeffs
+
+    def _search_key(self, task: Dict) -> Optional[str]:
+        """Cache key for a level search: everything its outcome depends on."""
+        if self.cache is None:
+            return None
+        h = hashlib.sha256()
+        h.update(points_digest(task["base_points"]).encode("ascii"))
+        # Unknowns in order, since ranks are positions in this list
+        for ct, (x, y), threshold in task["unknowns"]:
+            h.update(f"{ct}:{x}:{y}:{threshold};".encode("ascii"))
+        h.update(f"{task['needed']}:{task['start']}:{task['end']}".encode("ascii"))
+        return "s:" + h.hexdigest()
+
+    def _cached_search(self, key: Optional[str], task: Dict) -> Optional[Dict]:
+        """A _search_range-style result rebuilt from a cached outcome, or None."""
+        outcome = self._cache_get(key)
+        if outcome is None:
+            return None
+        result = {"start": task["start"], "stopped_at": task["end"], "status": "exhausted",
+                  "found": None, "combinations": 0}
+        if outcome["status"] == "found":
+            rank = outcome["rank"]
+            subset = tuple(_revolving_door_unrank(len(task["unknowns"]), task["needed"], rank))
+            interpolator = _SubsetInterpolator(self.MOD, task["base_points"], [u[1] for u in task["unknowns"]])
+            interpolator.reset(subset)
+            match = self._try_subset(interpolator, subset, task["unknowns"], len(task["base_points"]) + task["needed"])
+            if match is None:
+                return None
+            result.update(status="found", stopped_at=rank + 1, found=(rank, subset) + match)
+        return result
+
+    def _search_parallel(self, pool: ProcessPoolExecutor, best_rank, workers: int, task: Dict) -> List[Dict]:
+        """
+        Split the task's rank range into shards across the pool and return the
+        shard results in rank order, with their counters added to self.stats.
+        """
+        start, end = task["start"], task["end"]
+        best_rank.value = end
+        size = -(-(end - start) // (workers * self.SHARDS_PER_WORKER))
+        futures = [
+            pool.submit(_search_shard, dict(task, start=shard_start, end=min(shard_start + size, end)))
+            for shard_start in range(start, end, size)
+        ]
+        results = [f.result() for f in futures]
+        for r in results:
+            for key in ("recover_coeffs_calls", "interpolation_seconds", "incremental_updates",
+                        "decrypt_attempts", "decrypt_successes", "key_trial_seconds"):
+                setattr(self.stats, key, getattr(self.stats, key) + r["stats"][key])
+        return results
+
+    def _search_outcome(
+        self, results: List[Dict], unknown_users: List[int]
+    ) -> Tuple[Optional[Tuple], Optional[str], int]:
+        """
+        Combine range results (in rank order) into (found, stop, stop_rank): found is
+        (unknown_subset, coeffs, newly_revealed) for the lowest-ranked consistent subset,
+        or None. stop is "deadline" when the search has to resume from stop_rank.
+        """
+        level_stats = self.stats.levels[-1]
+        for r in results:
+            level_stats.combinations += r["combinations"]
+            self.stats.combinations_explored += r["combinations"]
+
+        # The first range that did not run to its end decides, since every rank
+        # before it has been tried without success
+        for r in results:
+            if r["status"] == "found":
+                _, subset, coeffs, newly_revealed = r["found"]
+                return (
+                    tuple(unknown_users[i] for i in subset),
+                    coeffs,
+                    [(unknown_users[i], name, t) for i, name, t in newly_revealed],
+                ), None, r["stopped_at"]
+            if r["status"] != "exhausted":
+                return None, "deadline", r["stopped_at"]
+        return None, None, results[-1]["stopped_at"] if results else 0
+
+    def estimate_cost(self, cursor: Optional[SearchCursor] = None) -> CostEstimate:
+        """
+        Predict the work of decrypt_with_details(cursor=cursor) from per-level counts
+        alone, without interpolating anything.
+        """
+        valid_counts = [0] * len(self.levels)
+        for _, pts, _ in self.commitments:
+            for i, point in enumerate(pts[:len(self.levels)]):
+                if point != (0, 0):
+                    valid_counts[i] += 1
+        positions = {level: pos for pos, level in enumerate(self.levels)}
+        new_counts = [0] * len(self.levels)
+        for threshold in self.thresholds:
+            if threshold is not None:
+                new_counts[positions[threshold]] += 1
+        if cursor is not None and cursor.commitment_count != len(self.commitments):
+            cursor = None  # Stale: the search starts over
+        return self.estimate_from_counts(valid_counts, new_counts, cursor, self.levels)
 
-    def decrypt_with_details(self) -> Tuple[List[str], Dict[int, Dict]]:
+    @classmethod
+    def estimate_from_counts(
+        cls,
+        valid_counts: Sequence[int],
+        new_counts: Optional[Sequence[int]] = None,
+        cursor: Optional[SearchCursor] = None,
+        levels: Optional[Sequence[int]] = None,
+    ) -> CostEstimate:
+        """
+        Estimate from valid_counts[i] (commitments with a real point at levels[i]) and
+        new_counts[i] (commitments whose threshold is levels[i]). Without new_counts they
+        are derived from valid_counts, which holds for commitments made by CommitEncrypter.
+        levels defaults to 1..len(valid_counts).
+        A cursor skips the levels it finished and the candidates it already tried.
+        """
+        if levels is None:
+            levels = range(1, len(valid_counts) + 1)
+        if new_counts is None:
+            new_counts = [max(0, c - (valid_counts[i - 1] if i else 0)) for i, c in enumerate(valid_counts)]
+        known = sorted(cursor.confirmed.values()) if cursor is not None else []
+        start_level = cursor.level if cursor is not None else 1
+
+        estimate = CostEstimate()
+        revealed = len(known)  # Honest shares: everyone valid at a solved level is revealed
+        seen = 0
+        for pos, (k, valid) in enumerate(zip(levels, valid_counts)):
+            seen += new_counts[pos]
+            if k < start_level:
+                continue
+            known_here = sum(1 for t in known if t <= k)
+            level = LevelEstimate(level=k, valid=valid, confirmed=min(revealed, valid), path="unsolvable")
+            estimate.levels.append(level)
+            if valid < k:
+                continue
+
+            unknown = valid - level.confirmed
+            if level.confirmed >= k:
+                level.path = "confirmed"
+            else:
+                level.path = "search"
+                level.min_combinations = 1
+                # Worst case nothing was revealed below this level
+                level.max_combinations = min(comb(valid - known_here, k - known_here), cls.MAX_COMBS)
+                if k == start_level and cursor is not None:
+                    level.max_combinations = max(1, level.max_combinations - cursor.rank)
+            estimate.interpolations += 1
+            estimate.key_trials += unknown
+            revealed = max(revealed, min(seen, valid))
+
+            candidate = cls.CANDIDATE_SECONDS + cls.CANDIDATE_SECONDS_PER_POINT * k
+            interpolation = cls.INTERPOLATION_SECONDS + cls.INTERPOLATION_SECONDS_PER_POINT_SQUARED * k * k
+            fixed = interpolation + unknown * cls.KEY_TRIAL_SECONDS
+            estimate.min_combinations += level.min_combinations
+            estimate.max_combinations += level.max_combinations
+            estimate.min_seconds += level.min_combinations * candidate + fixed
+            estimate.max_seconds += level.max_combinations * candidate + fixed
+        return estimate
+
+    def decrypt_with_details(
+        self,
+        time_budget: Optional[float] = None,
+        cursor: Optional[SearchCursor] = None,
+        known_details: Optional[Dict[int, Dict]] = None,
+        workers: int = 1,
+    ) -> Tuple[List[str], Dict[int, Dict]]:
         """
         Returns (revealed_names, decryption_details)
         where decryption_details maps commitment_index -> {
@@ -265,146 +1103,171 @@ class CommitDecrypter:
             'coefficients': List[int],  # The polynomial coefficients used
             'level': int  # The k value where it was decrypted
         }
+
+        time_budget: Seconds this run may spend. When it runs out (or a level hits
+                     MAX_COMBS) the run stops, self.cursor records where, and what
+                     was revealed so far is returned.
+        cursor: Continue a previous run from self.cursor. known_details must hold
+                the details of every commitment in cursor.confirmed. If commitments
+                were added since, the confirmed set is kept but all levels are
+                searched again.
+        Without a time budget, a level that hits MAX_COMBS is left behind as before
+        and the run carries on; self.cursor still records the first such level.
+        workers: Processes to search with. Levels with at least PARALLEL_MIN_COMBS
+                 candidates are split into rank ranges across a process pool; the
+                 lowest-ranked consistent subset wins, so the result is the same
+                 as with workers=1.
         """
         revealed_users: Dict[int, str] = {}
         confirmed_thresholds: Dict[int, int] = {}
         decryption_details: Dict[int, Dict] = {}
+        stats = self.stats = DecryptionStats()
+        self.cache_keys = set()
+        run_started = time.perf_counter()
+        deadline = run_started + time_budget if time_budget is not None else None
+        self.cursor = None
+
+        start_level, start_rank = self.levels[0] if self.levels else 1, 0
+        if cursor is not None and all(idx in (known_details or {}) for idx in cursor.confirmed):
+            for idx, t in cursor.confirmed.items():
+                detail = dict(known_details[idx])
+                confirmed_thresholds[idx] = t
+                revealed_users[idx] = detail['name']
+                decryption_details[idx] = detail
+            if cursor.commitment_count == len(self.commitments):
+                start_level = cursor.level
+                # Levels below are finished in any order; a rank only means something in its own
+                start_rank = cursor.rank if cursor.order == SEARCH_ORDER else 0
+            stats.resumed_at = start_level
+
+        def interrupt(level: int, rank: int):
+            stats.completed = False
+            if self.cursor is None:
+                self.cursor = SearchCursor(level, rank, len(self.commitments), dict(confirmed_thresholds))
         
-        for k in range(1, self.n + 1):
-            # Get all commitments that have valid (non-zero) points at level k-1
-            valid_at_level = []
-            for idx, (ct, pts, orig_idx) in enumerate(self.commitments):
-                point = pts[k-1]
-                if point != (0, 0):
-                    valid_at_level.append(idx)
+        # Process pool for large levels, started on first use
+        pool: Optional[ProcessPoolExecutor] = None
+        best_rank = None
+        try:
+            for pos in range(bisect.bisect_left(self.levels, start_level), len(self.levels)):
+                k = self.levels[pos]
+                stats.end_level()
+                if deadline is not None and k > start_level and time.perf_counter() > deadline:
+                    interrupt(k, 0)
+                    break
+                # Get all commitments that have valid (non-zero) points at level k:
+                # only buckets with threshold <= k can have one
+                valid_at_level = sorted(
+                    idx
+                    for threshold, bucket in self.buckets.items() if threshold <= k
+                    for idx in bucket
+                    if self.commitments[idx][1][pos] != (0, 0)
+                )
             
-            # Need at least k valid points to recover polynomial of degree k-1
-            if len(valid_at_level) < k:
-                continue
+                # Need at least k valid points to recover polynomial of degree k-1
+                if len(valid_at_level) < k:
+                    continue
             
-            # Separate confirmed and unknown users
-            confirmed_users = [idx for idx in valid_at_level if idx in confirmed_thresholds]
-            unknown_users = [idx for idx in valid_at_level if idx not in confirmed_thresholds]
+                # Separate confirmed and unknown users
+                confirmed_users = [idx for idx in valid_at_level if idx in confirmed_thresholds]
+                unknown_users = [idx for idx in valid_at_level if idx not in confirmed_thresholds]
+                level_stats = stats.start_level(k, len(valid_at_level), len(confirmed_users))
             
-            # If we have enough confirmed users, use them to get the key
-            if len(confirmed_users) >= k:
-                subset_indices = confirmed_users[:k]
-                points = []
-                for idx in subset_indices:
-                    ct, pts, _ = self.commitments[idx]
-                    points.append(pts[k-1])
-                
-                coeffs = self._recover_coeffs(points)
-                # Only the last coefficient a_{k-1} is needed for threshold=k users
-                key = coeffs[k-1]
+                # If we have enough confirmed users, use them to get the key
+                if len(confirmed_users) >= k:
+                    level_stats.solved = True
+                    subset_indices = confirmed_users[:k]
+                    points = []
+                    for idx in subset_indices:
+                        ct, pts, _ = self.commitments[idx]
+                        points.append(pts[pos])
                 
-                # Try to decrypt unknown users with threshold=k
-                # AND also check any remaining users we haven't confirmed yet (who might match at this level)
-                # unknown_users list only contains those NOT in confirmed_thresholds.
+                    coeffs = self._recover_coeffs(points)
                 
-                current_unknowns = list(unknown_users) # Copy
-                for u_idx in current_unknowns:
-                    ct, pts, _ = self.commitments[u_idx]
-                    
-                    # Verify this user actually has data at this level (threshold <= k)
-                    # If their threshold is > k, they have (0,0) here and are just noise
-                    # valid_at_level logic ensures pts[k-1] != (0,0) so threshold <= k.
-                    
-                    # Determine specific threshold for this user
-                    user_threshold = None
-                    for level_idx in range(len(pts)):
-                        if pts[level_idx] != (0, 0):
-                            user_threshold = level_idx + 1
-                            break
-                    
-                    if user_threshold is None or user_threshold > len(coeffs):
-                        continue
-                    
-                    # Decrypt using their specific key
-                    user_key = coeffs[user_threshold - 1]
-                    name = self._decrypt_name(user_key, ct)
-                    
-                    if name:
-                        revealed_users[u_idx] = name
-                        confirmed_thresholds[u_idx] = user_threshold
-                        decryption_details[u_idx] = {
-                            'name': name,
-                            'threshold': user_threshold,
-                            'coefficients': coeffs, # Store the full set we found
-                            'level': k
-                        }
-                        # Move from unknown to confirmed for next iterations?
-                        # No, unknown_users loop is static for this iteration.
-                        # But we updated confirmed_thresholds so next k loop will see them as confirmed.
+                    # Try every unknown user at this level with the coefficient of their own threshold
+                    self._reveal_unknowns(
+                        coeffs, k, unknown_users, revealed_users, confirmed_thresholds, decryption_details
+                    )
                 
-                # ALSO: Update coefficients for the confirmed users used to recover this!
-                # If they were decrypted at a lower level, they might have fewer coefficients stored.
-                for c_idx in confirmed_users:
-                    if c_idx in decryption_details:
-                         # Update to the larger set of coefficients if we found a higher degree poly
-                         if len(coeffs) > len(decryption_details[c_idx]['coefficients']):
-                             decryption_details[c_idx]['coefficients'] = coeffs
-                             decryption_details[c_idx]['level'] = k
+                    # ALSO: Update coefficients for the confirmed users used to recover this!
+                    # If they were decrypted at a lower level, they might have fewer coefficients stored.
+                    for c_idx in confirmed_users:
+                        if c_idx in decryption_details:
+                             # Update to the larger set of coefficients if we found a higher degree poly
+                             if len(coeffs) > len(decryption_details[c_idx]['coefficients']):
+                                 decryption_details[c_idx]['coefficients'] = coeffs
+                                 decryption_details[c_idx]['level'] = k
                 
-                # Since we successfully recovered coeffs at this level k using confirmed users,
-                # we might have revealed MORE users just now.
-                # We should continue to the next k level.
-                continue 
-            
-            # Need to try combinations of unknown users
-            needed = k - len(confirmed_users)
-            if needed > len(unknown_users):
-                continue
+                    # Since we successfully recovered coeffs at this level k using confirmed users,
+                    # we might have revealed MORE users just now.
+                    # We should continue to the next k level.
+                    continue 
             
-            MAX_COMBS = 1000000
-            comb_count = 0
+                # Need to try combinations of unknown users
+                needed = k - len(confirmed_users)
+                if needed > len(unknown_users):
+                    level_stats.path = "skipped"
+                    continue
             
-            base_points = []
-            for idx in confirmed_users:
-                ct, pts, _ = self.commitments[idx]
-                base_points.append(pts[k-1])
+                level_stats.path = "search"
+                rank = start_rank if k == start_level else 0
+                interrupted = False
             
-            for unknown_subset in combinations(unknown_users, needed):
-                comb_count += 1
-                if comb_count > MAX_COMBS:
-                    break
-                
-                current_points = list(base_points)
-                for u_idx in unknown_subset:
-                    ct, pts, _ = self.commitments[u_idx]
-                    current_points.append(pts[k-1])
-                
-                coeffs = self._recover_coeffs(current_points)
-                
-                # Try to decrypt each unknown user with their appropriate coefficient
-                # based on their threshold (which level they first have data at)
-                all_match = True
-                newly_revealed = []
-                
-                for u_idx in unknown_subset:
+                base_points = []
+                for idx in confirmed_users:
+                    ct, pts, _ = self.commitments[idx]
+                    base_points.append(pts[pos])
+                unknowns = []
+                for u_idx in unknown_users:
                     ct, pts, _ = self.commitments[u_idx]
-                    
-                    # Determine this user's threshold by finding first non-zero level
-                    user_threshold = None
-                    for level_idx in range(len(pts)):
-                        if pts[level_idx] != (0, 0):
-                            user_threshold = level_idx + 1  # threshold is 1-indexed
-                            break
-                    
-                    if user_threshold is None or user_threshold > len(coeffs):
-                        all_match = False
-                        break
-                    
-                    # Use the coefficient corresponding to this user's threshold
-                    key = coeffs[user_threshold - 1]
-                    name = self._decrypt_name(key, ct)
-                    if name:
-                        newly_revealed.append((u_idx, name, user_threshold))
-                    else:
-                        all_match = False
-                        break
-                
-                if all_match:
+                    unknowns.append((ct, pts[pos], self.thresholds[u_idx]))
+
+                total = comb(len(unknown_users), needed)
+                end = min(total, rank + self.MAX_COMBS)
+                task = {
+                    "base_points": base_points,
+                    "unknowns": unknowns,
+                    "needed": needed,
+                    "start": rank,
+                    "end": end,
+                    # perf_counter is per process; the search compares against the monotonic clock
+                    "deadline": None if deadline is None else time.monotonic() + (deadline - time.perf_counter()),
+                }
+                search_key = self._search_key(task)
+                cached = self._cached_search(search_key, task)
+                if cached is not None:
+                    results = [cached]
+                elif workers > 1 and end - rank >= self.PARALLEL_MIN_COMBS:
+                    if pool is None:
+                        best_rank = multiprocessing.get_context("spawn").Value("q", 0)
+                        pool = ProcessPoolExecutor(
+                            max_workers=workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_search_worker,
+                            initargs=(best_rank,),
+                        )
+                    results = self._search_parallel(pool, best_rank, workers, task)
+                else:
+                    results = [_search_range(self, task)]
+
+                found, stop, stop_rank = self._search_outcome(results, unknown_users)
+                if cached is None and stop is None:
+                    # Finished ranges do not depend on the clock, so their outcome can be reused
+                    self._cache_put(search_key, {
+                        "status": "exhausted" if found is None else "found",
+                        "rank": end if found is None else stop_rank - 1,
+                    })
+                if found is None and stop is None and end < total:
+                    level_stats.cap_reached = stats.cap_reached = True
+                    interrupt(k, end)
+                    interrupted = deadline is not None
+                elif stop == "deadline":
+                    interrupt(k, stop_rank)
+                    interrupted = True
+
+                if found is not None:
+                    unknown_subset, coeffs, newly_revealed = found
+                    level_stats.solved = True
                     # Found valid set - all decrypt with threshold=k
                     for u_idx, name, t in newly_revealed:
                         revealed_users[u_idx] = name
@@ -415,34 +1278,12 @@ class CommitDecrypter:
                             'coefficients': coeffs,
                             'level': k
                         }
-                    
+                
                     # Check remaining unknown users at this level
                     remaining = [u for u in unknown_users if u not in unknown_subset]
-                    for u_idx in remaining:
-                        ct, pts, _ = self.commitments[u_idx]
-                        
-                        # Determine threshold
-                        user_threshold = None
-                        for level_idx in range(len(pts)):
-                            if pts[level_idx] != (0, 0):
-                                user_threshold = level_idx + 1
-                                break
-                        
-                        if user_threshold is None or user_threshold > len(coeffs):
-                             continue
-
-                        user_key = coeffs[user_threshold - 1]
-                        name = self._decrypt_name(user_key, ct)
-                        
-                        if name:
-                            revealed_users[u_idx] = name
-                            confirmed_thresholds[u_idx] = user_threshold
-                            decryption_details[u_idx] = {
-                                'name': name,
-                                'threshold': user_threshold,
-                                'coefficients': coeffs,
-                                'level': k
-                            }
+                    self._reveal_unknowns(
+                        coeffs, k, remaining, revealed_users, confirmed_thresholds, decryption_details
+                    )
                             
                     # Update confirmed users with new coefficients if they are longer
                     for c_idx in confirmed_users:
@@ -451,8 +1292,14 @@ class CommitDecrypter:
                                  decryption_details[c_idx]['coefficients'] = coeffs
                                  decryption_details[c_idx]['level'] = k
 
+                if interrupted:
                     break
-        
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        stats.end_level()
+        stats.total_seconds = time.perf_counter() - run_started
         return sorted(list(revealed_users.values())), decryption_details
 
     def decrypt(self) -> List[str]:
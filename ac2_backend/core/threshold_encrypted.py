@@ -1,7 +1,12 @@
-import numpy as np
-from scipy.interpolate import UnivariateSpline
+import bisect
+from collections import Counter
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from ac2_backend.core.commit_classes import CommitEncrypter, CommitDecrypter, NameHolder
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ac2_backend.core.commit_classes import (
+    CommitEncrypter, CommitDecrypter, NameHolder, level_for_threshold, normalize_levels,
+)
 
 
 class ResolutionStrategy(Enum):
@@ -17,6 +22,7 @@ class ThresholdEncryptedModel:
         preferences,
         resolution_strategy=ResolutionStrategy.PESSIMISTIC,
         min_percentage=0.0,
+        encrypted=True,
     ):
         """
         Initialize with a list of (name, threshold) tuples.
@@ -25,6 +31,8 @@ class ThresholdEncryptedModel:
         resolution_strategy: Determines where the noise floor starts for encryption.
             PESSIMISTIC: Start assuming min_percentage is required (mapped to absolute count).
             Others: Default to min_count of 1.
+        encrypted: False skips the encryption scheme; resolve() then uses
+            resolve_plaintext, which reveals the same names (for simulations).
         """
         self.preferences = []
         initial_names = set()
@@ -53,15 +61,18 @@ class ThresholdEncryptedModel:
         
         # Initialize Encrypter and Decrypter
         # Encryption uses min_count to set the noise floor.
-        self.encrypter = CommitEncrypter(self.name_holder, self.min_count)
-        self.decrypter = CommitDecrypter(self.n_total)
+        self.encrypted = encrypted
+        self.encrypter = CommitEncrypter(self.name_holder, self.min_count) if encrypted else None
+        self.decrypter = CommitDecrypter(self.n_total) if encrypted else None
         
         # Map to store current commitments (name -> threshold)
         self.commitments = {}
+        # The (ciphertext, points) stored for each of them
+        self.packets = {}
         
-        # Re-play initial preferences as commitments
+        # Re-play initial preferences as commitments (already in self.preferences, sorted)
         for name, threshold in self.preferences:
-             self.add_preference(name, threshold)
+             self._commit(name, threshold)
 
     @property
     def resolution_strategy(self):
@@ -82,7 +93,7 @@ class ThresholdEncryptedModel:
     def add_preference(self, name, threshold):
         """
         Submit a commitment.
-        Returns (ciphertext, vector_of_points) as per the scheme.
+        Returns (ciphertext, vector_of_points) as per the scheme, or None when not encrypted.
         threshold: Absolute number of people required.
         """
         t_val = float(threshold)
@@ -100,20 +111,33 @@ class ThresholdEncryptedModel:
             # but CommitEncrypter will return noise if name is not in NameHolder.
         
         self._sort_preferences()
+        return self._commit(name, t_val)
+
+    def _commit(self, name, t_val):
+        """Record and encrypt a commitment whose preference is already in self.preferences."""
+        replaced = name in self.commitments
         self.commitments[name] = t_val
+        if not self.encrypted:
+            return None
+        if replaced and name in self.names_map:
+            # The name was consumed by its first commitment; let it commit again
+            self.name_holder.release(name)
         
         # Perform Encryption
         # threshold -1 means never.
         thresh_int = int(t_val)
         ct, points = self.encrypter.commit(name, thresh_int)
+        self.packets[name] = (ct, points)
         
         # Store in decrypter (server-side simulation of receiving data)
         # In a real system, this happens elsewhere.
         # We need to clear previous commitment from this user in decrypter?
-        # The current CommitDecrypter just appends. 
-        # For a model update, we should probably rebuild decrypter or handle updates.
-        # Simplest: Rebuild Decrypter from current self.commitments state.
-        self._rebuild_decrypter()
+        # The current CommitDecrypter just appends, so a replaced commitment
+        # means rebuilding it from the current packets.
+        if replaced:
+            self._rebuild_decrypter()
+        else:
+            self.decrypter.add_commitment(ct, points)
                 
         return ct, points
 
@@ -124,6 +148,7 @@ class ThresholdEncryptedModel:
                 self.preferences.pop(i)
                 if name in self.commitments:
                     del self.commitments[name]
+                    self.packets.pop(name, None)
                 break
         self._rebuild_decrypter()
 
@@ -133,12 +158,11 @@ class ThresholdEncryptedModel:
 
     def _rebuild_decrypter(self):
         """Helper to refresh the decrypter state based on current commitments."""
+        if not self.encrypted:
+            return
         self.decrypter = CommitDecrypter(self.n_total)
-        for name, t in self.commitments.items():
-            # Re-generate commitment packet for the current state
-            # (In reality, we would store the ciphertext/vec, but here we generate on fly for simulation)
-            thresh_int = int(t)
-            ct, points = self.encrypter.commit(name, thresh_int)
+        # Re-committing would store noise: every name is consumed by its first commitment
+        for ct, points in self.packets.values():
             self.decrypter.add_commitment(ct, points)
 
     def _get_curve_data(self):
@@ -154,6 +178,9 @@ class ThresholdEncryptedModel:
            If we return absolute counts, the visualizer (if external) might break.
            But 'display' is internal. We can update display to show counts.
         """
+        # NumPy and SciPy are imported on use: the API only needs commit_classes
+        import numpy as np
+
         if not self.preferences:
             return np.array([0, self.n_total]), np.array([0, 0])
 
@@ -189,6 +216,9 @@ class ThresholdEncryptedModel:
         return np.array(x_points), np.array(y_points)
 
     def _get_spline(self, smoothing=None):
+        import numpy as np
+        from scipy.interpolate import UnivariateSpline
+
         x, y = self._get_curve_data()
 
         if len(x) < 2:
@@ -219,6 +249,8 @@ class ThresholdEncryptedModel:
             return {"stable": [], "unstable": []}
 
         # Find roots of spline(x) - x = 0
+        from scipy.interpolate import UnivariateSpline
+
         diff_spline = UnivariateSpline(x, y - x, k=k, s=smoothing)
         roots = diff_spline.roots()
 
@@ -252,6 +284,90 @@ class ThresholdEncryptedModel:
         """
         Resolve using the cryptographic Decrypter.
         """
+        if not self.encrypted:
+            return self.resolve_plaintext().names
         # The Decrypter has been maintained in sync via add/remove hooks.
         # Just call decrypt.
-        return self.decrypter.decrypt()
\ No newline at end of file
+        return self.decrypter.decrypt()
+
+    def resolve_plaintext(self):
+        """
+        What resolve() reveals, and at which level, from the thresholds alone
+        (see resolve_plaintext below); fast enough for what-if analysis.
+        """
+        return resolve_plaintext(
+            ((name, int(t)) for name, t in self.commitments.items()), self.names_map, self.min_count
+        )
+
+@dataclass
+class PlaintextResolution:
+    """What CommitDecrypter reveals for a set of commitments, computed in the clear."""
+    # Name -> first level solved at or above its commitment's level: where it is revealed
+    revealed: Dict[str, int] = field(default_factory=dict)
+    # Name -> level its commitment was made at, for members whose commitment can be revealed at all
+    levels: Dict[str, int] = field(default_factory=dict)
+    # Levels at which a polynomial can be recovered, ascending
+    solved_levels: List[int] = field(default_factory=list)
+
+    @property
+    def names(self) -> List[str]:
+        """Revealed names, sorted like decrypt()."""
+        return sorted(self.revealed)
+
+
+def resolve_plaintext(
+    preferences: Iterable[Tuple[str, int]],
+    members: Optional[Iterable[str]] = None,
+    min_count: int = 1,
+    levels: Optional[Sequence[int]] = None,
+) -> PlaintextResolution:
+    """
+    Reference resolver: who an honest CommitDecrypter run reveals, and at which level,
+    for (name, threshold) pairs committed in order with
+    CommitEncrypter(NameHolder(members), min_count, levels=levels), without any
+    cryptography. O(n log n), for what-if analysis and as an oracle in tests.
+
+    members defaults to the names in preferences. The encrypter's rules apply:
+    non-members and repeated names store noise, -1 is a decline, thresholds are
+    clamped to [1, n] and rounded up to the next allowed level, and one above the
+    highest allowed level stores noise. A commitment made at level p has real
+    points from level max(p, min_count) up; the decrypter takes that first real
+    level as its threshold, so one made below min_count never opens and is not
+    counted. Level k is solved when at least k countable commitments are
+    at or below it, and each of those is revealed at the first solved level at or
+    above its own.
+
+    Matches decrypt_with_details() as long as no level reaches MAX_COMBS or the
+    time budget; corrupted shares (see benchmarks/workloads.py) are not modelled.
+    """
+    preferences = list(preferences)
+    group = set(members) if members is not None else {name for name, _ in preferences}
+    allowed = normalize_levels(levels, len(group)) if group else []
+    resolution = PlaintextResolution()
+    if not allowed:
+        return resolution
+
+    committed = set()
+    for name, threshold in preferences:
+        if name not in group or name in committed:
+            continue
+        committed.add(name)
+        if threshold == -1:
+            continue
+        level = level_for_threshold(threshold, allowed, len(group))
+        if level is not None and level >= min_count:
+            resolution.levels[name] = level
+
+    # Cumulative count of commitments at or below each allowed level
+    counts = Counter(resolution.levels.values())
+    total = 0
+    for k in allowed:
+        total += counts[k]
+        if total >= k:
+            resolution.solved_levels.append(k)
+
+    for name, level in resolution.levels.items():
+        idx = bisect.bisect_left(resolution.solved_levels, level)
+        if idx < len(resolution.solved_levels):
+            resolution.revealed[name] = resolution.solved_levels[idx]
+    return resolution
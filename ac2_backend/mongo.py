@@ -0,0 +1,107 @@
+"""
+MongoDB connection made on first use.
+
+Importing pymongo and constructing a MongoClient (which resolves mongodb+srv URIs
+over DNS) used to happen when backend.py was imported, so a worker could not
+bind its port, or even start, while the database was slow or unreachable.
+LazyMongoClient defers both to the first command; LazyCollection stands in for a
+pymongo Collection until then.
+"""
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+# Called with (command name, "ok" or "error", seconds) after every command
+CommandObserver = Callable[[str, str, float], None]
+
+
+def _command_listener(on_command: CommandObserver):
+    from pymongo import monitoring
+
+    class CommandTimer(monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            on_command(event.command_name, "ok", event.duration_micros / 1e6)
+
+        def failed(self, event):
+            on_command(event.command_name, "error", event.duration_micros / 1e6)
+
+    return CommandTimer()
+
+
+class LazyMongoClient:
+    """
+    A pymongo MongoClient created on the first call to get(). A failed creation
+    (e.g. an SRV lookup error) is raised to that caller and retried by the next.
+    """
+
+    def __init__(
+        self, uri: str, on_command: Optional[CommandObserver] = None,
+        factory: Optional[Callable[..., Any]] = None, **kwargs: Any,
+    ):
+        self.uri = uri
+        self.on_command = on_command
+        # Creates the client (pymongo.MongoClient unless given, e.g. mongomock's in tests)
+        self.factory = factory
+        self.kwargs = kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the client has been created (not whether the server is reachable)."""
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import pymongo
+
+                    kwargs = dict(self.kwargs)
+                    if self.on_command is not None:
+                        kwargs["event_listeners"] = [_command_listener(self.on_command)]
+                    self._client = (self.factory or pymongo.MongoClient)(self.uri, **kwargs)
+        return self._client
+
+    def collection(self, database: str, name: str) -> "LazyCollection":
+        return LazyCollection(self, database, name)
+
+    def ping(self, timeout: float):
+        """Round trip to the server, raising if it does not answer within timeout seconds."""
+        import pymongo
+
+        with pymongo.timeout(timeout):
+            self.get().admin.command("ping")
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class LazyCollection:
+    """Forwards attribute access to the named collection, creating the client on first use."""
+
+    def __init__(self, client: LazyMongoClient, database: str, name: str):
+        self._client = client
+        self._database = database
+        self._name = name
+        self._cached: Tuple[Any, Any] = (None, None)
+
+    def get(self):
+        # Remembered with its client, so a client recreated after close() is picked up
+        client = self._client.get()
+        cached_client, collection = self._cached
+        if cached_client is not client:
+            collection = client[self._database][self._name]
+            self._cached = (client, collection)
+        return collection
+
+    def __getattr__(self, attr: str):
+        return getattr(self.get(), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyCollection({self._database!r}, {self._name!r})"
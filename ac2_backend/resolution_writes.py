@@ -0,0 +1,74 @@
+"""
+MongoDB update documents for storing decryption results.
+
+Commitments are embedded in the objective, so rewriting the array costs a write
+proportional to the whole objective. These helpers instead address only the
+commitments whose stored state differs from the new result, by position.
+"""
+from typing import Dict, List
+
+
+def stored_level_coefficients(objective) -> Dict[str, List[str]]:
+    """level_coefficients, or for objectives resolved before it existed, the copies on the commitments."""
+    if "level_coefficients" in objective:
+        return objective["level_coefficients"]
+    level_coefficients = {}
+    for c in objective.get("commitments", []):
+        if c.get("decrypted") and c.get("coefficients"):
+            level_coefficients.setdefault(str(c.get("decryption_level")), c["coefficients"])
+    return level_coefficients
+
+
+def level_coefficients_from_details(decryption_details: Dict[int, Dict]) -> Dict[str, List[str]]:
+    """
+    The coefficients recovered at each level names were revealed at, stored once per
+    level rather than on every commitment (keys are levels as strings, as MongoDB requires).
+    """
+    level_coefficients: Dict[str, List[str]] = {}
+    for detail in decryption_details.values():
+        level = str(detail["level"])
+        if level not in level_coefficients:
+            # Store coefficients as strings
+            level_coefficients[level] = [str(c) for c in detail["coefficients"]]
+    return level_coefficients
+
+
+def commitment_fields(detail) -> dict:
+    """Stored decryption state of a commitment, given its decryption detail (None if not revealed)."""
+    if detail is None:
+        return {"decrypted": False}
+    return {
+        "decrypted": True,
+        "decrypted_name": detail["name"],
+        "threshold": detail["threshold"],
+        "decryption_level": detail["level"],
+    }
+
+
+def resolution_update(objective, decryption_details: Dict[int, Dict]) -> Dict[str, dict]:
+    """
+    Update operators storing decryption_details on `objective` (the stored document):
+    positional $set of commitments.<i>.<field> for fields that changed, level_coefficients
+    if it changed, and $unset of per-commitment coefficients written by older versions.
+    Commitments pushed after `objective` was read are untouched, since positions are stable.
+    """
+    set_doc: Dict[str, object] = {}
+    unset_doc: Dict[str, str] = {}
+    for idx, commitment in enumerate(objective.get("commitments", [])):
+        for key, value in commitment_fields(decryption_details.get(idx)).items():
+            stored = commitment.get(key)
+            if key == "decrypted":
+                stored = bool(stored)  # Readers treat a missing flag as not decrypted
+            if stored != value:
+                set_doc[f"commitments.{idx}.{key}"] = value
+        if "coefficients" in commitment:
+            unset_doc[f"commitments.{idx}.coefficients"] = ""
+
+    level_coefficients = level_coefficients_from_details(decryption_details)
+    if level_coefficients != objective.get("level_coefficients"):
+        set_doc["level_coefficients"] = level_coefficients
+
+    update = {"$set": set_doc}
+    if unset_doc:
+        update["$unset"] = unset_doc
+    return update
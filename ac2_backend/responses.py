@@ -0,0 +1,231 @@
+"""
+JSON serialization and response compression for point-heavy responses.
+
+Objective views are mostly long lists of big-number strings. FastJSONResponse
+serializes them with orjson when it is installed (standard library json
+otherwise), and CompressionMiddleware compresses responses above a size
+threshold with the best encoding the client accepts: brotli when the brotli
+package is installed, else gzip. Streamed responses are compressed chunk by chunk.
+
+Polled views carry weak entity tags (see entity_tag) so clients can revalidate
+them with If-None-Match and get an empty 304 when nothing changed.
+"""
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional
+
+import anyio.to_thread
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered
+    brotli = None
+
+# Responses whose content type starts with one of these are compressed
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Bodies at least this large are compressed in a worker thread, off the event loop
+THREAD_MIN_BYTES = 128 * 1024
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, as JSONResponse renders it. Types neither encoder knows
+    (datetimes for the standard library, ObjectIds, models) go through jsonable_encoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits, which only the standard library encodes
+    return json.dumps(
+        content, default=jsonable_encoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with dumps. Return it from the endpoint (rather than
+    setting it as response_class) to also skip FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def entity_tag(*parts: Any) -> str:
+    """
+    A weak ETag over the values a representation is derived from. Weak, because
+    CompressionMiddleware may encode the same representation several ways.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag, with the weak comparison it calls for."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def http_date(timestamp: Optional[str]) -> Optional[str]:
+    """An ISO timestamp stored as UTC (datetime.utcnow().isoformat()) as an HTTP date, or None."""
+    if not timestamp:
+        return None
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    return format_datetime(moment.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[str] = None) -> Dict[str, str]:
+    """
+    ETag and Last-Modified headers, with Cache-Control: no-cache so clients keep
+    the response but revalidate it on every use.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """The 304 answer to a matching If-None-Match: no body, the same validators."""
+    return Response(status_code=304, headers=headers)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The content coding to use for an Accept-Encoding header: "br", "gzip" or None."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+
+    def quality(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=quality)  # Ties keep the earlier, denser coding
+    return best if quality(best) > 0 else None
+
+
+class Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int = 1, brotli_quality: int = 1):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, final: bool) -> bytes:
+        """Compress the next chunk; everything passed so far is decodable from the output."""
+        if self.encoding == "br":
+            return self._brotli.process(body) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._gzip.compress(body) + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON, NDJSON and text responses of at least
+    minimum_size bytes. Streamed responses are compressed once their first
+    chunks reach minimum_size, then chunk by chunk as they are sent.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 1, brotli_quality: int = 1):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        # Body chunks held back with `start` until minimum_size bytes or the end arrive
+        pending = bytearray()
+        compressor: Optional[Compressor] = None
+        passthrough = False
+
+        async def compress(body: bytes, final: bool) -> bytes:
+            if len(body) >= THREAD_MIN_BYTES:
+                return await anyio.to_thread.run_sync(compressor.compress, body, final)
+            return compressor.compress(body, final)
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not headers.get("content-type", "").lower().startswith(
+                    COMPRESSIBLE_TYPES
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                await send({**message, "body": await compress(message.get("body", b""), final=not more_body)})
+                return
+
+            # Middleware in between may split even a plain response into several
+            # chunks, so decide on the size seen so far rather than on more_body
+            pending.extend(message.get("body", b""))
+            if more_body and len(pending) < self.minimum_size:
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(pending) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send({**message, "body": bytes(pending)})
+                return
+
+            compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+            body = await compress(bytes(pending), final=not more_body)
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
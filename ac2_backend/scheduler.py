@@ -0,0 +1,148 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    def __init__(
+        self,
+        resolve: Callable[[str], None],
+        grace_seconds: float = 5.0,
+        retry_seconds: float = 60.0,
+    ):
+        """
+        Background worker that resolves objectives shortly after their deadline.
+
+        resolve: Called with the objective id once its deadline has passed.
+                 Exceptions are logged and the objective is retried later.
+        grace_seconds: Delay added after the deadline before resolving.
+        retry_seconds: Delay before retrying a failed resolution.
+        """
+        self.resolve = resolve
+        self.grace = timedelta(seconds=grace_seconds)
+        self.retry = timedelta(seconds=retry_seconds)
+
+        # Min-heap of (due, objective_id). Rescheduling pushes a new entry and
+        # records the current due time in self._due; stale heap entries are skipped.
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def schedule(self, objective_id: str, deadline: datetime, keep_earlier: bool = False):
+        """
+        Queue (or re-queue) an objective to be resolved after `deadline` (naive UTC).
+        With keep_earlier, an objective already due before then keeps its due time.
+        """
+        due = deadline + self.grace
+        with self._cond:
+            current = self._due.get(objective_id)
+            if keep_earlier and current is not None and current <= due:
+                return
+            self._due[objective_id] = due
+            heapq.heappush(self._heap, (due, objective_id))
+            self._cond.notify()
+
+    def schedule_now(self, objective_id: str):
+        """Queue an objective to be resolved as soon as the worker is free."""
+        self.schedule(objective_id, datetime.utcnow() - self.grace)
+
+    def cancel(self, objective_id: str):
+        with self._cond:
+            self._due.pop(objective_id, None)
+
+    def due(self, objective_id: str) -> Optional[datetime]:
+        """When a queued objective will be resolved (grace included), or None."""
+        with self._cond:
+            return self._due.get(objective_id)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._due)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="deadline-resolver", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_due(self) -> Optional[str]:
+        """Block until an objective is due and return its id, or None when stopping."""
+        with self._cond:
+            while not self._stopping:
+                # Drop entries that were cancelled or superseded by a reschedule
+                while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                due, objective_id = self._heap[0]
+                wait = (due - datetime.utcnow()).total_seconds()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._due[objective_id]
+                return objective_id
+        return None
+
+    def _run(self):
+        while True:
+            objective_id = self._next_due()
+            if objective_id is None:
+                return
+            try:
+                self.resolve(objective_id)
+            except Exception as e:
+                logger.error(f"Deadline resolution failed for objective {objective_id}: {e}", exc_info=True)
+                self.schedule(objective_id, datetime.utcnow() + self.retry - self.grace)
+
+
+class PeriodicTask:
+    def __init__(self, run: Callable[[], None], interval_seconds: float, name: str = "periodic-task"):
+        """
+        Background worker that calls `run` every interval_seconds (first after one
+        interval). Exceptions are logged and the next call happens as scheduled.
+        """
+        self.run = run
+        self.interval = interval_seconds
+        self.name = name
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}", exc_info=True)
@@ -0,0 +1,28 @@
+"""
+Persistence of objectives behind one interface (ObjectiveRepository), with a
+MongoDB implementation and an embedded SQLite one for single-node deployments.
+open_repository picks the implementation from the database URI.
+"""
+from typing import Optional
+
+from ac2_backend.mongo import CommandObserver, LazyMongoClient
+from ac2_backend.storage.base import ANY_VERSION, ObjectiveRepository
+from ac2_backend.storage.mongodb import MongoRepository
+from ac2_backend.storage.sqlite import SQLiteRepository
+
+SQLITE_SCHEME = "sqlite:///"
+
+
+def open_repository(uri: str, on_command: Optional[CommandObserver] = None) -> ObjectiveRepository:
+    """
+    A repository for `uri`: sqlite:///relative/path.db or sqlite:////absolute/path.db
+    for SQLite, anything else is a MongoDB connection string (connected on first use).
+    on_command observes MongoDB commands (see mongo.py).
+    """
+    if uri.startswith(SQLITE_SCHEME):
+        path = uri[len(SQLITE_SCHEME):]
+        if not path:
+            raise ValueError("sqlite URI without a path; use sqlite:///file.db")
+        return SQLiteRepository(path)
+    return MongoRepository(LazyMongoClient(uri, on_command=on_command))
+
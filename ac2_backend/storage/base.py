@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+
+
+class _Any:
+    def __repr__(self):
+        return "ANY_VERSION"
+
+
+# Passed as `version` to update unconditionally
+ANY_VERSION = _Any()
+
+# (field, 1 or -1) accepted by find_public
+SORT_FIELDS = ("_id", "title", "resolution_date", "modified_at")
+
+
+class ObjectiveRepository(ABC):
+    """
+    Storage of objectives, their commitments, resolution state and archive.
+
+    Objectives are documents shaped as the backend has always stored them in
+    MongoDB (commitments embedded, ObjectId _id). Writes are MongoDB update
+    documents restricted to $set, $unset, $inc and $push (see documents.py), and
+    projections follow MongoDB's rules, so the backend is written once for every
+    implementation.
+    """
+
+    # Objectives
+
+    @abstractmethod
+    def create(self, objective: dict) -> ObjectId:
+        """Store a new objective. Sets objective["_id"] if it has none, like insert_one."""
+
+    @abstractmethod
+    def get(self, objective_id: ObjectId, projection: Optional[dict] = None) -> Optional[dict]:
+        """The objective (projected), or None."""
+
+    @abstractmethod
+    def update(self, objective_id: ObjectId, update: dict, version=ANY_VERSION) -> bool:
+        """
+        Apply `update`; returns whether the objective matched. With a version, only
+        while the stored version equals it (None: while it has no version field).
+        """
+
+    @abstractmethod
+    def delete(self, objective_id: ObjectId):
+        """Remove the objective, its commitments and its archive."""
+
+    @abstractmethod
+    def commitments(
+        self, objective_id: ObjectId, offset: int = 0, limit: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[int, dict]]:
+        """(position, commitment) pairs from `offset`, read batch_size at a time."""
+
+    @abstractmethod
+    def count_commitments(self, objective_id: ObjectId) -> int:
+        """Number of stored commitments, for objectives created before commitment_count."""
+
+    # Queries
+
+    @abstractmethod
+    def find_open(self, strategy: str, projection: Optional[dict] = None) -> Iterator[dict]:
+        """Objectives that are not closed and have resolution_strategy `strategy` (any case)."""
+
+    @abstractmethod
+    def find_public(
+        self, projection: Optional[dict], sort: Tuple[str, int], limit: int, closed_only: bool = False
+    ) -> List[dict]:
+        """Objectives whose visibility is not "private", sorted on one of SORT_FIELDS."""
+
+    @abstractmethod
+    def archive_candidates(self, modified_before: str, limit: int) -> List[ObjectId]:
+        """Closed objectives not archived yet, last modified before the ISO timestamp (or never)."""
+
+    # Archive (see archive.py): documents keyed by objective_id, version, field and first
+
+    @abstractmethod
+    def replace_archive(self, objective_id: ObjectId, version: int, documents: List[dict]):
+        """Store `documents` as the archive of this version of the objective, replacing any."""
+
+    @abstractmethod
+    def delete_archive(self, objective_id: ObjectId, version: int):
+        """Remove the archive documents of this version of the objective."""
+
+    @abstractmethod
+    def archive_documents(
+        self, objective_id: ObjectId, version: int, field: str, start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Archive documents of `field` in order of "first"; with start or stop, only
+        the chunks holding positions in [start, stop).
+        """
+
+    # Lifecycle
+
+    @abstractmethod
+    def ping(self, timeout: float):
+        """Raise if the store does not answer within timeout seconds."""
+
+    def ensure_indexes(self):
+        """Create the indexes the queries above rely on."""
+
+    def close(self):
+        """Release connections; the repository reconnects if used again."""
+
+
+def version_matches(document: dict, version) -> bool:
+    """Whether `document` satisfies update()'s version condition."""
+    return version is ANY_VERSION or document.get("version") == version
+
+
+def check_sort(sort: Tuple[str, int]) -> Tuple[str, int]:
+    field, direction = sort
+    if field not in SORT_FIELDS or direction not in (1, -1):
+        raise ValueError(f"Unsupported sort {sort!r}")
+    return field, direction
+
+
+def needs_commitments(projection: Optional[Dict]) -> Optional[str]:
+    """
+    Which commitment data a projection needs: "all", "fields" (everything but the
+    points and ciphertext, for views that only count or label commitments) or None.
+    """
+    if not projection:
+        return "all"
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    include = any(fields.values()) if fields else bool(projection["_id"])
+    named = {key for key in fields if key == "commitments" or key.startswith("commitments.")}
+    if include:
+        if not named:
+            return None
+        if "commitments" in named or named & {"commitments.points", "commitments.ciphertext"}:
+            return "all"
+        return "fields"
+    if "commitments" in named:
+        return None
+    if {"commitments.points", "commitments.ciphertext"} <= named:
+        return "fields"
+    return "all"
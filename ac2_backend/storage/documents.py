@@ -0,0 +1,136 @@
+"""
+MongoDB update operators and projections applied to documents in memory.
+
+The backend describes writes as MongoDB update documents (see resolution_writes.py).
+Repositories that do not store documents in MongoDB apply them with apply_update,
+which supports the operators the backend uses: $set, $unset, $inc and $push (with
+$each), on dotted paths whose numeric parts index into arrays.
+"""
+import copy
+from typing import Any, Dict, List, Optional
+
+SUPPORTED_OPERATORS = ("$set", "$unset", "$inc", "$push")
+
+
+def _parent(document: Any, path: List[str], create: bool):
+    """The container holding the last part of path, or None if it does not exist."""
+    node = document
+    for i, part in enumerate(path[:-1]):
+        if isinstance(node, list) and part.isdigit():
+            index = int(part)
+            if index >= len(node):
+                if not create:
+                    return None
+                node.extend([None] * (index + 1 - len(node)))
+            if node[index] is None and create:
+                node[index] = {}
+            node = node[index]
+        elif isinstance(node, dict):
+            if part not in node:
+                if not create:
+                    return None
+                node[part] = {}
+            node = node[part]
+        else:
+            if not create:
+                return None
+            raise ValueError(f"Cannot traverse {'.'.join(path[:i + 1])!r}")
+    return node
+
+
+def _get(container, key: str, default=None):
+    if isinstance(container, list):
+        index = int(key)
+        return container[index] if index < len(container) else default
+    return container.get(key, default)
+
+
+def _put(container, key: str, value):
+    if isinstance(container, list):
+        index = int(key)
+        if index >= len(container):
+            container.extend([None] * (index + 1 - len(container)))
+        container[index] = value
+    else:
+        container[key] = value
+
+
+def apply_update(document: dict, update: Dict[str, Dict[str, Any]]) -> dict:
+    """Apply `update` to `document` in place, as MongoDB's update_one would, and return it."""
+    for operator, fields in update.items():
+        if operator not in SUPPORTED_OPERATORS:
+            raise ValueError(f"Unsupported update operator {operator}")
+        for dotted, value in fields.items():
+            path = dotted.split(".")
+            if operator == "$unset":
+                parent = _parent(document, path, create=False)
+                if isinstance(parent, dict):
+                    parent.pop(path[-1], None)
+                elif isinstance(parent, list) and int(path[-1]) < len(parent):
+                    parent[int(path[-1])] = None  # MongoDB keeps array positions
+                continue
+
+            parent = _parent(document, path, create=True)
+            value = copy.deepcopy(value)
+            if operator == "$set":
+                _put(parent, path[-1], value)
+            elif operator == "$inc":
+                _put(parent, path[-1], _get(parent, path[-1], 0) + value)
+            else:  # $push
+                target = _get(parent, path[-1])
+                if target is None:
+                    target = []
+                    _put(parent, path[-1], target)
+                if isinstance(value, dict) and "$each" in value:
+                    target.extend(value["$each"])
+                else:
+                    target.append(value)
+    return document
+
+
+def _project(value: Any, tree: Dict[str, Any], include: bool):
+    """Project a (sub)document on a tree of path parts; arrays apply it to each element."""
+    if isinstance(value, list):
+        return [_project(item, tree, include) if isinstance(item, (dict, list)) else item for item in value]
+    if not isinstance(value, dict):
+        return value
+    if include:
+        out = {}
+        for key, item in value.items():
+            if key in tree:
+                out[key] = item if tree[key] is True else _project(item, tree[key], include)
+        return out
+    out = {}
+    for key, item in value.items():
+        if tree.get(key) is True:
+            continue
+        out[key] = _project(item, tree[key], include) if key in tree else item
+    return out
+
+
+def project(document: Optional[dict], projection: Optional[Dict[str, Any]]) -> Optional[dict]:
+    """
+    MongoDB's projection of `document`: either only the listed fields (plus _id,
+    unless it is excluded) or everything but the listed fields.
+    """
+    if document is None or not projection:
+        return document
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    include = any(fields.values()) if fields else bool(projection["_id"])
+    tree: Dict[str, Any] = {}
+    for dotted in fields:
+        node = tree
+        parts = dotted.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if node is True:
+                break
+        else:
+            node[parts[-1]] = True
+    out = _project(document, tree, include)
+    if "_id" in document:
+        if projection.get("_id", 1):
+            out = {"_id": document["_id"], **out}
+        else:
+            out.pop("_id", None)
+    return out
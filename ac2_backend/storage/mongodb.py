@@ -0,0 +1,125 @@
+from typing import Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+
+from ac2_backend.mongo import LazyMongoClient
+from ac2_backend.storage.base import ANY_VERSION, ObjectiveRepository, check_sort
+
+
+class MongoRepository(ObjectiveRepository):
+    """
+    Objectives as documents of one MongoDB collection, with commitments embedded,
+    and archive documents in a second collection.
+    """
+
+    def __init__(self, client: LazyMongoClient, database: str = "objectives_db"):
+        self.client = client
+        self.objectives = client.collection(database, "objectives")
+        self.archive = client.collection(database, "objective_archive")
+
+    # Objectives
+
+    def create(self, objective: dict) -> ObjectId:
+        return self.objectives.insert_one(objective).inserted_id
+
+    def get(self, objective_id: ObjectId, projection: Optional[dict] = None) -> Optional[dict]:
+        return self.objectives.find_one({"_id": objective_id}, projection)
+
+    def update(self, objective_id: ObjectId, update: dict, version=ANY_VERSION) -> bool:
+        query = {"_id": objective_id}
+        if version is None:
+            # Objectives created before versioning start at version 1 on their first versioned write
+            query["version"] = {"$exists": False}
+        elif version is not ANY_VERSION:
+            query["version"] = version
+        return self.objectives.update_one(query, update).matched_count == 1
+
+    def delete(self, objective_id: ObjectId):
+        self.objectives.delete_one({"_id": objective_id})
+        self.archive.delete_many({"objective_id": objective_id})
+
+    def commitments(
+        self, objective_id: ObjectId, offset: int = 0, limit: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[int, dict]]:
+        # One document per commitment, so they are fetched in batches instead of with the whole objective
+        pipeline = [
+            {"$match": {"_id": objective_id}},
+            {"$project": {"commitments": 1}},
+            {"$unwind": {"path": "$commitments", "includeArrayIndex": "index"}},
+        ]
+        if offset:
+            pipeline.append({"$skip": offset})
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+        kwargs = {"batchSize": batch_size} if batch_size else {}
+        for document in self.objectives.aggregate(pipeline, **kwargs):
+            yield document["index"], document["commitments"]
+
+    def count_commitments(self, objective_id: ObjectId) -> int:
+        counted = list(self.objectives.aggregate([
+            {"$match": {"_id": objective_id}},
+            {"$project": {"total": {"$size": {"$ifNull": ["$commitments", []]}}}},
+        ]))
+        return counted[0]["total"] if counted else 0
+
+    # Queries
+
+    def find_open(self, strategy: str, projection: Optional[dict] = None) -> Iterator[dict]:
+        return self.objectives.find(
+            {
+                "closed": {"$ne": True},
+                "resolution_strategy": {"$regex": f"^{strategy}$", "$options": "i"},
+            },
+            projection,
+        )
+
+    def find_public(
+        self, projection: Optional[dict], sort: Tuple[str, int], limit: int, closed_only: bool = False
+    ) -> List[dict]:
+        query = {"visibility": {"$ne": "private"}}
+        if closed_only:
+            query["closed"] = True
+        return list(self.objectives.find(query, projection).sort(*check_sort(sort)).limit(limit))
+
+    def archive_candidates(self, modified_before: str, limit: int) -> List[ObjectId]:
+        candidates = self.objectives.find(
+            {
+                "closed": True,
+                "archived": {"$exists": False},
+                "$or": [{"modified_at": {"$lt": modified_before}}, {"modified_at": {"$exists": False}}],
+            },
+            {"_id": 1},
+        ).limit(limit)
+        return [candidate["_id"] for candidate in candidates]
+
+    # Archive
+
+    def replace_archive(self, objective_id: ObjectId, version: int, documents: List[dict]):
+        self.delete_archive(objective_id, version)
+        if documents:
+            self.archive.insert_many(documents)
+
+    def delete_archive(self, objective_id: ObjectId, version: int):
+        self.archive.delete_many({"objective_id": objective_id, "version": version})
+
+    def archive_documents(
+        self, objective_id: ObjectId, version: int, field: str, start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Iterator[dict]:
+        query = {"objective_id": objective_id, "version": version, "field": field}
+        if start is not None:
+            query["last"] = {"$gt": start}
+        if stop is not None:
+            query["first"] = {"$lt": stop}
+        return self.archive.find(query).sort("first", 1)
+
+    # Lifecycle
+
+    def ping(self, timeout: float):
+        self.client.ping(timeout)
+
+    def ensure_indexes(self):
+        self.archive.create_index([("objective_id", 1), ("version", 1), ("field", 1), ("first", 1)])
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,356 @@
+"""
+Embedded storage in one SQLite file, for single-node deployments.
+
+Every request is then a local file access instead of a MongoDB round trip. The
+database runs in WAL mode, so readers never wait for the writer, and each
+thread has its own connection; statements are constant SQL with parameters,
+which sqlite3 compiles once per connection and keeps in its statement cache.
+
+Layout:
+- objectives: one row per objective, the document (without its commitments) as
+  BSON, plus the columns the queries filter and sort on, derived from it.
+- commitments: one row per commitment, keyed by (objective, position). The
+  ciphertext and points are packed as archive.py records, apart from the other
+  fields, so views that only count or label commitments skip them.
+- archive: archive.py documents, as BSON.
+
+Writes go through documents.apply_update in a BEGIN IMMEDIATE transaction that
+first checks the version, which makes update(..., version=v) a compare-and-swap
+as in MongoDB. Positional updates (commitments.<i>.<field>) rewrite one row.
+"""
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import bson
+from bson import ObjectId
+
+from ac2_backend.archive import pack_record, unpack_record
+from ac2_backend.storage.base import (
+    ANY_VERSION, ObjectiveRepository, check_sort, needs_commitments, version_matches,
+)
+from ac2_backend.storage.documents import apply_update, project
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objectives (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    closed INTEGER NOT NULL,
+    archived INTEGER NOT NULL,
+    visibility TEXT,
+    resolution_strategy TEXT,
+    resolution_date TEXT,
+    title TEXT,
+    modified_at TEXT,
+    document BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objectives_open ON objectives (closed, resolution_strategy);
+CREATE INDEX IF NOT EXISTS objectives_archivable ON objectives (closed, archived, modified_at);
+CREATE TABLE IF NOT EXISTS commitments (
+    objective_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    fields BLOB NOT NULL,
+    PRIMARY KEY (objective_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS archive (
+    objective_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    first INTEGER NOT NULL,
+    last INTEGER,
+    document BLOB NOT NULL,
+    PRIMARY KEY (objective_id, version, field, first)
+) WITHOUT ROWID;
+"""
+
+# Kept in the payload column; everything else is in fields
+PAYLOAD_FIELDS = ("ciphertext", "points")
+# Columns of `objectives` other than id and document, in INSERT order
+COLUMNS = ("closed", "archived", "visibility", "resolution_strategy", "resolution_date", "title", "modified_at")
+SORT_COLUMNS = {"_id": "seq", "title": "title", "resolution_date": "resolution_date", "modified_at": "modified_at"}
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _columns(document: dict) -> Tuple:
+    return (
+        document.get("closed") is True,
+        "archived" in document,
+        _text(document.get("visibility")),
+        _text(document.get("resolution_strategy")),
+        _text(document.get("resolution_date")),
+        _text(document.get("title")),
+        _text(document.get("modified_at")),
+    )
+
+
+def _split(commitment: dict) -> Tuple[bytes, bytes]:
+    payload = {key: commitment[key] for key in PAYLOAD_FIELDS if key in commitment}
+    fields = {key: value for key, value in commitment.items() if key not in PAYLOAD_FIELDS}
+    return pack_record(payload), bson.encode(fields)
+
+
+def _join(payload: Optional[bytes], fields: bytes) -> dict:
+    commitment = bson.decode(fields)
+    if payload is not None:
+        commitment.update(unpack_record(payload))
+    return commitment
+
+
+class SQLiteRepository(ObjectiveRepository):
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    # Connections and transactions
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # isolation_level=None: transactions are begun explicitly below
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False,
+                cached_statements=256,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints rather than at every commit, the usual pairing with WAL
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self, write: bool = False):
+        """A transaction on this thread's connection; writers take the write lock up front."""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _load(self, db, key: str, document: bytes, projection: Optional[dict]) -> dict:
+        objective = bson.decode(document)
+        wanted = needs_commitments(projection)
+        if wanted == "all":
+            rows = db.execute(
+                "SELECT payload, fields FROM commitments WHERE objective_id = ? ORDER BY position", (key,)
+            )
+            objective["commitments"] = [_join(payload, fields) for payload, fields in rows]
+        elif wanted == "fields":
+            rows = db.execute("SELECT fields FROM commitments WHERE objective_id = ? ORDER BY position", (key,))
+            objective["commitments"] = [_join(None, fields) for (fields,) in rows]
+        return project(objective, projection)
+
+    def _insert_commitments(self, db, key: str, first: int, commitments: List[dict]):
+        db.executemany(
+            "INSERT INTO commitments (objective_id, position, payload, fields) VALUES (?, ?, ?, ?)",
+            [(key, first + i, *_split(c)) for i, c in enumerate(commitments)],
+        )
+
+    def _store(self, db, key: str, document: dict):
+        db.execute(
+            "UPDATE objectives SET closed = ?, archived = ?, visibility = ?, resolution_strategy = ?, "
+            "resolution_date = ?, title = ?, modified_at = ?, document = ? WHERE id = ?",
+            (*_columns(document), bson.encode(document), key),
+        )
+
+    # Objectives
+
+    def create(self, objective: dict) -> ObjectId:
+        objective.setdefault("_id", ObjectId())
+        key = str(objective["_id"])
+        document = {field: value for field, value in objective.items() if field != "commitments"}
+        with self._transaction(write=True) as db:
+            db.execute(
+                f"INSERT INTO objectives (id, {', '.join(COLUMNS)}, document) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, *_columns(document), bson.encode(document)),
+            )
+            self._insert_commitments(db, key, 0, objective.get("commitments", []))
+        return objective["_id"]
+
+    def get(self, objective_id: ObjectId, projection: Optional[dict] = None) -> Optional[dict]:
+        key = str(objective_id)
+        with self._transaction() as db:
+            row = db.execute("SELECT document FROM objectives WHERE id = ?", (key,)).fetchone()
+            return None if row is None else self._load(db, key, row[0], projection)
+
+    def update(self, objective_id: ObjectId, update: dict, version=ANY_VERSION) -> bool:
+        key = str(objective_id)
+        objective_update: Dict[str, dict] = {}
+        pushed: List[dict] = []
+        replaced: Optional[List[dict]] = None
+        removed = False
+        # position -> operator -> {path within the commitment: value}
+        positional: Dict[int, Dict[str, dict]] = defaultdict(lambda: defaultdict(dict))
+        for operator, fields in update.items():
+            for path, value in fields.items():
+                head, _, rest = path.partition(".")
+                if head != "commitments":
+                    objective_update.setdefault(operator, {})[path] = value
+                elif not rest and operator == "$push":
+                    pushed += value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                elif not rest and operator == "$set":
+                    replaced = list(value)
+                elif not rest and operator == "$unset":
+                    removed = True
+                else:
+                    position, _, field = rest.partition(".")
+                    if not rest or not position.isdigit() or not field:
+                        raise ValueError(f"Unsupported commitments update {operator} {path!r}")
+                    positional[int(position)][operator][field] = value
+
+        with self._transaction(write=True) as db:
+            row = db.execute("SELECT document FROM objectives WHERE id = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            document = bson.decode(row[0])
+            if not version_matches(document, version):
+                return False
+
+            if removed or replaced is not None:
+                db.execute("DELETE FROM commitments WHERE objective_id = ?", (key,))
+                if replaced:
+                    self._insert_commitments(db, key, 0, replaced)
+            for position, operations in sorted(positional.items()):
+                current = db.execute(
+                    "SELECT payload, fields FROM commitments WHERE objective_id = ? AND position = ?", (key, position)
+                ).fetchone()
+                if current is None:
+                    continue
+                payload, fields = _split(apply_update(_join(*current), operations))
+                db.execute(
+                    "UPDATE commitments SET payload = ?, fields = ? WHERE objective_id = ? AND position = ?",
+                    (payload, fields, key, position),
+                )
+            if pushed:
+                (count,) = db.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM commitments WHERE objective_id = ?", (key,)
+                ).fetchone()
+                self._insert_commitments(db, key, count, pushed)
+            if objective_update:
+                self._store(db, key, apply_update(document, objective_update))
+        return True
+
+    def delete(self, objective_id: ObjectId):
+        key = str(objective_id)
+        with self._transaction(write=True) as db:
+            db.execute("DELETE FROM objectives WHERE id = ?", (key,))
+            db.execute("DELETE FROM commitments WHERE objective_id = ?", (key,))
+            db.execute("DELETE FROM archive WHERE objective_id = ?", (key,))
+
+    def commitments(
+        self, objective_id: ObjectId, offset: int = 0, limit: Optional[int] = None, batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[int, dict]]:
+        # One query per batch rather than an open cursor: a streamed response may
+        # resume on another thread. Positions are append-only, so batches line up.
+        key = str(objective_id)
+        position = offset
+        stop = None if limit is None else offset + limit
+        batch_size = batch_size or 1000
+        while stop is None or position < stop:
+            count = batch_size if stop is None else min(batch_size, stop - position)
+            rows = self._connection().execute(
+                "SELECT position, payload, fields FROM commitments WHERE objective_id = ? AND position >= ? "
+                "ORDER BY position LIMIT ?",
+                (key, position, count),
+            ).fetchall()
+            for index, payload, fields in rows:
+                yield index, _join(payload, fields)
+            if len(rows) < count:
+                return
+            position = rows[-1][0] + 1
+
+    def count_commitments(self, objective_id: ObjectId) -> int:
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM commitments WHERE objective_id = ?", (str(objective_id),)
+        ).fetchone()
+        return count
+
+    # Queries
+
+    def find_open(self, strategy: str, projection: Optional[dict] = None) -> Iterator[dict]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, document FROM objectives WHERE closed = 0 AND upper(resolution_strategy) = upper(?)",
+                (strategy,),
+            ).fetchall()
+            return iter([self._load(db, key, document, projection) for key, document in rows])
+
+    def find_public(
+        self, projection: Optional[dict], sort: Tuple[str, int], limit: int, closed_only: bool = False
+    ) -> List[dict]:
+        field, direction = check_sort(sort)
+        order = f"{SORT_COLUMNS[field]} {'ASC' if direction == 1 else 'DESC'}"
+        closed = " AND closed = 1" if closed_only else ""
+        with self._transaction() as db:
+            rows = db.execute(
+                f"SELECT id, document FROM objectives WHERE visibility IS NOT 'private'{closed} "
+                f"ORDER BY {order} LIMIT ?",
+                (limit,),
+            ).fetchall()
+            return [self._load(db, key, document, projection) for key, document in rows]
+
+    def archive_candidates(self, modified_before: str, limit: int) -> List[ObjectId]:
+        rows = self._connection().execute(
+            "SELECT id FROM objectives WHERE closed = 1 AND archived = 0 "
+            "AND (modified_at IS NULL OR modified_at < ?) LIMIT ?",
+            (modified_before, limit),
+        )
+        return [ObjectId(key) for (key,) in rows]
+
+    # Archive
+
+    def replace_archive(self, objective_id: ObjectId, version: int, documents: List[dict]):
+        key = str(objective_id)
+        with self._transaction(write=True) as db:
+            db.execute("DELETE FROM archive WHERE objective_id = ? AND version = ?", (key, version))
+            db.executemany(
+                "INSERT INTO archive (objective_id, version, field, first, last, document) VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, version, d["field"], d["first"], d.get("last"), bson.encode(d)) for d in documents],
+            )
+
+    def delete_archive(self, objective_id: ObjectId, version: int):
+        with self._transaction(write=True) as db:
+            db.execute("DELETE FROM archive WHERE objective_id = ? AND version = ?", (str(objective_id), version))
+
+    def archive_documents(
+        self, objective_id: ObjectId, version: int, field: str, start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Iterator[dict]:
+        rows = self._connection().execute(
+            "SELECT document FROM archive WHERE objective_id = ? AND version = ? AND field = ? "
+            "AND (? IS NULL OR last > ?) AND (? IS NULL OR first < ?) ORDER BY first",
+            (str(objective_id), version, field, start, start, stop, stop),
+        ).fetchall()
+        return (bson.decode(document) for (document,) in rows)
+
+    # Lifecycle
+
+    def ping(self, timeout: float):
+        self._connection().execute("SELECT 1").fetchone()
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,68 @@
+import hashlib
+import random
+import unittest
+
+import bson
+
+from ac2_backend.archive import (
+    pack_chunks, pack_name_hashes, pack_record, unpack_chunk, unpack_name_hashes, unpack_record,
+)
+
+MOD = 2**127 - 1
+
+
+def commitment(rng, points=5, **fields):
+    return {
+        "name": "HIDDEN",
+        "ciphertext": rng.randbytes(24).hex(),
+        "points": [[str(rng.randrange(1, MOD)), str(rng.randrange(MOD))] for _ in range(points)],
+        "committed_at": "2025-01-01T00:00:00",
+        "is_decline": False,
+        **fields,
+    }
+
+
+class TestArchiveFormat(unittest.TestCase):
+    def test_records_round_trip(self):
+        rng = random.Random(1)
+        commitments = [
+            commitment(rng),
+            commitment(rng, decrypted=True, decrypted_name="Alice", threshold=3, decryption_level=3),
+            commitment(rng, points=0),
+            # Legacy shapes stay in the BSON remainder
+            commitment(rng, coefficients=["1", "2"]),
+            dict(commitment(rng), ciphertext="ABCDEF"),
+            dict(commitment(rng), points=[["007", "1"], ["1", "2"]]),
+            dict(commitment(rng), points=[[str(2**130), "1"]]),
+        ]
+        for c in commitments:
+            self.assertEqual(unpack_record(pack_record(c)), c)
+
+        # Points as 16-byte integers take about a third of their BSON size
+        c = commitment(rng, points=100)
+        self.assertLess(len(pack_record(c)), len(bson.encode(c)) / 2.5)
+
+    def test_chunks_decode_any_range(self):
+        rng = random.Random(2)
+        commitments = [commitment(rng, points=10) for _ in range(50)]
+        chunks = pack_chunks(commitments, chunk_bytes=2000)
+        self.assertGreater(len(chunks), 5)
+        self.assertEqual([c for chunk in chunks for c in unpack_chunk(chunk)], commitments)
+        for start, stop in [(0, 1), (7, 23), (45, 50), (49, 60)]:
+            got = [c for chunk in chunks for c in unpack_chunk(chunk, start, stop)]
+            self.assertEqual(got, commitments[start:stop])
+        self.assertEqual(pack_chunks([]), [])
+
+    def test_name_hashes(self):
+        hashes = [hashlib.sha256(name.encode()).hexdigest() for name in ("Alice", "Bob")]
+        packed = pack_name_hashes(hashes)
+        self.assertEqual(len(packed), 64)
+        self.assertEqual(unpack_name_hashes(packed), hashes)
+        with self.assertRaises(ValueError):
+            pack_name_hashes(["not-a-digest"])
+        with self.assertRaises(ValueError):
+            pack_name_hashes([hashes[0].upper()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from ac2_backend import backend
+from ac2_backend.scheduler import DeadlineScheduler
+from ac2_backend.storage import open_repository
+
+NAMES = ["Alice", "Bob", "Charlie", "Dana", "Eve"]
+
+
+class BackendTestCase(unittest.TestCase):
+    """Runs the routes against a fresh SQLite database; the lifespan (and its background workers) is not started."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.repository = open_repository(f"sqlite:///{directory}/objectives.db")
+        self.addCleanup(self.repository.close)
+        self.patch(backend, "repository", self.repository)
+        self.client = TestClient(backend.app)
+
+    def patch(self, target, name, value):
+        self.addCleanup(setattr, target, name, getattr(target, name))
+        setattr(target, name, value)
+
+    def create(self, names=NAMES, **fields):
+        body = {
+            "title": "Objective",
+            "description": "Test",
+            "eligible_names": names,
+            "resolution_date": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+            "resolution_strategy": "ASAP",
+            "visibility": "public",
+            **fields,
+        }
+        response = self.client.post("/objective", json=body)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["objective_id"]
+
+    def commit(self, objective_id, name, number):
+        return self.client.patch(f"/commit/{objective_id}", json={"name": name, "Number": number}).json()
+
+    def stored(self, objective_id):
+        return self.repository.get(ObjectId(objective_id))
+
+
+class TestCommit(BackendTestCase):
+    def test_concurrent_commits_are_all_stored(self):
+        names = [f"member-{i}" for i in range(30)]
+        # Every lost compare-and-swap is another commit's win, so each commit gets through
+        # within len(names) attempts; with fewer, giving up (busy) is a valid answer
+        self.patch(backend, "COMMIT_MAX_ATTEMPTS", len(names))
+        objective_id = self.create(names)
+        barrier = threading.Barrier(len(names))
+        results = {}
+
+        def commit(name):
+            barrier.wait()
+            results[name] = self.commit(objective_id, name, len(names))
+
+        threads = [threading.Thread(target=commit, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({r["message"] for r in results.values()}, {"Commitment stored."})
+        objective = self.stored(objective_id)
+        self.assertEqual(len(objective["commitments"]), 30)
+        self.assertEqual(len(set(objective["used_name_hashes"])), 30)
+        self.assertEqual(objective["commitment_count"], 30)
+        self.assertEqual(objective["level_counts"][-1], 30)
+        # One bump per commit, then at least the close once everyone had responded
+        self.assertGreaterEqual(objective["version"], 31)
+        self.assertTrue(objective["closed"])
+        self.assertEqual(sorted(objective["committed_people"]), sorted(names))
+
+    def test_commit_retries_after_a_concurrent_write(self):
+        objective_id = self.create()
+        restore_encrypter = backend.restore_encrypter
+        read_versions = []
+
+        def racing_restore(objective):
+            read_versions.append(objective["version"])
+            if len(read_versions) == 1:
+                # Bob commits between Alice's read and her write
+                self.assertEqual(self.commit(objective_id, "Bob", 5)["message"], "Commitment stored.")
+            return restore_encrypter(objective)
+
+        self.patch(backend, "restore_encrypter", racing_restore)
+        conflicts = backend.WRITE_CONFLICTS.value(writer="commit")
+        self.assertEqual(self.commit(objective_id, "Alice", 5)["message"], "Commitment stored.")
+
+        # Alice's request read version 0, lost to Bob's write and succeeded on version 1
+        self.assertEqual(read_versions, [0, 0, 1])
+        self.assertEqual(backend.WRITE_CONFLICTS.value(writer="commit"), conflicts + 1)
+        objective = self.stored(objective_id)
+        self.assertEqual(objective["commitment_count"], 2)
+        self.assertEqual(objective["version"], 2)
+        # Alice's retry drew new x values instead of reusing Bob's
+        xs = [point[0] for c in objective["commitments"] for point in c["points"] if point[0] != "0"]
+        self.assertEqual(len(xs), len(set(xs)))
+
+    def test_gives_up_after_max_attempts(self):
+        objective_id = self.create()
+        restore_encrypter = backend.restore_encrypter
+
+        def always_raced(objective):
+            self.repository.update(objective["_id"], {"$inc": {"version": 1}})
+            return restore_encrypter(objective)
+
+        self.patch(backend, "restore_encrypter", always_raced)
+        self.patch(backend, "COMMIT_MAX_ATTEMPTS", 3)
+        self.patch(backend, "COMMIT_RETRY_BACKOFF_SECONDS", 0.0)
+        self.assertEqual(self.commit(objective_id, "Alice", 5), backend.commit_conflict_response())
+        self.assertEqual(self.stored(objective_id)["commitment_count"], 0)
+
+
+class TestResolveOnRead(BackendTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patch(backend, "DEADLINE_RESOLVER_ENABLED", False)
+        self.objective_id = self.create(resolution_strategy="DEADLINE")
+        for name in ("Alice", "Bob"):
+            self.assertEqual(self.commit(self.objective_id, name, 2)["message"], "Commitment stored.")
+        self.assertFalse(self.stored(self.objective_id)["closed"])
+
+    def pass_deadline(self):
+        self.repository.update(ObjectId(self.objective_id), {"$set": {"resolution_date": datetime(2020, 1, 1)}})
+
+    def test_view_resolves_past_due_objective(self):
+        etag = self.client.get(f"/objective/{self.objective_id}").headers["ETag"]
+        self.pass_deadline()
+        response = self.client.get(f"/objective/{self.objective_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["closed"])
+        self.assertEqual(response.json()["committed_people"], ["Alice", "Bob"])
+
+    def test_listing_resolves_past_due_objective(self):
+        self.pass_deadline()
+        [listed] = self.client.get("/objectives").json()
+        self.assertTrue(listed["closed"])
+        self.assertEqual(listed["committed_people"], ["Alice", "Bob"])
+
+    def test_not_with_the_resolver(self):
+        self.patch(backend, "DEADLINE_RESOLVER_ENABLED", True)
+        self.patch(backend, "deadline_scheduler", DeadlineScheduler(backend.resolve_due_objective))
+        self.pass_deadline()
+        self.assertFalse(self.client.get(f"/objective/{self.objective_id}").json()["closed"])
+        self.assertFalse(self.client.get("/objectives").json()[0]["closed"])
+
+
+class TestAdmission(BackendTestCase):
+    def test_deferred_resolution_is_not_pushed_back(self):
+        scheduler = DeadlineScheduler(backend.resolve_due_objective, grace_seconds=0)
+        self.patch(backend, "deadline_scheduler", scheduler)
+        objective_id = str(ObjectId())
+        self.addCleanup(backend.offloaded_resolutions.discard, objective_id)
+
+        backend.offload_resolution(objective_id, "defer")
+        due = scheduler.due(objective_id)
+        backend.offload_resolution(objective_id, "defer")
+        self.assertEqual(scheduler.due(objective_id), due)
+        # Work that should run now still moves it forward
+        backend.offload_resolution(objective_id, "background")
+        self.assertLess(scheduler.due(objective_id), due)
+
+
+class TestMetrics(BackendTestCase):
+    def test_objective_ids_are_not_exported(self):
+        objective_id = self.create(visibility="private")
+        runs = backend.DECRYPTION_DURATION.count()
+        self.assertEqual(self.commit(objective_id, "Alice", 1)["message"], "Commitment stored.")
+        self.assertEqual(backend.DECRYPTION_DURATION.count(), runs + 1)
+
+        metrics = self.client.get("/metrics").text
+        self.assertIn("ac2_decryption_duration_seconds_count", metrics)
+        self.assertNotIn(objective_id, metrics)
+
+
+class TestCommitBatch(BackendTestCase):
+    def test_per_item_results(self):
+        objective_id = self.create(allowed_thresholds=[2, 3])
+        batch = [
+            {"name": "Alice", "Number": 2},
+            {"name": "Alice", "Number": 3},
+            {"name": "Mallory", "Number": 2},
+            {"name": "Bob", "Number": 4},
+            {"name": "Charlie", "Number": 0},
+        ]
+        results = self.client.post(f"/commit/{objective_id}/batch", json={"commitments": batch}).json()["results"]
+
+        self.assertEqual([r["message"] for r in results], [
+            "Commitment stored.",
+            "Already committed",
+            # Ineligible names get a fake success that is never stored
+            "Commitment stored.",
+            "Number must be one of the allowed thresholds: 2, 3.",
+            "Commitment stored.",
+        ])
+        objective = self.stored(objective_id)
+        self.assertEqual([c["ciphertext"] for c in objective["commitments"]],
+                         [results[0]["ciphertext"], results[4]["ciphertext"]])
+        self.assertNotIn(results[2]["ciphertext"], [c["ciphertext"] for c in objective["commitments"]])
+        self.assertEqual(objective["commitment_count"], 2)
+        self.assertEqual(objective["version"], 1)
+
+        # Duplicates are also caught across requests, and Bob may retry with an allowed threshold
+        results = self.client.post(f"/commit/{objective_id}/batch", json={"commitments": [
+            {"name": "Alice", "Number": 3}, {"name": "Bob", "Number": 3},
+        ]}).json()["results"]
+        self.assertEqual([r["message"] for r in results], ["Already committed", "Commitment stored."])
+        self.assertEqual(self.stored(objective_id)["commitment_count"], 3)
+
+    def test_nothing_to_store(self):
+        objective_id = self.create()
+        self.commit(objective_id, "Alice", 5)
+        response = self.client.post(f"/commit/{objective_id}/batch", json={"commitments": [
+            {"name": "Alice", "Number": 2}, {"name": "Mallory", "Number": 2},
+        ]}).json()
+        self.assertEqual([r["message"] for r in response["results"]], ["Already committed", "Commitment stored."])
+        self.assertEqual(self.stored(objective_id)["version"], 1)
+
+
+class TestConditionalRequests(BackendTestCase):
+    def assert_revalidates(self, path, objective_id):
+        first = self.client.get(path)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+
+        cached = self.client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertEqual(cached.headers["ETag"], etag)
+
+        self.assertEqual(self.commit(objective_id, "Alice", 5)["message"], "Commitment stored.")
+        changed = self.client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        self.assertEqual(
+            self.client.get(path, headers={"If-None-Match": changed.headers["ETag"]}).status_code, 304
+        )
+        return changed
+
+    def test_objective_view(self):
+        objective_id = self.create()
+        changed = self.assert_revalidates(f"/objective/{objective_id}", objective_id)
+        self.assertEqual(changed.json()["commitment_count"], 1)
+
+    def test_objective_listing(self):
+        objective_id = self.create()
+        self.create(title="Other")
+        changed = self.assert_revalidates("/objectives", objective_id)
+        self.assertEqual(len(changed.json()), 2)
+
+    def test_unknown_objective(self):
+        response = self.client.get(f"/objective/{ObjectId()}", headers={"If-None-Match": 'W/"x"'})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
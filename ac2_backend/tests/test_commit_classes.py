@@ -0,0 +1,343 @@
+import random
+import unittest
+from itertools import combinations
+from math import comb
+
+from ac2_backend.core.commit_classes import (
+    NameHolder, CommitEncrypter, CommitDecrypter, SearchCursor, InterpolationCache, revolving_door_from,
+    normalize_levels,
+)
+
+NAMES = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank"]
+
+
+def reference_points(entries, members, min_count, seed):
+    """
+    Points of one-at-a-time commits, evaluated term by term: coefficients come first
+    from random.Random(seed), then one fresh x per real point, in commit and level order.
+    """
+    mod = 2**127 - 1
+    n = len(members)
+    rng = random.Random(seed)
+    coeffs = [rng.randint(0, mod - 1) for _ in range(n)]
+    used_xs, committed, result = set(), set(), []
+    for name, threshold in entries:
+        real = name in members and name not in committed and threshold != -1
+        if name in members:
+            committed.add(name)
+        if not real:
+            result.append([(0, 0)] * n)
+            continue
+        first_real = max(min_count, max(1, min(threshold, n)))
+        points = []
+        for level in range(1, n + 1):
+            if level < first_real:
+                points.append((0, 0))
+                continue
+            x = rng.randint(1, mod - 1)
+            while x in used_xs:
+                x = rng.randint(1, mod - 1)
+            used_xs.add(x)
+            points.append((x, sum(a * pow(x, j, mod) for j, a in enumerate(coeffs[:level])) % mod))
+        result.append(points)
+    return result
+
+
+class TestCommitMany(unittest.TestCase):
+    def test_matches_reference_evaluation(self):
+        entries = [("Alice", 1), ("Bob", 3), ("Charlie", -1), ("Mallory", 2), ("Alice", 2), ("Dana", 6), ("Eve", 9)]
+        expected = reference_points(entries, NAMES, 2, "seed")
+
+        encrypter = CommitEncrypter(NameHolder(NAMES), 2, seed="seed")
+        self.assertEqual([points for _, points in encrypter.commit_many(entries)], expected)
+
+        # Committing one at a time draws the same x values in the same order
+        encrypter = CommitEncrypter(NameHolder(NAMES), 2, seed="seed")
+        self.assertEqual([encrypter.commit(name, t)[1] for name, t in entries], expected)
+
+    def test_batch_decrypts(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        for ciphertext, points in encrypter.commit_many([("Alice", 1), ("Bob", 2), ("Charlie", 4)]):
+            decrypter.add_commitment(ciphertext, points)
+        self.assertEqual(decrypter.decrypt(), ["Alice", "Bob"])
+
+
+class TestDecryptionStats(unittest.TestCase):
+    def test_stats_describe_the_run(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        for name, t in [("Alice", 1), ("Bob", 2), ("Charlie", 2)]:
+            decrypter.add_commitment(*encrypter.commit(name, t))
+        decrypter.decrypt_with_details()
+
+        stats = decrypter.stats
+        self.assertEqual([level.level for level in stats.levels], [1, 2, 3])
+        self.assertEqual([level.path for level in stats.levels], ["search", "search", "confirmed"])
+        self.assertTrue(all(level.solved for level in stats.levels))
+        self.assertEqual(stats.combinations_explored, 2)
+        self.assertEqual(stats.decrypt_successes, 3)
+        self.assertEqual(stats.recover_coeffs_calls, 3)
+        self.assertFalse(stats.cap_reached)
+
+    def test_cap_reached_is_reported(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        decrypter.MAX_COMBS = 1
+        for name in NAMES[:4]:
+            ciphertext, points = encrypter.commit(name, 3)
+            # Shares that are not on the polynomial make every subset inconsistent
+            decrypter.add_commitment(ciphertext, [(x, 2 * y) for x, y in points])
+        names, _ = decrypter.decrypt_with_details()
+        self.assertEqual(names, [])
+        self.assertTrue(decrypter.stats.cap_reached)
+
+
+class TestThresholdBuckets(unittest.TestCase):
+    def test_commitments_grouped_by_threshold(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        for name, t in [("Alice", 1), ("Bob", 3), ("Charlie", -1), ("Dana", 2), ("Eve", 3)]:
+            decrypter.add_commitment(*encrypter.commit(name, t))
+        # Declines have no real level and are in no bucket
+        self.assertEqual(decrypter.thresholds, [1, 3, None, 2, 3])
+        self.assertEqual(decrypter.buckets, {1: [0], 3: [1, 4], 2: [3]})
+        self.assertEqual(decrypter.decrypt(), ["Alice", "Bob", "Dana", "Eve"])
+
+    def test_one_key_trial_per_unknown_commitment(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        for name in NAMES:
+            decrypter.add_commitment(*encrypter.commit(name, 1))
+        decrypter.decrypt_with_details()
+        # Level 1 finds one name by search; the rest are each tried once with the shared key
+        self.assertEqual(decrypter.stats.decrypt_attempts, len(NAMES))
+        self.assertEqual(decrypter.stats.decrypt_successes, len(NAMES))
+
+
+class TestDeclaredLevels(unittest.TestCase):
+    def test_points_only_at_declared_levels(self):
+        levels = [2, 4, 6]
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed", levels=levels)
+        commitments = encrypter.commit_many([(name, t) for name, t in zip(NAMES, [2, 2, 3, 4, -1, 6])])
+        self.assertEqual({len(points) for _, points in commitments}, {len(levels)})
+
+        decrypter = CommitDecrypter(len(NAMES), levels=levels)
+        for ciphertext, points in commitments:
+            decrypter.add_commitment(ciphertext, points)
+        # 3 is rounded up to 4; Charlie and Dana are revealed once four points exist at level 4
+        self.assertEqual(decrypter.thresholds, [2, 2, 4, 4, None, 6])
+        names, details = decrypter.decrypt_with_details()
+        self.assertEqual(names, ["Alice", "Bob", "Charlie", "Dana"])
+        self.assertEqual(details[2]["threshold"], 4)
+        self.assertEqual(decrypter.estimate_cost().min_combinations, decrypter.stats.combinations_explored)
+
+    def test_threshold_above_highest_level_stores_noise(self):
+        names = ["a", "b", "c", "d", "e"]
+        encrypter = CommitEncrypter(NameHolder(names), 1, seed="seed", levels=[2, 3])
+        self.assertIsNone(encrypter.round_threshold(5))
+        self.assertEqual(encrypter.round_threshold(3), 3)
+
+        decrypter = CommitDecrypter(len(names), levels=[2, 3])
+        for ciphertext, points in encrypter.commit_many([("a", 5), ("b", 5), ("c", 5)]):
+            self.assertEqual(points, [(0, 0), (0, 0)])
+            decrypter.add_commitment(ciphertext, points)
+        # Rounding 5 down to 3 would reveal all three to each other
+        self.assertEqual(decrypter.thresholds, [None, None, None])
+        self.assertEqual(decrypter.decrypt(), [])
+
+    def test_normalize_levels(self):
+        self.assertEqual(normalize_levels(None, 3), [1, 2, 3])
+        self.assertEqual(normalize_levels([5, 2, 9, 2], 6), [2, 5])
+        with self.assertRaises(ValueError):
+            normalize_levels([7, 0], 6)
+
+
+class TestCostEstimate(unittest.TestCase):
+    def make_decrypter(self, thresholds):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = CommitDecrypter(len(NAMES))
+        for name, t in zip(NAMES, thresholds):
+            decrypter.add_commitment(*encrypter.commit(name, t))
+        return decrypter
+
+    def test_honest_run_is_the_minimum(self):
+        decrypter = self.make_decrypter([2, 2, 2, -1, 5, 5])
+        estimate = decrypter.estimate_cost()
+        self.assertEqual(
+            [level.path for level in estimate.levels],
+            ["unsolvable", "search", "confirmed", "unsolvable", "search", "unsolvable"],
+        )
+        # Counts alone give the same estimate
+        self.assertEqual(CommitDecrypter.estimate_from_counts([0, 3, 3, 3, 5, 5]), estimate)
+
+        decrypter.decrypt_with_details()
+        self.assertEqual(decrypter.stats.combinations_explored, estimate.min_combinations)
+        self.assertEqual(decrypter.stats.decrypt_attempts, estimate.key_trials)
+        self.assertLessEqual(estimate.min_seconds, estimate.max_seconds)
+
+    def test_maximum_bounds_the_search(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        commitments = [encrypter.commit(name, 3) for name in NAMES]
+        # Shares off their polynomial fail every subset they are part of
+        for idx in (0, 1):
+            ciphertext, points = commitments[idx]
+            commitments[idx] = (ciphertext, [(x, 2 * y) for x, y in points])
+        decrypter = CommitDecrypter(len(NAMES))
+        for ciphertext, points in commitments:
+            decrypter.add_commitment(ciphertext, points)
+
+        estimate = decrypter.estimate_cost()
+        self.assertEqual(estimate.max_combinations, comb(len(NAMES), 3))
+        decrypter.decrypt_with_details()
+        self.assertGreater(decrypter.stats.combinations_explored, estimate.min_combinations)
+        self.assertLessEqual(decrypter.stats.combinations_explored, estimate.max_combinations)
+
+    def test_cursor_skips_finished_work(self):
+        decrypter = self.make_decrypter([3] * len(NAMES))
+        full = decrypter.estimate_cost()
+        resumed = decrypter.estimate_cost(SearchCursor(level=3, rank=4, commitment_count=len(NAMES)))
+        self.assertEqual([level.level for level in resumed.levels], [3, 4, 5, 6])
+        self.assertEqual(resumed.levels[0].max_combinations, comb(6, 3) - 4)
+        self.assertLess(resumed.max_seconds, full.max_seconds)
+        # A cursor for other commitments is ignored, as decrypt_with_details ignores it
+        stale = decrypter.estimate_cost(SearchCursor(level=3, rank=4, commitment_count=2))
+        self.assertEqual(stale, full)
+
+
+class TestResumableSearch(unittest.TestCase):
+    def make_decrypter(self, commitments):
+        decrypter = CommitDecrypter(len(NAMES))
+        for ciphertext, points in commitments:
+            decrypter.add_commitment(ciphertext, points)
+        return decrypter
+
+    def test_revolving_door_order(self):
+        subsets = list(revolving_door_from(7, 3))
+        self.assertEqual(sorted(subset for subset, _, _ in subsets), list(combinations(range(7), 3)))
+        for (before, _, _), (after, left, entered) in zip(subsets, subsets[1:]):
+            # Neighbours differ by swapping a single element
+            self.assertEqual(set(after), set(before) - {left} | {entered})
+        for start in (0, 1, 10, comb(7, 3) - 1, comb(7, 3)):
+            resumed = [subset for subset, _, _ in revolving_door_from(7, 3, start)]
+            self.assertEqual(resumed, [subset for subset, _, _ in subsets[start:]])
+
+    def test_sliced_search_matches_full_run(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        commitments = [encrypter.commit(name, t) for name, t in zip(NAMES, [2, 2, 2, 3, 3, 5])]
+        # One share off its polynomial forces the level-2 and level-3 searches
+        ciphertext, points = commitments[0]
+        commitments[0] = (ciphertext, [(x, 2 * y) for x, y in points])
+
+        expected = self.make_decrypter(commitments).decrypt_with_details()
+
+        cursor, details, runs = None, None, 0
+        while True:
+            decrypter = self.make_decrypter(commitments)
+            decrypter.MAX_COMBS = 1
+            # A zero budget stops at the first chance, so every slice does minimal work
+            names, details = decrypter.decrypt_with_details(time_budget=0, cursor=cursor, known_details=details)
+            runs += 1
+            if decrypter.cursor is None:
+                break
+            self.assertFalse(decrypter.stats.completed)
+            # The cursor must survive a round trip through storage
+            cursor = SearchCursor.from_dict(decrypter.cursor.to_dict())
+
+        self.assertGreater(runs, 1)
+        self.assertEqual(sorted(names), sorted(expected[0]))
+        self.assertEqual(details, expected[1])
+
+    def test_cursor_from_other_order_restarts_level(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        commitments = [encrypter.commit(name, 3) for name in NAMES]
+        # Only the first three shares are consistent: the subset with rank 0 in either order
+        for idx in (3, 4, 5):
+            ciphertext, points = commitments[idx]
+            commitments[idx] = (ciphertext, [(x, 2 * y) for x, y in points])
+        stored = {"level": 3, "rank": 1, "commitment_count": len(NAMES), "confirmed": {}}
+
+        decrypter = self.make_decrypter(commitments)
+        names, _ = decrypter.decrypt_with_details(cursor=SearchCursor.from_dict(stored))
+        # A stored lexicographic rank is not reused
+        self.assertEqual(sorted(names), sorted(NAMES))
+
+        decrypter = self.make_decrypter(commitments)
+        names, _ = decrypter.decrypt_with_details(cursor=SearchCursor.from_dict(dict(stored, order="revolving-door")))
+        self.assertEqual(names, [])
+
+    def test_cursor_for_other_commitments_restarts(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        decrypter = self.make_decrypter([encrypter.commit(name, 2) for name in NAMES[:3]])
+        stale = SearchCursor(level=3, rank=5, commitment_count=2)
+        names, _ = decrypter.decrypt_with_details(cursor=stale)
+        self.assertEqual(sorted(names), sorted(NAMES[:3]))
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_matches_serial_search(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        commitments = [encrypter.commit(name, 3) for name in NAMES]
+        for idx in (0, 2):
+            ciphertext, points = commitments[idx]
+            commitments[idx] = (ciphertext, [(x, 2 * y) for x, y in points])
+
+        results = []
+        for workers in (1, 2):
+            decrypter = CommitDecrypter(len(NAMES))
+            # Force even tiny levels onto the pool
+            decrypter.PARALLEL_MIN_COMBS = 1
+            for ciphertext, points in commitments:
+                decrypter.add_commitment(ciphertext, points)
+            results.append(decrypter.decrypt_with_details(workers=workers))
+
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(sorted(results[1][0]), sorted(NAMES))
+
+
+class TestInterpolationCache(unittest.TestCase):
+    def setUp(self):
+        encrypter = CommitEncrypter(NameHolder(NAMES), 1, seed="seed")
+        self.commitments = [encrypter.commit(name, t) for name, t in zip(NAMES, [1, 2, 3, 3, 3, 4])]
+        ciphertext, points = self.commitments[2]
+        self.commitments[2] = (ciphertext, [(x, 2 * y) for x, y in points])
+
+    def run_decrypter(self, cache):
+        decrypter = CommitDecrypter(len(NAMES), cache=cache)
+        for ciphertext, points in self.commitments:
+            decrypter.add_commitment(ciphertext, points)
+        return decrypter, decrypter.decrypt_with_details()
+
+    def test_repeated_run_is_served_from_cache(self):
+        cache = InterpolationCache()
+        first, expected = self.run_decrypter(cache)
+        second, result = self.run_decrypter(cache)
+
+        self.assertEqual(result, expected)
+        self.assertGreater(first.stats.combinations_explored, 0)
+        self.assertEqual(second.stats.combinations_explored, 0)
+        self.assertEqual(second.stats.cache_misses, 0)
+        self.assertEqual(second.stats.recover_coeffs_calls, 0)
+        self.assertEqual(cache.hits, second.stats.cache_hits)
+
+    def test_export_and_load(self):
+        cache = InterpolationCache()
+        decrypter, expected = self.run_decrypter(cache)
+        restored = InterpolationCache()
+        restored.load(cache.export(decrypter.cache_keys))
+        again, result = self.run_decrypter(restored)
+        self.assertEqual(result, expected)
+        self.assertEqual(again.stats.cache_misses, 0)
+
+    def test_bounded(self):
+        cache = InterpolationCache(max_entries=2)
+        for i in range(3):
+            cache.put(f"c:{i}", [i])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get("c:0"))
+        self.assertEqual(cache.get("c:2"), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
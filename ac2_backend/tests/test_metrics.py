@@ -0,0 +1,48 @@
+import unittest
+
+from ac2_backend.metrics import Registry
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_exposition(self):
+        registry = Registry()
+        latency = registry.histogram("req_seconds", "Request latency.", ["route"], buckets=(0.1, 1.0))
+        latency.observe(0.05, route="/a")
+        latency.observe(0.5, route="/a")
+        latency.observe(5, route="/a")
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE req_seconds histogram", lines)
+        self.assertIn('req_seconds_bucket{route="/a",le="0.1"} 1', lines)
+        self.assertIn('req_seconds_bucket{route="/a",le="1"} 2', lines)
+        self.assertIn('req_seconds_bucket{route="/a",le="+Inf"} 3', lines)
+        self.assertIn('req_seconds_sum{route="/a"} 5.55', lines)
+        self.assertIn('req_seconds_count{route="/a"} 3', lines)
+
+    def test_time_observes_on_error(self):
+        registry = Registry()
+        stage = registry.histogram("stage_seconds", "Stage latency.", ["stage"])
+        with self.assertRaises(RuntimeError):
+            with stage.time(stage="decrypt"):
+                raise RuntimeError("boom")
+        self.assertEqual(stage.count(stage="decrypt"), 1)
+
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        runs = registry.counter("runs_total", "Runs.")
+        registry.gauge("recent_seconds", "Recent.", ["objective_id"], lambda: [(("abc",), 1.5)])
+        self.assertIn("runs_total 0", registry.render())
+        runs.inc(2)
+        text = registry.render()
+        self.assertIn("runs_total 2", text)
+        self.assertIn('recent_seconds{objective_id="abc"} 1.5', text)
+
+    def test_label_names_are_checked(self):
+        registry = Registry()
+        latency = registry.histogram("req_seconds", "Request latency.", ["route"])
+        with self.assertRaises(ValueError):
+            latency.observe(1.0, path="/a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from ac2_backend.mongo import LazyMongoClient
+
+# Nothing listens here; the tests never need a server
+UNREACHABLE = "mongodb://127.0.0.1:1/"
+
+
+class TestLazyMongoClient(unittest.TestCase):
+    def test_connects_on_first_use(self):
+        mongo = LazyMongoClient(UNREACHABLE, connect=False)
+        objectives = mongo.collection("objectives_db", "objectives")
+        self.assertFalse(mongo.connected)
+
+        self.assertEqual(objectives.full_name, "objectives_db.objectives")
+        self.assertTrue(mongo.connected)
+        client = mongo.get()
+        self.assertIs(objectives.database.client, client)
+
+        # A closed client is replaced on next use, and collections follow it
+        mongo.close()
+        self.assertFalse(mongo.connected)
+        self.assertIsNot(objectives.database.client, client)
+        mongo.close()
+
+    def test_ping_fails_within_timeout(self):
+        mongo = LazyMongoClient(UNREACHABLE, connect=False, serverSelectionTimeoutMS=100)
+        with self.assertRaises(Exception):
+            mongo.ping(0.2)
+        mongo.close()
+
+    def test_failed_creation_is_retried(self):
+        mongo = LazyMongoClient("mongodb+srv://ac2-test.invalid/")
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                mongo.get()
+            self.assertFalse(mongo.connected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from ac2_backend.resolution_writes import resolution_update, stored_level_coefficients
+
+
+def detail(name, level, coefficients):
+    return {"name": name, "threshold": level, "coefficients": coefficients, "level": level}
+
+
+class TestResolutionUpdate(unittest.TestCase):
+    def test_only_changed_commitments_are_written(self):
+        objective = {
+            "commitments": [
+                {"ciphertext": "a", "decrypted": True, "decrypted_name": "Alice", "threshold": 2, "decryption_level": 2},
+                {"ciphertext": "b", "decrypted": False},
+                {"ciphertext": "c", "decrypted": False},
+            ],
+            "level_coefficients": {"2": ["1", "2"]},
+        }
+        details = {0: detail("Alice", 2, [1, 2]), 2: detail("Charlie", 2, [1, 2])}
+
+        update = resolution_update(objective, details)
+        self.assertEqual(update, {"$set": {
+            "commitments.2.decrypted": True,
+            "commitments.2.decrypted_name": "Charlie",
+            "commitments.2.threshold": 2,
+            "commitments.2.decryption_level": 2,
+        }})
+
+    def test_new_level_and_legacy_coefficients(self):
+        objective = {
+            "commitments": [
+                {"ciphertext": "a", "decrypted": True, "decrypted_name": "Alice", "threshold": 2,
+                 "decryption_level": 2, "coefficients": ["1", "2"]},
+                {"ciphertext": "b"},
+            ],
+        }
+        self.assertEqual(stored_level_coefficients(objective), {"2": ["1", "2"]})
+
+        # Alice's coefficients grow with a higher level found later
+        coefficients = [1, 2, 3]
+        details = {0: dict(detail("Alice", 2, coefficients), level=3), 1: detail("Bob", 3, coefficients)}
+        update = resolution_update(objective, details)
+        self.assertEqual(update["$set"]["level_coefficients"], {"3": ["1", "2", "3"]})
+        self.assertEqual(update["$set"]["commitments.0.decryption_level"], 3)
+        self.assertEqual(update["$unset"], {"commitments.0.coefficients": ""})
+        self.assertNotIn("commitments.0.decrypted_name", update["$set"])
+
+
+if __name__ == "__main__":
+    unittest.main()
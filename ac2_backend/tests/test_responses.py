@@ -0,0 +1,110 @@
+import json
+import unittest
+from datetime import datetime
+
+from fastapi import FastAPI, Header
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from ac2_backend.responses import (
+    CompressionMiddleware, FastJSONResponse, dumps, entity_tag, etag_matches, http_date, negotiate_encoding,
+    not_modified, validator_headers,
+)
+
+
+def make_app(minimum_size=100):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/points")
+    def points(n: int):
+        return FastJSONResponse({"points": [[str(i), str(2**100 + i)] for i in range(n)]})
+
+    @app.get("/versioned")
+    def versioned(version: int, if_none_match: str = Header(None)):
+        headers = validator_headers(entity_tag(version), http_date("2025-01-02T03:04:05.678"))
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers)
+        return FastJSONResponse({"points": [[str(i), str(2**100 + i)] for i in range(200)]}, headers=headers)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f'{{"i":{i}}}\n' for i in range(50)), media_type="application/x-ndjson")
+
+    return app
+
+
+class TestSerialization(unittest.TestCase):
+    def test_dumps_matches_standard_library(self):
+        content = {"points": [["1", "2"]], "level_coefficients": {"2": ["3"]}, "name": "Zoë", "closed": None}
+        self.assertEqual(json.loads(dumps(content)), content)
+        self.assertEqual(json.loads(dumps({"at": datetime(2025, 1, 2, 3, 4, 5)})), {"at": "2025-01-02T03:04:05"})
+        # Integers orjson cannot encode fall back to the standard library
+        self.assertEqual(json.loads(dumps({"big": 2**127 - 1})), {"big": 2**127 - 1})
+
+    def test_negotiate_encoding(self):
+        self.assertIsNone(negotiate_encoding(""))
+        self.assertIsNone(negotiate_encoding("identity"))
+        self.assertIsNone(negotiate_encoding("gzip;q=0"))
+        self.assertEqual(negotiate_encoding("deflate, GZIP"), "gzip")
+        self.assertIn(negotiate_encoding("*"), ("br", "gzip"))
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def test_large_responses_are_compressed(self):
+        client = TestClient(make_app())
+        response = client.get("/points?n=200", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        # Content-Length is the compressed size; httpx hands back the decoded body
+        self.assertLess(int(response.headers["content-length"]), len(response.content))
+        self.assertEqual(len(response.json()["points"]), 200)
+
+        small = client.get("/points?n=1", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", small.headers)
+        plain = client.get("/points?n=200", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(plain.json(), response.json())
+
+    def test_streams_are_compressed_per_chunk(self):
+        response = TestClient(make_app()).get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual([json.loads(line)["i"] for line in response.text.splitlines()], list(range(50)))
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def test_validators(self):
+        tag = entity_tag(3, "2025-01-02T03:04:05", 10)
+        self.assertTrue(tag.startswith('W/"'))
+        self.assertEqual(tag, entity_tag(3, "2025-01-02T03:04:05", 10))
+        self.assertNotEqual(tag, entity_tag(4, "2025-01-02T03:04:05", 10))
+
+        self.assertTrue(etag_matches(tag, tag))
+        self.assertTrue(etag_matches(f'"other", {tag.removeprefix("W/")}', tag))
+        self.assertTrue(etag_matches("*", tag))
+        self.assertFalse(etag_matches(None, tag))
+        self.assertFalse(etag_matches('W/"other"', tag))
+
+        self.assertEqual(http_date("2025-01-02T03:04:05.678"), "Thu, 02 Jan 2025 03:04:05 GMT")
+        self.assertIsNone(http_date(None))
+        self.assertIsNone(http_date("yesterday"))
+
+    def test_not_modified(self):
+        client = TestClient(make_app())
+        first = client.get("/versioned?version=1", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(first.headers["content-encoding"], "gzip")
+        self.assertEqual(first.headers["last-modified"], "Thu, 02 Jan 2025 03:04:05 GMT")
+
+        # The weak tag of the compressed response revalidates the same representation
+        again = client.get("/versioned?version=1", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], first.headers["etag"])
+
+        changed = client.get("/versioned?version=2", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], first.headers["etag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from ac2_backend.scheduler import DeadlineScheduler, PeriodicTask
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def test_resolves_in_deadline_order(self):
+        resolved = []
+        done = threading.Event()
+
+        def resolve(objective_id):
+            resolved.append(objective_id)
+            if len(resolved) == 3:
+                done.set()
+
+        scheduler = DeadlineScheduler(resolve, grace_seconds=0)
+        now = datetime.utcnow()
+        scheduler.schedule("late", now - timedelta(seconds=1))
+        scheduler.schedule("early", now - timedelta(seconds=3))
+        scheduler.schedule("middle", now - timedelta(seconds=2))
+        scheduler.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            scheduler.stop()
+        self.assertEqual(resolved, ["early", "middle", "late"])
+
+    def test_future_and_cancelled_objectives_wait(self):
+        resolved = []
+        scheduler = DeadlineScheduler(resolved.append, grace_seconds=0)
+        scheduler.schedule("future", datetime.utcnow() + timedelta(hours=1))
+        scheduler.schedule("cancelled", datetime.utcnow())
+        scheduler.cancel("cancelled")
+        scheduler.start()
+        scheduler.stop()
+        self.assertEqual(resolved, [])
+        self.assertEqual(scheduler.pending(), 1)
+
+    def test_keep_earlier(self):
+        scheduler = DeadlineScheduler(lambda objective_id: None, grace_seconds=0)
+        now = datetime.utcnow()
+        scheduler.schedule("deferred", now + timedelta(minutes=5), keep_earlier=True)
+        scheduler.schedule("deferred", now + timedelta(minutes=6), keep_earlier=True)
+        self.assertEqual(scheduler.due("deferred"), now + timedelta(minutes=5))
+        scheduler.schedule("deferred", now + timedelta(minutes=1), keep_earlier=True)
+        self.assertEqual(scheduler.due("deferred"), now + timedelta(minutes=1))
+        # A plain schedule replaces the due time either way
+        scheduler.schedule("deferred", now + timedelta(minutes=6))
+        self.assertEqual(scheduler.due("deferred"), now + timedelta(minutes=6))
+        self.assertIsNone(scheduler.due("unknown"))
+
+    def test_failed_resolution_is_retried(self):
+        attempts = []
+        done = threading.Event()
+
+        def resolve(objective_id):
+            attempts.append(objective_id)
+            if len(attempts) == 1:
+                raise RuntimeError("mongo unavailable")
+            done.set()
+
+        scheduler = DeadlineScheduler(resolve, grace_seconds=0, retry_seconds=0.05)
+        scheduler.schedule("flaky", datetime.utcnow())
+        scheduler.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            scheduler.stop()
+        self.assertEqual(attempts, ["flaky", "flaky"])
+
+
+class TestPeriodicTask(unittest.TestCase):
+    def test_runs_until_stopped_despite_failures(self):
+        calls = []
+        done = threading.Event()
+
+        def run():
+            calls.append(len(calls))
+            if len(calls) == 3:
+                done.set()
+            if len(calls) == 1:
+                raise RuntimeError("mongo unavailable")
+
+        task = PeriodicTask(run, interval_seconds=0.01)
+        task.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            task.stop()
+        # No calls after stop()
+        count = len(calls)
+        time.sleep(0.05)
+        self.assertEqual(len(calls), count)
+
+
+if __name__ == "__main__":
+    unittest.main()
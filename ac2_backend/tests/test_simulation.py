@@ -0,0 +1,48 @@
+import unittest
+
+from ac2_backend.benchmarks.simulate import SimulationStats, run_simulation, simulate
+
+
+class TestSimulation(unittest.TestCase):
+    def test_aggregates(self):
+        [stats] = simulate(["clustered"], [10], 30, chunk_size=7)
+        self.assertEqual((stats.distribution, stats.n, stats.trials), ("clustered", 10, 30))
+        self.assertEqual(sum(stats.revealed.values()), 30)
+        summary = stats.to_dict()
+        self.assertLessEqual(summary["revealed"]["p5"], summary["revealed"]["p50"])
+        self.assertLessEqual(summary["revealed"]["p50"], summary["revealed"]["p95"])
+        self.assertTrue(all(0 <= location <= 10 for location in stats.stable + stats.unstable))
+
+        [declines] = simulate(["all-declines"], [5], 4, equilibria=False)
+        self.assertEqual(declines.revealed, {0: 4})
+        with self.assertRaises(ValueError):
+            simulate(["adversarial"], [5], 1)
+
+    def test_streams_running_totals(self):
+        snapshots = [stats.trials for stats in run_simulation(["uniform"], [6], 25, equilibria=False, chunk_size=10)]
+        self.assertEqual(snapshots, [10, 20, 25])
+
+    def test_independent_of_workers(self):
+        kwargs = {"equilibria": False, "chunk_size": 5, "min_percentage": 0.3}
+        serial = simulate(["uniform", "clustered"], [8, 12], 20, **kwargs)
+        parallel = simulate(["uniform", "clustered"], [8, 12], 20, workers=2, **kwargs)
+        self.assertEqual([s.revealed for s in serial], [s.revealed for s in parallel])
+
+    def test_plaintext_matches_encryption(self):
+        kwargs = {"equilibria": False, "min_percentage": 0.25}
+        plaintext = simulate(["clustered"], [8], 15, **kwargs)
+        encrypted = simulate(["clustered"], [8], 15, encrypted=True, **kwargs)
+        self.assertEqual(plaintext[0].revealed, encrypted[0].revealed)
+
+    def test_merge(self):
+        a = SimulationStats("uniform", 4, trials=2, no_equilibrium=1)
+        a.revealed.update({4: 2})
+        b = SimulationStats("uniform", 4, trials=1)
+        b.revealed.update({0: 1})
+        a.merge(b)
+        self.assertEqual((a.trials, a.no_equilibrium, dict(a.revealed)), (3, 1, {4: 2, 0: 1}))
+        self.assertEqual(a.revealed_percentile(0.5), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
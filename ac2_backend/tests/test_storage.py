@@ -0,0 +1,260 @@
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+
+from ac2_backend.mongo import LazyMongoClient
+from ac2_backend.storage import ANY_VERSION, MongoRepository, SQLiteRepository, open_repository
+from ac2_backend.storage.documents import apply_update, project
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+# Set to run the MongoDB tests against a real server (they use mongomock otherwise)
+MONGO_URI = os.environ.get("AC2_TEST_MONGO_URI")
+
+
+def commitment(i, **fields):
+    return {
+        "name": "HIDDEN",
+        "ciphertext": f"{i:02x}" * 16,
+        "points": [[str(i + 1), str(2**100 + i)], ["0", "0"]],
+        "committed_at": "2025-01-01T00:00:00",
+        "is_decline": False,
+        **fields,
+    }
+
+
+def objective(**fields):
+    return {
+        "title": "Objective",
+        "description": "Test",
+        "resolution_date": datetime(2025, 6, 1, 12, 0),
+        "resolution_strategy": "DEADLINE",
+        "visibility": "public",
+        "commitments": [commitment(0), commitment(1)],
+        "closed": False,
+        "modified_at": "2025-01-01T00:00:00",
+        "used_name_hashes": ["a" * 64, "b" * 64],
+        "level_counts": [2, 0],
+        "commitment_count": 2,
+        "version": 0,
+        **fields,
+    }
+
+
+class RepositoryContract:
+    """Behaviour every ObjectiveRepository must have; mixed into one TestCase per implementation."""
+
+    def make_repository(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.repository = self.make_repository()
+
+    def tearDown(self):
+        self.repository.close()
+
+    def test_create_and_get(self):
+        stored = objective()
+        object_id = self.repository.create(stored)
+        self.assertIsInstance(object_id, ObjectId)
+        self.assertEqual(stored["_id"], object_id)
+        self.assertEqual(self.repository.get(object_id), stored)
+        self.assertIsNone(self.repository.get(ObjectId()))
+
+    def test_projections(self):
+        stored = objective()
+        stored["commitments"][1].update(decrypted=True, decrypted_name="Bob")
+        object_id = self.repository.create(stored)
+
+        self.assertEqual(
+            self.repository.get(object_id, {"closed": 1, "version": 1}),
+            {"_id": object_id, "closed": False, "version": 0},
+        )
+        summary = self.repository.get(object_id, {"commitments.points": 0, "commitments.ciphertext": 0,
+                                                  "used_name_hashes": 0})
+        self.assertNotIn("used_name_hashes", summary)
+        self.assertEqual([c.get("decrypted", False) for c in summary["commitments"]], [False, True])
+        self.assertTrue(all("points" not in c and "ciphertext" not in c for c in summary["commitments"]))
+        self.assertEqual(summary["title"], "Objective")
+
+    def test_update_applies_operators(self):
+        stored = objective()
+        stored["commitments"][0]["coefficients"] = ["1", "2"]
+        object_id = self.repository.create(stored)
+        update = {
+            "$push": {"commitments": {"$each": [commitment(2), commitment(3)]}, "used_name_hashes": "c" * 64},
+            "$inc": {"level_counts.1": 1, "commitment_count": 2, "version": 1},
+            "$set": {"commitments.1.decrypted": True, "commitments.1.decrypted_name": "Bob",
+                     "level_coefficients": {"1": ["5"]}, "committed_people": ["Bob"]},
+            "$unset": {"commitments.0.coefficients": ""},
+        }
+        self.assertTrue(self.repository.update(object_id, update, version=0))
+        self.assertEqual(self.repository.get(object_id), apply_update(copy.deepcopy(stored), update))
+
+        # Archiving removes the commitments altogether
+        self.assertTrue(self.repository.update(object_id, {"$unset": {"commitments": "", "used_name_hashes": ""}}))
+        self.assertEqual(self.repository.count_commitments(object_id), 0)
+        self.assertNotIn("used_name_hashes", self.repository.get(object_id))
+
+    def test_compare_and_swap(self):
+        object_id = self.repository.create(objective())
+        self.assertFalse(self.repository.update(object_id, {"$set": {"closed": True}}, version=1))
+        self.assertTrue(self.repository.update(object_id, {"$inc": {"version": 1}}, version=0))
+        self.assertFalse(self.repository.update(object_id, {"$inc": {"version": 1}}, version=0))
+        self.assertTrue(self.repository.update(object_id, {"$set": {"closed": True}}, version=ANY_VERSION))
+        self.assertEqual(self.repository.get(object_id, {"closed": 1, "version": 1})["version"], 1)
+        self.assertFalse(self.repository.update(ObjectId(), {"$set": {"closed": True}}))
+
+        # Objectives created before versioning match version=None until their first versioned write
+        legacy = objective()
+        del legacy["version"]
+        legacy_id = self.repository.create(legacy)
+        self.assertFalse(self.repository.update(legacy_id, {"$inc": {"version": 1}}, version=0))
+        self.assertTrue(self.repository.update(legacy_id, {"$inc": {"version": 1}}, version=None))
+        self.assertFalse(self.repository.update(legacy_id, {"$inc": {"version": 1}}, version=None))
+
+    def test_concurrent_writers_lose_no_update(self):
+        object_id = self.repository.create(objective(commitments=[]))
+
+        def writer(i):
+            while True:
+                current = self.repository.get(object_id)
+                update = {"$push": {"commitments": commitment(i)}, "$inc": {"version": 1}}
+                if self.repository.update(object_id, update, version=current["version"]):
+                    return
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stored = self.repository.get(object_id)
+        self.assertEqual(stored["version"], 8)
+        self.assertEqual(sorted(c["ciphertext"] for c in stored["commitments"]),
+                         sorted(commitment(i)["ciphertext"] for i in range(8)))
+
+    def test_commitment_pages(self):
+        stored = objective(commitments=[commitment(i) for i in range(7)])
+        object_id = self.repository.create(stored)
+        self.assertEqual(list(self.repository.commitments(object_id, batch_size=3)),
+                         list(enumerate(stored["commitments"])))
+        self.assertEqual([i for i, _ in self.repository.commitments(object_id, 2, 4, batch_size=3)], [2, 3, 4, 5])
+        self.assertEqual(list(self.repository.commitments(object_id, 7)), [])
+        self.assertEqual(self.repository.count_commitments(object_id), 7)
+
+    def test_queries(self):
+        ids = {
+            "open": self.repository.create(objective(title="b", resolution_strategy="deadline")),
+            "asap": self.repository.create(objective(title="a", resolution_strategy="ASAP")),
+            "closed": self.repository.create(objective(title="c", closed=True, modified_at="2025-01-02T00:00:00")),
+            "private": self.repository.create(objective(title="d", closed=True, visibility="private")),
+            "archived": self.repository.create(objective(title="e", closed=True, archived={"version": 0})),
+        }
+        self.assertEqual([o["_id"] for o in self.repository.find_open("DEADLINE", {"title": 1})], [ids["open"]])
+
+        newest = self.repository.find_public({"title": 1}, ("_id", -1), limit=10)
+        self.assertEqual([o["title"] for o in newest], ["e", "c", "a", "b"])
+        self.assertEqual(set(newest[0]), {"_id", "title"})
+        self.assertEqual([o["title"] for o in self.repository.find_public({"title": 1}, ("title", 1), limit=2)],
+                         ["a", "b"])
+        recent = self.repository.find_public({"title": 1}, ("modified_at", -1), limit=10, closed_only=True)
+        self.assertEqual([o["title"] for o in recent], ["c", "e"])
+        with self.assertRaises(ValueError):
+            self.repository.find_public(None, ("description", 1), limit=1)
+
+        self.assertEqual(set(self.repository.archive_candidates("2025-01-05T00:00:00", 10)),
+                         {ids["closed"], ids["private"]})
+        self.assertEqual(self.repository.archive_candidates("2025-01-01T12:00:00", 10), [ids["private"]])
+
+    def test_archive_documents(self):
+        object_id = self.repository.create(objective())
+        chunks = [
+            {"objective_id": object_id, "version": 3, "field": "commitments", "first": first, "last": first + 10,
+             "count": 10, "records": bytes([first])}
+            for first in (0, 10, 20)
+        ]
+        hashes = {"objective_id": object_id, "version": 3, "field": "used_name_hashes", "first": 0, "data": b"\x01"}
+        self.repository.replace_archive(object_id, 3, chunks + [hashes])
+
+        def firsts(*args):
+            return [d["first"] for d in self.repository.archive_documents(object_id, 3, "commitments", *args)]
+
+        self.assertEqual(firsts(), [0, 10, 20])
+        self.assertEqual(firsts(10, 20), [10])
+        self.assertEqual(firsts(5, 11), [0, 10])
+        stored = list(self.repository.archive_documents(object_id, 3, "used_name_hashes"))
+        self.assertEqual([d["data"] for d in stored], [b"\x01"])
+
+        self.repository.replace_archive(object_id, 3, chunks[:1])
+        self.assertEqual(firsts(), [0])
+        self.repository.delete_archive(object_id, 3)
+        self.assertEqual(firsts(), [])
+
+    def test_delete(self):
+        object_id = self.repository.create(objective())
+        self.repository.delete(object_id)
+        self.assertIsNone(self.repository.get(object_id))
+        self.assertEqual(list(self.repository.commitments(object_id)), [])
+
+
+class TestSQLiteRepository(RepositoryContract, unittest.TestCase):
+    def make_repository(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return open_repository(f"sqlite:///{directory}/objectives.db")
+
+    def test_is_selected_by_uri(self):
+        self.assertIsInstance(self.repository, SQLiteRepository)
+        self.assertIsInstance(open_repository("mongodb://localhost:27017/"), MongoRepository)
+        with self.assertRaises(ValueError):
+            open_repository("sqlite:///")
+
+
+@unittest.skipUnless(MONGO_URI or mongomock, "needs AC2_TEST_MONGO_URI or mongomock")
+class TestMongoRepository(RepositoryContract, unittest.TestCase):
+    def make_repository(self):
+        if MONGO_URI:
+            client = LazyMongoClient(MONGO_URI)
+        else:
+            client = LazyMongoClient("mongodb://localhost:27017/", factory=mongomock.MongoClient)
+        database = f"ac2_test_{ObjectId()}"
+        self.addCleanup(lambda: client.get().drop_database(database))
+        return MongoRepository(client, database)
+
+
+class TestDocuments(unittest.TestCase):
+    def test_apply_update(self):
+        document = {"counts": [1, 2], "items": [{"a": 1}]}
+        apply_update(document, {
+            "$inc": {"counts.1": 3, "total": 1},
+            "$set": {"items.0.b": 2, "nested.value": "x"},
+            "$push": {"items": {"a": 2}, "tags": {"$each": ["p", "q"]}},
+            "$unset": {"items.0.a": "", "missing.path": ""},
+        })
+        self.assertEqual(document, {
+            "counts": [1, 5], "total": 1, "items": [{"b": 2}, {"a": 2}],
+            "nested": {"value": "x"}, "tags": ["p", "q"],
+        })
+        with self.assertRaises(ValueError):
+            apply_update(document, {"$pull": {"tags": "p"}})
+
+    def test_project(self):
+        document = {"_id": 1, "a": 1, "b": {"c": 2, "d": 3}, "items": [{"x": 1, "y": 2}, {"x": 3}]}
+        self.assertEqual(project(document, {"a": 1, "b.c": 1}), {"_id": 1, "a": 1, "b": {"c": 2}})
+        self.assertEqual(project(document, {"a": 1, "_id": 0}), {"a": 1})
+        self.assertEqual(project(document, {"items.y": 0, "a": 0}),
+                         {"_id": 1, "b": {"c": 2, "d": 3}, "items": [{"x": 1}, {"x": 3}]})
+        self.assertIs(project(document, None), document)
+
+
+if __name__ == "__main__":
+    unittest.main()
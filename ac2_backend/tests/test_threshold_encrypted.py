@@ -0,0 +1,108 @@
+import random
+import unittest
+
+from ac2_backend.core.commit_classes import NameHolder, CommitEncrypter, CommitDecrypter
+from ac2_backend.core.threshold_encrypted import ThresholdEncryptedModel, resolve_plaintext
+
+NAMES = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank"]
+
+
+def decrypt(preferences, members, min_count=1, levels=None, seed="seed"):
+    encrypter = CommitEncrypter(NameHolder(members), min_count, seed=seed, levels=levels)
+    decrypter = CommitDecrypter(len(set(members)), levels=levels)
+    for ciphertext, points in encrypter.commit_many(preferences):
+        decrypter.add_commitment(ciphertext, points)
+    names, details = decrypter.decrypt_with_details()
+    return decrypter, names, details
+
+
+class TestResolvePlaintext(unittest.TestCase):
+    def test_chain_reaction(self):
+        resolution = resolve_plaintext([("Alice", 1), ("Bob", 2), ("Charlie", 3), ("Dana", 5)], NAMES)
+        self.assertEqual(resolution.names, ["Alice", "Bob", "Charlie"])
+        self.assertEqual(resolution.solved_levels, [1, 2, 3])
+        self.assertEqual(resolution.revealed, {"Alice": 1, "Bob": 2, "Charlie": 3})
+
+    def test_revealed_at_first_solved_level_above(self):
+        # Nobody is at level 2 or 3, so Alice waits until the four at level 4 solve it
+        resolution = resolve_plaintext([("Alice", 2), ("Bob", 4), ("Charlie", 4), ("Dana", 4)], NAMES)
+        self.assertEqual(resolution.solved_levels, [4])
+        self.assertEqual(resolution.revealed, {"Alice": 4, "Bob": 4, "Charlie": 4, "Dana": 4})
+
+    def test_encrypter_rules(self):
+        preferences = [("Alice", 0), ("Bob", -1), ("Mallory", 1), ("Alice", 6), ("Charlie", 9), ("Dana", 2)]
+        resolution = resolve_plaintext(preferences, NAMES[:4])
+        # 0 is clamped to 1, the second Alice and Mallory store noise, 9 is clamped to n
+        self.assertEqual(resolution.levels, {"Alice": 1, "Charlie": 4, "Dana": 2})
+        self.assertEqual(resolution.names, ["Alice", "Dana"])
+
+    def test_below_min_count_never_opens(self):
+        resolution = resolve_plaintext([("Alice", 1), ("Bob", 3), ("Charlie", 3), ("Dana", 3)], NAMES, min_count=3)
+        self.assertEqual(resolution.names, ["Bob", "Charlie", "Dana"])
+        self.assertNotIn("Alice", resolution.levels)
+
+    def test_declared_levels(self):
+        resolution = resolve_plaintext([("Alice", 1), ("Bob", 2), ("Charlie", 3)], NAMES, levels=[2, 4])
+        self.assertEqual(resolution.levels, {"Alice": 2, "Bob": 2, "Charlie": 4})
+        self.assertEqual(resolution.revealed, {"Alice": 2, "Bob": 2})
+
+    def test_above_highest_level_is_noise(self):
+        preferences = [("Alice", 5), ("Bob", 5), ("Charlie", 5), ("Dana", 2), ("Eve", 3)]
+        resolution = resolve_plaintext(preferences, NAMES[:5], levels=[2, 3])
+        self.assertEqual(resolution.levels, {"Dana": 2, "Eve": 3})
+        self.assertEqual(resolution.names, [])
+        _, names, _ = decrypt(preferences, NAMES[:5], levels=[2, 3])
+        self.assertEqual(names, resolution.names)
+
+    def test_matches_decrypter(self):
+        rng = random.Random("plaintext-oracle")
+        for trial in range(150):
+            n = rng.randint(1, 7)
+            members = [f"member-{i}" for i in range(n)]
+            candidates = members + ["outsider"]
+            preferences = [
+                (rng.choice(candidates), rng.choice([-1, -1] + list(range(0, n + 2))))
+                for _ in range(rng.randint(0, n + 2))
+            ]
+            min_count = rng.randint(1, n)
+            levels = sorted(rng.sample(range(1, n + 1), rng.randint(1, n))) if rng.random() < 0.3 else None
+            with self.subTest(trial=trial, preferences=preferences, min_count=min_count, levels=levels):
+                decrypter, names, details = decrypt(preferences, members, min_count, levels, seed=f"t{trial}")
+                resolution = resolve_plaintext(preferences, members, min_count, levels)
+
+                self.assertEqual(resolution.names, names)
+                self.assertEqual(
+                    {detail["name"]: detail["threshold"] for detail in details.values()},
+                    {name: resolution.levels[name] for name in names},
+                )
+                self.assertEqual([level.level for level in decrypter.stats.levels if level.solved],
+                                 resolution.solved_levels)
+
+
+class TestModel(unittest.TestCase):
+    def test_plaintext_matches_resolve(self):
+        model = ThresholdEncryptedModel([("Alice", 1), ("Bob", 2), ("Charlie", 2), ("Dana", 5), ("Eve", -1)])
+        self.assertEqual(model.resolve(), ["Alice", "Bob", "Charlie"])
+        self.assertEqual(model.resolve_plaintext().names, model.resolve())
+
+        # Replacing a commitment re-encrypts it instead of storing noise
+        model.update_preference("Eve", 3)
+        self.assertEqual(model.resolve(), ["Alice", "Bob", "Charlie", "Dana", "Eve"])
+        self.assertEqual(model.resolve_plaintext().revealed, {"Alice": 1, "Bob": 2, "Charlie": 2, "Dana": 5, "Eve": 3})
+
+        model.remove_preference("Alice")
+        self.assertEqual(model.resolve_plaintext().names, model.resolve())
+
+    def test_without_encryption(self):
+        preferences = [("Alice", 1), ("Bob", 3), ("Charlie", 2), ("Dana", -1), ("Eve", 6)]
+        model = ThresholdEncryptedModel(preferences, min_percentage=0.4)
+        plain = ThresholdEncryptedModel(preferences, min_percentage=0.4, encrypted=False)
+        self.assertIsNone(plain.decrypter)
+        self.assertEqual(plain.resolve(), model.resolve())
+        self.assertIsNone(plain.update_preference("Dana", 2))
+        model.update_preference("Dana", 2)
+        self.assertEqual(plain.resolve(), model.resolve())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@
 
 import { notFound, useParams } from 'next/navigation';
 import Link from 'next/link';
-import { Objective } from '../data';
+import { CommitmentPage, Objective } from '../data';
 import { useEffect, useState } from 'react';
 import { API_URL } from '@/config/config';
 import { Lock, Hash, Grid3x3, CheckCircle, XCircle, ArrowRight, QrCode } from 'lucide-react';
@@ -74,6 +74,19 @@ export default function ObjectivePage() {
         };
 
         setObjective(mappedData);
+        setIsLoading(false);
+
+        // Commitments come from their own paginated endpoint; show each page as it arrives
+        let offset: number | null = 0;
+        while (offset !== null) {
+          const pageRes = await fetch(`${API_URL}objective/${objectiveId}/commitments?offset=${offset}`,
+            {method: "GET"});
+          if (!pageRes.ok) throw new Error(`Failed to load commitments (${pageRes.status})`);
+          const page: CommitmentPage = await pageRes.json();
+          if (cancelled) return;
+          setObjective(prev => prev && { ...prev, commitments: [...(prev.commitments || []), ...page.commitments] });
+          offset = page.next_offset;
+        }
       } catch (e) {
         alert((e instanceof Error ? e.message : String(e)) || "Failed to load objective");
       } finally {
@@ -333,7 +346,7 @@ export default function ObjectivePage() {
                   <div className="grid grid-cols-2 sm:grid-cols-4 gap-4">
                     <div>
                       <div className="text-xs text-white/50 mb-1">Committed</div>
-                      <div className="text-2xl font-light text-white">{obj.commitments.length}</div>
+                      <div className="text-2xl font-light text-white">{obj.commitment_count ?? obj.commitments.length}</div>
                     </div>
                     <div>
                       <div className="text-xs text-white/50 mb-1">Total Eligible</div>
@@ -342,13 +355,13 @@ export default function ObjectivePage() {
                     <div>
                       <div className="text-xs text-white/50 mb-1">Remaining</div>
                       <div className="text-2xl font-light text-white">
-                        {(obj.eligible_count || obj.invited_count) ? (obj.eligible_count || obj.invited_count || 0) - obj.commitments.length : '?'}
+                        {(obj.eligible_count || obj.invited_count) ? (obj.eligible_count || obj.invited_count || 0) - (obj.commitment_count ?? obj.commitments.length) : '?'}
                       </div>
                     </div>
                     <div>
                       <div className="text-xs text-white/50 mb-1">Decrypted</div>
                       <div className="text-2xl font-light text-green-400">
-                        {obj.commitments.filter(c => c.decrypted).length}
+                        {obj.decrypted_count ?? obj.commitments.filter(c => c.decrypted).length}
                       </div>
                     </div>
                   </div>
@@ -363,7 +376,7 @@ export default function ObjectivePage() {
                           let threshold = 0;
                           for (let i = 0; i < c.points.length; i++) {
                             if (c.points[i][0] !== '0' || c.points[i][1] !== '0') {
-                              threshold = i + 1;
+                              threshold = obj.allowed_thresholds ? obj.allowed_thresholds[i] : i + 1;
                               break;
                             }
                           }
@@ -393,8 +406,10 @@ export default function ObjectivePage() {
 
                 {/* Polynomial Coefficients (shown once at top if any commitment is decrypted) */}
                 {(() => {
-                  const decryptedCommitment = obj.commitments.find(c => c.decrypted && c.coefficients);
-                  if (decryptedCommitment && decryptedCommitment.coefficients) {
+                  // Coefficients of the highest level names were revealed at; lower levels share its prefix
+                  const levels = Object.keys(obj.level_coefficients || {}).map(Number);
+                  const coefficients = levels.length > 0 ? obj.level_coefficients![String(Math.max(...levels))] : null;
+                  if (coefficients) {
                     return (
                       <div className="mb-6 border border-green-500/30 bg-green-500/5 p-4 rounded">
                         <div className="flex items-center gap-2 mb-3">
@@ -404,7 +419,7 @@ export default function ObjectivePage() {
                           </div>
                         </div>
                         <div className="grid grid-cols-1 sm:grid-cols-2 gap-2 mb-2">
-                          {decryptedCommitment.coefficients.map((coeff, cidx) => (
+                          {coefficients.map((coeff, cidx) => (
                             <div key={cidx} className="font-mono text-[9px] leading-tight text-green-500/70 bg-black/30 p-2 rounded border border-green-500/20 break-all">
                               <span className="text-green-500/50">a[{cidx}]:</span> {coeff}
                             </div>
@@ -425,7 +440,7 @@ export default function ObjectivePage() {
                     let impliedThreshold = 0;
                     for (let i = 0; i < commitment.points.length; i++) {
                       if (commitment.points[i][0] !== '0' || commitment.points[i][1] !== '0') {
-                        impliedThreshold = i + 1;
+                        impliedThreshold = obj.allowed_thresholds ? obj.allowed_thresholds[i] : i + 1;
                         break;
                       }
                     }
@@ -6,8 +6,17 @@ export interface Commitment {
   is_decline?: boolean;
   decrypted_name?: string;
   threshold?: number;
-  coefficients?: string[]; // Polynomial coefficients as strings
-  decryption_level?: number;
+  decryption_level?: number; // Key into Objective.level_coefficients
+  index?: number; // Position in commit order, set by the commitments endpoint
+}
+
+// One page of GET /objective/{id}/commitments
+export interface CommitmentPage {
+  offset: number;
+  limit: number;
+  total: number;
+  next_offset: number | null; // null after the last page
+  commitments: Commitment[];
 }
 
 export interface Objective {
@@ -18,10 +27,14 @@ export interface Objective {
   published: boolean;
   requireIdentityVerification?: boolean;
   committers?: string[]; // List of people if published
-  commitments?: Commitment[]; // List of encrypted commitments
+  commitments?: Commitment[]; // List of encrypted commitments, loaded page by page
+  commitment_count?: number; // Total commitments, known before the pages are loaded
+  decrypted_count?: number; // Commitments whose name has been revealed
   resolution_strategy?: string; // ASAP or DEADLINE
   minimum_number?: number; // Minimum commitments required for any decryption
   eligible_count?: number; // Total number of eligible people
+  allowed_thresholds?: number[] | null; // Level of each point; null means points[i] is level i + 1
   invited_count?: number; // Deprecated: Total number of invited people
   closed?: boolean;
+  level_coefficients?: Record<string, string[]>; // Recovered polynomial coefficients (as strings) per decryption level
 }
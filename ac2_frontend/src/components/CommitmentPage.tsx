@@ -112,7 +112,8 @@ export default function CommitmentPage() {
     !isCommitNumberRequired || 
     (/^\d+$/.test(commitNumberTrimmed) && 
      Number(commitNumberTrimmed) >= 1 && 
-     Number(commitNumberTrimmed) <= maxCommitNumber);
+     Number(commitNumberTrimmed) <= maxCommitNumber &&
+     (!objective?.allowed_thresholds || objective.allowed_thresholds.includes(Number(commitNumberTrimmed))));
 
   const handleSubmit = async () => {
     // Allow submission if strategy is DEADLINE even if published
@@ -520,7 +521,9 @@ export default function CommitmentPage() {
                 />
                 {commitNumber.length > 0 && !isCommitNumberValid && (
                   <p className="text-sm text-red-500/80 mt-2">
-                    Please enter a number between 1 and {objective?.eligible_count || objective?.invited_count || 'the group size'}.
+                    {objective?.allowed_thresholds
+                      ? `Please enter one of ${objective.allowed_thresholds.join(', ')}.`
+                      : `Please enter a number between 1 and ${objective?.eligible_count || objective?.invited_count || 'the group size'}.`}
                   </p>
                 )}
                 {objective?.minimum_number && objective.minimum_number > 1 && selectedChoice === 'commit' && (